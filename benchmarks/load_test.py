@@ -0,0 +1,590 @@
+#!/usr/bin/env python
+"""Offline end-to-end load test of the chat API.
+
+Starts ``create_app()`` in-process with simulated upstreams and replays a
+JSONL traffic file against ``/api/v1/chat`` at a target concurrency, then
+reports throughput, p50/p95/p99 latency and event-loop lag. Nothing leaves
+the machine:
+
+* Anthropic and Tavily are replaced at the HTTP transport, so the real
+  ChatAnthropic, SDK, rate limiter and search client code still runs.
+  Router calls replay the traffic file's labels; generation calls return
+  answers with sampled token counts.
+* The vectorstore is an in-memory stand-in with sampled latency over the
+  retrieval corpus, alongside a real keyword index, and embeddings are
+  deterministic hashes.
+
+Each traffic line is ``{"message": ...}``, optionally with a
+``"conversation"`` key grouping sequential turns and ``should_search_web`` /
+``should_use_rag`` labels for the router. Latencies take a distribution:
+``fixed:S``, ``uniform:LO:HI`` or ``lognormal:MEDIAN:SIGMA`` (seconds).
+
+Usage:
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --concurrency 32 --requests 500 --time-scale 0.1
+    python benchmarks/load_test.py --llm-latency lognormal:0.8:0.6 --max-p95-ms 4000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from langchain_core.documents import Document
+from langchain_core.embeddings.fake import DeterministicFakeEmbedding
+
+from ai_assistants.chatbot.app import create_app
+from ai_assistants.chatbot.core.llm import init_llm_registry
+from ai_assistants.chatbot.core.prompts import ROUTER_PROMPT
+from ai_assistants.chatbot.core.router import route_with_rules
+from ai_assistants.chatbot.rag import embeddings as embeddings_module
+from ai_assistants.chatbot.rag import vectorstore as vectorstore_module
+from ai_assistants.chatbot.rag.keyword_index import KeywordIndex
+from ai_assistants.chatbot.tools.definitions import RETRIEVE_DOCUMENTS_TOOL, SEARCH_WEB_TOOL
+from ai_assistants.chatbot.tools.web_search import get_search_client
+from ai_assistants.shared.config import settings
+
+DATA_DIR = Path(__file__).parent / "data"
+
+# Simulated account limits, reported in rate-limit headers
+REQUESTS_PER_MINUTE = 4000
+TOKENS_PER_MINUTE = 2_000_000
+
+ROUTER_OUTPUT_TOKENS = 20
+TOOL_CALL_TOKENS = 40
+EMBEDDING_SIZE = 384
+
+FILLER = (
+    "Diversification spreads risk across assets so that no single holding "
+    "dominates the outcome of a portfolio over time"
+).split()
+
+
+@dataclass
+class Distribution:
+    """Latency or token-count distribution parsed from ``kind:param[:param]``."""
+
+    kind: str
+    params: Tuple[float, ...]
+
+    @classmethod
+    def parse(cls, spec: str) -> "Distribution":
+        kind, _, rest = spec.partition(":")
+        params = tuple(float(p) for p in rest.split(":") if p)
+        arity = {"fixed": 1, "uniform": 2, "lognormal": 2}
+        if arity.get(kind) != len(params):
+            raise argparse.ArgumentTypeError(
+                f"expected fixed:X, uniform:LO:HI or lognormal:MEDIAN:SIGMA, got {spec!r}"
+            )
+        return cls(kind, params)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        median, sigma = self.params
+        return median * rng.lognormvariate(0.0, sigma)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _filler(tokens: int) -> str:
+    return " ".join(FILLER[i % len(FILLER)] for i in range(tokens))
+
+
+def _blocks(content: Any) -> List[Dict[str, Any]]:
+    if isinstance(content, str):
+        return [{"type": "text", "text": content}]
+    return [block for block in content or [] if isinstance(block, dict)]
+
+
+def _question(body: Dict[str, Any]) -> str:
+    """Get the user's question: the last text block of the last user turn with text."""
+    for message in reversed(body.get("messages", [])):
+        if message.get("role") != "user":
+            continue
+        texts = [b["text"] for b in _blocks(message.get("content")) if b.get("type") == "text"]
+        if texts:
+            return texts[-1]
+    return ""
+
+
+class SimulatedAnthropic:
+    """Messages API stand-in served through an ``httpx.MockTransport``.
+
+    Every call waits a sampled time to first token plus the output tokens at
+    ``tokens_per_second``. Router calls return the labelled decision for the
+    question (falling back to the keyword rules), generation calls with
+    tools request the labelled sources once, and every other call answers
+    with a sampled number of tokens.
+    """
+
+    def __init__(
+        self,
+        labels: Dict[str, Tuple[bool, bool]],
+        first_token: Distribution,
+        output_tokens: Distribution,
+        tokens_per_second: float,
+        time_scale: float,
+        rng: random.Random,
+    ) -> None:
+        self.labels = labels
+        self.first_token = first_token
+        self.output_tokens = output_tokens
+        self.tokens_per_second = tokens_per_second
+        self.time_scale = time_scale
+        self.rng = rng
+        self.calls: Counter = Counter()
+
+    def _route(self, question: str) -> Tuple[bool, bool]:
+        if question in self.labels:
+            return self.labels[question]
+        decision = route_with_rules(question)
+        if decision is None:
+            return False, False
+        return decision.should_search_web, decision.should_use_rag
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        if body.get("stream"):
+            error = {"type": "invalid_request_error", "message": "Streaming is not simulated"}
+            return httpx.Response(400, json={"type": "error", "error": error})
+
+        system = "".join(b.get("text", "") for b in _blocks(body.get("system")))
+        question = _question(body)
+        web, rag = self._route(question)
+        tool_names = {tool.get("name") for tool in body.get("tools") or []}
+        has_tool_results = any(
+            block.get("type") == "tool_result"
+            for message in body.get("messages", [])
+            for block in _blocks(message.get("content"))
+        )
+
+        wanted = ((RETRIEVE_DOCUMENTS_TOOL, rag), (SEARCH_WEB_TOOL, web))
+        requested = [name for name, needed in wanted if needed and name in tool_names]
+
+        stop_reason = "end_turn"
+        if ROUTER_PROMPT in system:
+            kind = "route"
+            tokens = ROUTER_OUTPUT_TOKENS
+            text = json.dumps({"should_search_web": web, "should_use_rag": rag})
+            content = [{"type": "text", "text": text}]
+        elif requested and not has_tool_results:
+            kind = "tool_call"
+            tokens = TOOL_CALL_TOKENS * len(requested)
+            stop_reason = "tool_use"
+            content = [
+                {
+                    "type": "tool_use",
+                    "id": f"toolu_{uuid.uuid4().hex[:12]}",
+                    "name": name,
+                    "input": {"query": question},
+                }
+                for name in requested
+            ]
+        else:
+            kind = "generate"
+            tokens = max(1, int(self.output_tokens.sample(self.rng)))
+            content = [{"type": "text", "text": _filler(tokens)}]
+        self.calls[kind] += 1
+
+        seconds = self.first_token.sample(self.rng) + tokens / self.tokens_per_second
+        await asyncio.sleep(seconds * self.time_scale)
+
+        input_tokens = len(request.content) // 4
+        return httpx.Response(
+            200,
+            json={
+                "id": f"msg_{uuid.uuid4().hex[:24]}",
+                "type": "message",
+                "role": "assistant",
+                "model": body.get("model"),
+                "content": content,
+                "stop_reason": stop_reason,
+                "stop_sequence": None,
+                "usage": {"input_tokens": input_tokens, "output_tokens": tokens},
+            },
+            headers={
+                "anthropic-ratelimit-requests-limit": str(REQUESTS_PER_MINUTE),
+                "anthropic-ratelimit-requests-remaining": str(REQUESTS_PER_MINUTE),
+                "anthropic-ratelimit-tokens-limit": str(TOKENS_PER_MINUTE),
+                "anthropic-ratelimit-tokens-remaining": str(TOKENS_PER_MINUTE),
+            },
+        )
+
+
+class SimulatedTavily:
+    """Tavily ``/search`` stand-in served through an ``httpx.MockTransport``."""
+
+    def __init__(self, latency: Distribution, time_scale: float, rng: random.Random) -> None:
+        self.latency = latency
+        self.time_scale = time_scale
+        self.rng = rng
+        self.calls = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.calls += 1
+        await asyncio.sleep(self.latency.sample(self.rng) * self.time_scale)
+        query = body.get("query", "")
+        results = [
+            {
+                "title": f"Result {i + 1} for {query}",
+                "content": f"{query}. {_filler(60)}.",
+                "url": f"https://search.test/{i + 1}",
+            }
+            for i in range(body.get("max_results", 5))
+        ]
+        return httpx.Response(200, json={"query": query, "results": results})
+
+
+class SimulatedVectorstore:
+    """In-memory vectorstore stand-in with sampled, blocking search latency."""
+
+    def __init__(
+        self,
+        documents: List[Document],
+        latency: Distribution,
+        time_scale: float,
+        rng: random.Random,
+    ) -> None:
+        self.documents = documents
+        self.latency = latency
+        self.time_scale = time_scale
+        self.rng = rng
+        self.calls = 0
+
+    def similarity_search(self, query: str, k: int = 4) -> List[Document]:
+        # Runs in the thread pool like Chroma, so it blocks a worker thread
+        self.calls += 1
+        time.sleep(self.latency.sample(self.rng) * self.time_scale)
+        return self.rng.sample(self.documents, min(k, len(self.documents)))
+
+
+class PlainFloatEmbedding(DeterministicFakeEmbedding):
+    """Deterministic fake embeddings as plain floats, like real embedding clients.
+
+    The base class returns numpy floats, which msgpack-based checkpoint
+    serialization rejects.
+    """
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [[float(value) for value in vector] for vector in super().embed_documents(texts)]
+
+    def embed_query(self, text: str) -> List[float]:
+        return [float(value) for value in super().embed_query(text)]
+
+
+class LoopLagMonitor:
+    """Samples event-loop lag: how late a periodic wake-up actually runs."""
+
+    def __init__(self, interval: float = 0.01) -> None:
+        self.interval = interval
+        self.samples: List[float] = []
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - expected))
+
+
+def _load_traffic(path: Path) -> List[List[Dict[str, Any]]]:
+    """Group traffic lines into conversations, keeping file order."""
+    conversations: Dict[str, List[Dict[str, Any]]] = {}
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f):
+            if not line.strip():
+                continue
+            turn = json.loads(line)
+            key = str(turn.get("conversation", f"line-{line_number}"))
+            conversations.setdefault(key, []).append(turn)
+    return list(conversations.values())
+
+
+def _load_corpus(path: Path) -> List[Document]:
+    with open(path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [
+        Document(
+            page_content=row["text"],
+            metadata={"source": row["source"], "doc_id": row["doc_id"]},
+        )
+        for row in rows
+    ]
+
+
+def _simulate(args: argparse.Namespace, traffic: List[List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Install the simulated upstreams and offline settings."""
+    rng = random.Random(args.seed)
+    labels = {
+        turn["message"]: (bool(turn["should_search_web"]), bool(turn["should_use_rag"]))
+        for conversation in traffic
+        for turn in conversation
+        if "should_search_web" in turn and "should_use_rag" in turn
+    }
+
+    # Keep conversation, checkpoint and rate-limit state out of ./data
+    settings.checkpointer_backend = "memory"
+    settings.conversation_store_backend = "memory"
+    settings.rate_limit_path = str(Path(tempfile.mkdtemp(prefix="load-test-")) / "rate_limit.db")
+    settings.anthropic_api_key = "offline"
+    settings.tavily_api_key = "offline"
+    # The limiter is opt-in; exercise it as a production deployment would
+    settings.rate_limit_enabled = True
+    settings.rate_limit_requests_per_minute = REQUESTS_PER_MINUTE
+    settings.rate_limit_tokens_per_minute = TOKENS_PER_MINUTE
+    settings.web_search_cache_path = ""
+    settings.semantic_cache_enabled = args.semantic_cache
+    settings.graph_topology = args.topology
+    settings.router_mode = args.router_mode
+
+    anthropic = SimulatedAnthropic(
+        labels,
+        first_token=args.llm_latency,
+        output_tokens=args.output_tokens,
+        tokens_per_second=args.tokens_per_second,
+        time_scale=args.time_scale,
+        rng=rng,
+    )
+    tavily = SimulatedTavily(args.search_latency, args.time_scale, rng)
+    init_llm_registry(transport=httpx.MockTransport(anthropic.handle))
+    get_search_client(transport=httpx.MockTransport(tavily.handle))
+
+    documents = _load_corpus(args.corpus)
+    vectorstore = SimulatedVectorstore(documents, args.vector_latency, args.time_scale, rng)
+    index = KeywordIndex()
+    for doc in documents:
+        index.add(doc.metadata["doc_id"], doc.page_content, doc.metadata)
+    embeddings_module._embeddings = PlainFloatEmbedding(size=EMBEDDING_SIZE)
+    vectorstore_module._vectorstore = vectorstore
+    vectorstore_module._keyword_index = index
+
+    return {"anthropic": anthropic, "tavily": tavily, "vectorstore": vectorstore}
+
+
+async def _replay(
+    client: httpx.AsyncClient,
+    conversations: "asyncio.Queue[List[Dict[str, Any]]]",
+    results: List[Tuple[int, float]],
+    deadline_seconds: Optional[float],
+) -> None:
+    """Play conversations off the queue, one turn at a time."""
+    while True:
+        try:
+            conversation = conversations.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        conversation_id = str(uuid.uuid4())
+        for turn in conversation:
+            payload: Dict[str, Any] = {
+                "message": turn["message"],
+                "conversation_id": conversation_id,
+            }
+            if deadline_seconds:
+                payload["deadline_seconds"] = deadline_seconds
+            start = time.perf_counter()
+            try:
+                response = await client.post("/api/v1/chat", json=payload)
+                status = response.status_code
+            except Exception:
+                status = 0
+            results.append((status, time.perf_counter() - start))
+
+
+async def run(args: argparse.Namespace, traffic: List[List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Run the load test and get the report."""
+    simulated = _simulate(args, traffic)
+
+    # Cycle through the traffic until enough turns are queued
+    total_turns = sum(len(c) for c in traffic)
+    target = args.requests or total_turns
+    conversations: "asyncio.Queue[List[Dict[str, Any]]]" = asyncio.Queue()
+    queued = 0
+    while queued < target:
+        for conversation in traffic:
+            if queued >= target:
+                break
+            turns = conversation[: target - queued]
+            conversations.put_nowait(turns)
+            queued += len(turns)
+
+    app = create_app()
+    await app.router.startup()
+    monitor = LoopLagMonitor()
+    lag_task = asyncio.create_task(monitor.run())
+    results: List[Tuple[int, float]] = []
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://load-test", timeout=None
+        ) as client:
+            start = time.perf_counter()
+            await asyncio.gather(
+                *(
+                    _replay(client, conversations, results, args.deadline_seconds)
+                    for _ in range(args.concurrency)
+                )
+            )
+            elapsed = time.perf_counter() - start
+    finally:
+        lag_task.cancel()
+        await app.router.shutdown()
+
+    latencies = [seconds * 1000 for status, seconds in results if status == 200]
+    lag = [seconds * 1000 for seconds in monitor.samples] or [0.0]
+    report: Dict[str, Any] = {
+        "requests": len(results),
+        "concurrency": args.concurrency,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(results) / elapsed, 2) if elapsed else None,
+        "statuses": dict(Counter(str(status) for status, _ in results)),
+        "latency_ms": {
+            f"p{pct}": round(_percentile(latencies, pct), 1) for pct in (50, 95, 99)
+        } if latencies else {},
+        "loop_lag_ms": {
+            "p50": round(_percentile(lag, 50), 2),
+            "p99": round(_percentile(lag, 99), 2),
+            "max": round(max(lag), 2),
+        },
+        "upstream_calls": {
+            **{f"anthropic_{kind}": n for kind, n in sorted(simulated["anthropic"].calls.items())},
+            "tavily_search": simulated["tavily"].calls,
+            "vector_search": simulated["vectorstore"].calls,
+        },
+    }
+    if latencies:
+        report["latency_ms"]["max"] = round(max(latencies), 1)
+    return report
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    latency = report["latency_ms"]
+    lag = report["loop_lag_ms"]
+    statuses = "  ".join(f"{status}={n}" for status, n in sorted(report["statuses"].items()))
+    print(
+        f"requests={report['requests']}  concurrency={report['concurrency']}  "
+        f"elapsed={report['seconds']:.2f}s  throughput={report['throughput_rps']:.2f} req/s"
+    )
+    print(f"status   {statuses}")
+    if latency:
+        print(
+            f"latency  p50={latency['p50']:8.1f}ms p95={latency['p95']:8.1f}ms "
+            f"p99={latency['p99']:8.1f}ms max={latency['max']:8.1f}ms"
+        )
+    print(f"loop lag p50={lag['p50']:7.2f}ms p99={lag['p99']:7.2f}ms max={lag['max']:7.2f}ms")
+    calls = "  ".join(f"{name}={n}" for name, n in report["upstream_calls"].items())
+    print(f"upstream {calls}")
+
+
+def _failures(report: Dict[str, Any], args: argparse.Namespace) -> List[str]:
+    """Check the report against the regression thresholds."""
+    failures = []
+    ok = report["statuses"].get("200", 0)
+    if ok < report["requests"]:
+        failures.append(f"{report['requests'] - ok} requests did not return 200")
+    p95 = report["latency_ms"].get("p95")
+    if args.max_p95_ms is not None and (p95 is None or p95 > args.max_p95_ms):
+        failures.append(f"p95 latency {p95}ms exceeds {args.max_p95_ms}ms")
+    if args.min_throughput is not None and report["throughput_rps"] < args.min_throughput:
+        failures.append(
+            f"throughput {report['throughput_rps']} req/s is below {args.min_throughput}"
+        )
+    if args.max_loop_lag_ms is not None and report["loop_lag_ms"]["p99"] > args.max_loop_lag_ms:
+        failures.append(
+            f"p99 loop lag {report['loop_lag_ms']['p99']}ms exceeds {args.max_loop_lag_ms}ms"
+        )
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--traffic", type=Path, default=DATA_DIR / "load_traffic.jsonl")
+    parser.add_argument("--corpus", type=Path, default=DATA_DIR / "retrieval_corpus.jsonl")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent conversations")
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=0,
+        help="Turns to send, cycling the traffic (default: one pass)",
+    )
+    parser.add_argument("--deadline-seconds", type=float, default=None)
+    parser.add_argument("--topology", default=settings.graph_topology, choices=["router", "tools"])
+    parser.add_argument("--router-mode", default="llm", help="router_mode for the router graph")
+    parser.add_argument("--semantic-cache", action="store_true", help="Enable the semantic cache")
+    parser.add_argument(
+        "--llm-latency",
+        type=Distribution.parse,
+        default=Distribution.parse("lognormal:0.5:0.4"),
+        help="Time to first token per LLM call",
+    )
+    parser.add_argument("--tokens-per-second", type=float, default=80.0)
+    parser.add_argument(
+        "--output-tokens",
+        type=Distribution.parse,
+        default=Distribution.parse("uniform:150:400"),
+        help="Answer length in tokens",
+    )
+    parser.add_argument(
+        "--search-latency",
+        type=Distribution.parse,
+        default=Distribution.parse("lognormal:0.8:0.5"),
+        help="Tavily search latency",
+    )
+    parser.add_argument(
+        "--vector-latency",
+        type=Distribution.parse,
+        default=Distribution.parse("lognormal:0.03:0.3"),
+        help="Vectorstore similarity search latency",
+    )
+    parser.add_argument(
+        "--time-scale", type=float, default=1.0, help="Multiply all simulated latencies"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--log-level", default="WARNING", help="Level for the app's loggers (INFO logs every turn)"
+    )
+    parser.add_argument("--json", type=Path, help="Also write the report to this file")
+    parser.add_argument("--max-p95-ms", type=float, help="Fail if p95 latency is higher")
+    parser.add_argument("--min-throughput", type=float, help="Fail if requests/s is lower")
+    parser.add_argument("--max-loop-lag-ms", type=float, help="Fail if p99 loop lag is higher")
+    args = parser.parse_args()
+
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("ai_assistants"):
+            logging.getLogger(name).setLevel(args.log_level.upper())
+
+    traffic = _load_traffic(args.traffic)
+    print(
+        f"Traffic: {sum(len(c) for c in traffic)} turns in {len(traffic)} conversations  "
+        f"topology: {args.topology}  time scale: {args.time_scale}"
+    )
+    report = asyncio.run(run(args, traffic))
+    _print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    failures = _failures(report, args)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""Benchmark retrieved-context packing on prompt size and relevance.
+
+Each line of the relevance set holds a query and its retrieved candidates,
+labelled with whether they are relevant and a ``group`` shared by passages
+that state the same fact. For every token budget the script compares packed
+context with concatenating all candidates: prompt tokens, recall of distinct
+relevant facts, precision, and how many packed passages repeat a fact.
+
+Usage:
+    python benchmarks/packing_benchmark.py
+    python benchmarks/packing_benchmark.py --budgets 64 128 256 --mmr-lambda 0.5
+"""
+
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from ai_assistants.chatbot.core.context import estimate_tokens
+from ai_assistants.chatbot.core.packing import ContextCandidate, pack_context
+from ai_assistants.chatbot.rag.embeddings import get_embeddings
+from ai_assistants.shared.config import settings
+
+DEFAULT_SET = Path(__file__).parent / "data" / "packing_set.jsonl"
+
+
+def _evaluate(examples: List[Dict], budget: int, mmr_lambda: float, threshold: float) -> None:
+    baseline_tokens = packed_tokens = 0
+    recalls: List[float] = []
+    precisions: List[float] = []
+    repeated = packed_count = 0
+    latencies: List[float] = []
+
+    for example in examples:
+        labelled = example["candidates"]
+        candidates = [ContextCandidate(text=c["text"], source=c.get("source")) for c in labelled]
+        by_text = {c["text"]: c for c in labelled}
+
+        start = time.perf_counter()
+        packed = pack_context(
+            example["query"],
+            candidates,
+            budget,
+            mmr_lambda=mmr_lambda,
+            duplicate_threshold=threshold,
+        )
+        latencies.append(time.perf_counter() - start)
+
+        baseline_tokens += estimate_tokens("\n\n".join(c["text"] for c in labelled))
+        packed_tokens += estimate_tokens(packed.context or "")
+
+        relevant_groups = {c["group"] for c in labelled if c["relevant"]}
+        # Truncated passages are matched by prefix
+        chosen = [
+            by_text.get(c.text) or next(l for l in labelled if l["text"].startswith(c.text))
+            for c in packed.selected
+        ]
+        seen_groups = set()
+        for label in chosen:
+            repeated += label["group"] in seen_groups
+            seen_groups.add(label["group"])
+        packed_count += len(chosen)
+
+        recalls.append(len(seen_groups & relevant_groups) / len(relevant_groups))
+        precisions.append(
+            sum(label["relevant"] for label in chosen) / len(chosen) if chosen else 0.0
+        )
+
+    print(f"budget={budget}")
+    print(f"  prompt tokens:     {packed_tokens} packed vs {baseline_tokens} concatenated "
+          f"({1 - packed_tokens / baseline_tokens:.1%} smaller)")
+    print(f"  fact recall:       {statistics.mean(recalls):.1%}")
+    print(f"  precision:         {statistics.mean(precisions):.1%}")
+    print(f"  repeated facts:    {repeated}/{packed_count} packed passages")
+    print(f"  pack latency:      mean={statistics.mean(latencies) * 1000:.2f}ms "
+          f"max={max(latencies) * 1000:.2f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--set",
+        type=Path,
+        default=DEFAULT_SET,
+        help="JSONL relevance set with 'query' and labelled 'candidates'.",
+    )
+    parser.add_argument(
+        "--budgets",
+        type=int,
+        nargs="+",
+        default=[64, 128, settings.retrieval_token_budget],
+        help="Token budgets to evaluate.",
+    )
+    parser.add_argument("--mmr-lambda", type=float, default=settings.mmr_lambda)
+    parser.add_argument("--threshold", type=float, default=settings.mmr_duplicate_threshold)
+    args = parser.parse_args()
+
+    with open(args.set, encoding="utf-8") as f:
+        examples = [json.loads(line) for line in f if line.strip()]
+
+    scorer = "embeddings" if get_embeddings() is not None else "lexical"
+    print(f"Queries: {len(examples)}  scorer: {scorer}  "
+          f"mmr_lambda: {args.mmr_lambda}  threshold: {args.threshold}")
+    for budget in args.budgets:
+        _evaluate(examples, budget, args.mmr_lambda, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
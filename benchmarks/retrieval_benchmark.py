@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+"""Benchmark dense, keyword and hybrid RAG retrieval.
+
+Loads the corpus into a throwaway Chroma collection and keyword index, then
+reports recall@k and query latency for each retrieval path against the
+labelled queries. Without Chroma or the embedding model only the keyword
+path is measured.
+
+Usage:
+    python benchmarks/retrieval_benchmark.py
+    python benchmarks/retrieval_benchmark.py --k 1 3 5 --pool-size 30 --keyword-weight 2
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from langchain_core.documents import Document
+
+from ai_assistants.chatbot.rag import vectorstore as vectorstore_module
+from ai_assistants.chatbot.rag.hybrid import hybrid_search
+from ai_assistants.chatbot.rag.keyword_index import KeywordIndex
+from ai_assistants.shared.config import settings
+
+DATA_DIR = Path(__file__).parent / "data"
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _evaluate(
+    label: str,
+    search: Callable[[str, int], List[str]],
+    queries: List[Dict],
+    ks: List[int],
+) -> None:
+    max_k = max(ks)
+    recalls: Dict[int, List[float]] = {k: [] for k in ks}
+    latencies: List[float] = []
+
+    for query in queries:
+        start = time.perf_counter()
+        doc_ids = search(query["query"], max_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        relevant = set(query["relevant"])
+        for k in ks:
+            recalls[k].append(len(relevant & set(doc_ids[:k])) / len(relevant))
+
+    recall_text = "  ".join(f"recall@{k}={statistics.mean(recalls[k]):.1%}" for k in ks)
+    print(
+        f"{label:<8} {recall_text}  "
+        f"p50={_percentile(latencies, 50):7.2f}ms p95={_percentile(latencies, 95):7.2f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, default=DATA_DIR / "retrieval_corpus.jsonl")
+    parser.add_argument("--queries", type=Path, default=DATA_DIR / "retrieval_queries.jsonl")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--pool-size", type=int, default=settings.hybrid_candidate_pool)
+    parser.add_argument("--vector-weight", type=float, default=settings.hybrid_vector_weight)
+    parser.add_argument("--keyword-weight", type=float, default=settings.hybrid_keyword_weight)
+    parser.add_argument("--rrf-k", type=int, default=settings.hybrid_rrf_k)
+    args = parser.parse_args()
+
+    with open(args.corpus, encoding="utf-8") as f:
+        corpus = [json.loads(line) for line in f if line.strip()]
+    with open(args.queries, encoding="utf-8") as f:
+        queries = [json.loads(line) for line in f if line.strip()]
+
+    documents = [
+        Document(page_content=doc["text"], metadata={"source": doc["source"], "doc_id": doc["doc_id"]})
+        for doc in corpus
+    ]
+    print(f"Corpus: {len(documents)} chunks  Queries: {len(queries)}  k: {args.k}")
+
+    with tempfile.TemporaryDirectory() as persist_directory:
+        settings.chroma_persist_directory = persist_directory
+        vectorstore = vectorstore_module.initialize_vectorstore(documents)
+
+        index = vectorstore_module.get_keyword_index()
+        if index is None:
+            index = KeywordIndex()
+            for doc in corpus:
+                index.add(doc["doc_id"], doc["text"], {"doc_id": doc["doc_id"]})
+
+        def keyword(query: str, k: int) -> List[str]:
+            return [index.get(doc_id)[1]["doc_id"] for doc_id, _ in index.search(query, k)]
+
+        if vectorstore is None:
+            print("Vectorstore unavailable (Chroma or embeddings missing); keyword path only")
+            _evaluate("keyword", keyword, queries, args.k)
+            return
+
+        # Warm up the embedding model so load time is not counted as latency
+        vectorstore.similarity_search("warm up", k=1)
+
+        def vector(query: str, k: int) -> List[str]:
+            return [doc.metadata["doc_id"] for doc in vectorstore.similarity_search(query, k=k)]
+
+        def hybrid(query: str, k: int) -> List[str]:
+            docs = hybrid_search(
+                query,
+                k,
+                pool_size=max(args.pool_size, k),
+                vector_weight=args.vector_weight,
+                keyword_weight=args.keyword_weight,
+                rrf_k=args.rrf_k,
+            )
+            return [doc.metadata["doc_id"] for doc in docs]
+
+        _evaluate("vector", vector, queries, args.k)
+        _evaluate("keyword", keyword, queries, args.k)
+        _evaluate("hybrid", hybrid, queries, args.k)
+
+
+if __name__ == "__main__":
+    main()
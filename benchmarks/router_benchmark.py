@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+"""Benchmark the hybrid query router against the LLM router.
+
+Scores the decision hybrid routing would make: the local router's when it
+is at least ``router_confidence_threshold`` confident, otherwise the LLM's.
+Also reports how accurate the kept local decisions are, how often hybrid
+falls back, and how long each path takes. Reference decisions come from the
+labels in the query file (recorded LLM router outputs, which also stand in
+for the LLM fallback) or, with ``--live``, from calling the LLM router
+directly.
+
+Usage:
+    python benchmarks/router_benchmark.py --queries benchmarks/data/router_queries.jsonl
+    python benchmarks/router_benchmark.py --live
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from ai_assistants.chatbot.core.nodes import _route_with_llm
+from ai_assistants.chatbot.core.router import route_locally
+from ai_assistants.shared.config import settings
+
+DEFAULT_QUERIES = Path(__file__).parent / "data" / "router_queries.jsonl"
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _latency_summary(label: str, latencies: List[float]) -> str:
+    ms = [x * 1000 for x in latencies]
+    return (
+        f"{label:<10} p50={_percentile(ms, 50):8.2f}ms "
+        f"p95={_percentile(ms, 95):8.2f}ms mean={statistics.mean(ms):8.2f}ms"
+    )
+
+
+async def run(queries: List[Dict], live: bool) -> None:
+    # Warm up the embedding model so load time is not counted as latency
+    await route_locally("warm up")
+
+    threshold = settings.router_confidence_threshold
+    local_latencies: List[float] = []
+    llm_latencies: List[float] = []
+    hybrid_latencies: List[float] = []
+    exact = web_agree = rag_agree = 0
+    kept = kept_exact = 0
+    sources: Dict[str, int] = {}
+
+    for query in queries:
+        message = query["message"]
+
+        start = time.perf_counter()
+        local = await route_locally(message)
+        local_latency = time.perf_counter() - start
+        local_latencies.append(local_latency)
+
+        llm_latency = 0.0
+        if live:
+            start = time.perf_counter()
+            reference = await _route_with_llm(message)
+            llm_latency = time.perf_counter() - start
+            llm_latencies.append(llm_latency)
+            expected = (reference.should_search_web, reference.should_use_rag)
+        else:
+            expected = (query["should_search_web"], query["should_use_rag"])
+
+        if local is not None and local.confidence >= threshold:
+            # Hybrid keeps the local decision
+            kept += 1
+            decision = (local.should_search_web, local.should_use_rag)
+            kept_exact += decision == expected
+            sources[local.source] = sources.get(local.source, 0) + 1
+            hybrid_latencies.append(local_latency)
+        else:
+            # Hybrid falls back to the LLM, whose decision is the reference
+            decision = expected
+            sources["llm"] = sources.get("llm", 0) + 1
+            hybrid_latencies.append(local_latency + llm_latency)
+
+        web_agree += decision[0] == expected[0]
+        rag_agree += decision[1] == expected[1]
+        exact += decision == expected
+
+    total = len(queries)
+    print(f"Queries:               {total}")
+    print(f"Hybrid exact:          {exact / total:.1%}")
+    print(f"Hybrid web agreement:  {web_agree / total:.1%}")
+    print(f"Hybrid RAG agreement:  {rag_agree / total:.1%}")
+    print(f"Local decisions kept:  {kept / total:.1%} "
+          f"({kept_exact / kept if kept else 0:.1%} exact, threshold {threshold})")
+    print(f"LLM fallback rate:     {(total - kept) / total:.1%}")
+    print(f"Decision sources:      {sources}")
+    print(_latency_summary("local", local_latencies))
+    if llm_latencies:
+        print(_latency_summary("llm", llm_latencies))
+        print(_latency_summary("hybrid", hybrid_latencies))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--queries",
+        type=Path,
+        default=DEFAULT_QUERIES,
+        help="JSONL file with 'message' and optional reference labels.",
+    )
+    parser.add_argument(
+        "--live",
+        action="store_true",
+        help="Call the LLM router for reference decisions (needs ANTHROPIC_API_KEY).",
+    )
+    args = parser.parse_args()
+
+    with open(args.queries, encoding="utf-8") as f:
+        queries = [json.loads(line) for line in f if line.strip()]
+
+    asyncio.run(run(queries, args.live))
+
+
+if __name__ == "__main__":
+    main()
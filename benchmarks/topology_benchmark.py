@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+"""Benchmark the router graph against the tool-calling graph.
+
+Replays the recorded query set through both ``graph_topology`` settings and
+reports end-to-end latency and LLM calls per query, overall and by which
+retrieval sources the query needs. By default the LLM, knowledge base and web
+search are simulated with fixed latencies and the model replays the
+recorded router labels, so the comparison isolates the topology. With
+``--live`` the configured models and services are called instead (needs
+ANTHROPIC_API_KEY, and TAVILY_API_KEY for web search).
+
+Usage:
+    python benchmarks/topology_benchmark.py
+    python benchmarks/topology_benchmark.py --llm-overhead 0.6 --tokens-per-second 60
+    python benchmarks/topology_benchmark.py --live
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from ai_assistants.chatbot.core import nodes
+from ai_assistants.chatbot.core.checkpoint import thread_config
+from ai_assistants.chatbot.core.graph import create_graph
+from ai_assistants.chatbot.core.metrics import EXTERNAL_LATENCY
+from ai_assistants.chatbot.core.packing import ContextCandidate
+from ai_assistants.chatbot.core.prompts import ROUTER_PROMPT
+from ai_assistants.chatbot.core.state import turn_input
+from ai_assistants.chatbot.tools.definitions import RETRIEVE_DOCUMENTS_TOOL, SEARCH_WEB_TOOL
+from ai_assistants.shared.config import settings
+
+DEFAULT_QUERIES = Path(__file__).parent / "data" / "router_queries.jsonl"
+
+# Simulated output lengths, in tokens
+ROUTER_OUTPUT_TOKENS = 30
+TOOL_CALL_TOKENS = 40
+ANSWER_TOKENS = 250
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, list):
+        return "".join(block.get("text", "") for block in content if isinstance(block, dict))
+    return content
+
+
+def _user_message(messages: List[BaseMessage]) -> str:
+    """Get the user's question: the last text block of the last human message."""
+    for message in reversed(messages):
+        if message.type == "human":
+            content = message.content
+            if isinstance(content, list):
+                return content[-1].get("text", "") if content else ""
+            return content
+    return ""
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model that replays recorded routing decisions with simulated latency.
+
+    Router calls return the recorded decision as JSON. Generation calls
+    with tools request the recorded sources as parallel tool calls, then
+    answer once tool results are present.
+    """
+
+    labels: Dict[str, Tuple[bool, bool]]
+    overhead: float
+    tokens_per_second: float
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: List[Dict[str, Any]], **kwargs: Any) -> Any:
+        return self.bind(tools=tools, **kwargs)
+
+    def _generate(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, **kwargs: Any
+    ) -> ChatResult:
+        raise NotImplementedError("ScriptedChatModel is async only")
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        question = _user_message(messages)
+        web, rag = self.labels.get(question, (False, False))
+        has_tool_results = any(isinstance(m, ToolMessage) for m in messages)
+
+        if ROUTER_PROMPT in _text(messages[0].content):
+            tokens = ROUTER_OUTPUT_TOKENS
+            message = AIMessage(
+                content=json.dumps({"should_search_web": web, "should_use_rag": rag})
+            )
+        elif tools and (web or rag) and not has_tool_results:
+            requested = ((RETRIEVE_DOCUMENTS_TOOL, rag), (SEARCH_WEB_TOOL, web))
+            names = [name for name, wanted in requested if wanted]
+            tokens = TOOL_CALL_TOKENS * len(names)
+            message = AIMessage(
+                content="",
+                tool_calls=[
+                    {"name": name, "args": {"query": question}, "id": f"call_{i}"}
+                    for i, name in enumerate(names)
+                ],
+            )
+        else:
+            tokens = ANSWER_TOKENS
+            message = AIMessage(content="word " * ANSWER_TOKENS)
+
+        await asyncio.sleep(self.overhead + tokens / self.tokens_per_second)
+        message.usage_metadata = {
+            "input_tokens": sum(len(_text(m.content)) // 4 for m in messages),
+            "output_tokens": tokens,
+            "total_tokens": tokens,
+        }
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def _simulate(queries: List[Dict], args: argparse.Namespace) -> None:
+    """Replace the LLM and retrieval services with simulated ones."""
+    model = ScriptedChatModel(
+        labels={q["message"]: (q["should_search_web"], q["should_use_rag"]) for q in queries},
+        overhead=args.llm_overhead,
+        tokens_per_second=args.tokens_per_second,
+    )
+    nodes.get_anthropic_llm = lambda model_name=None: model
+
+    async def retrieve_rag(query: str) -> List[ContextCandidate]:
+        await asyncio.sleep(args.rag_latency)
+        return [ContextCandidate(text=f"Passage about {query}", source="kb", origin="rag")]
+
+    async def retrieve_web(query: str) -> List[ContextCandidate]:
+        await asyncio.sleep(args.web_latency)
+        return [ContextCandidate(text=f"Result on {query}", source="https://x.test", origin="web")]
+
+    nodes._retrieve_rag = retrieve_rag
+    nodes._retrieve_web = retrieve_web
+
+    # Keep the comparison about topology: no caching, hedging or client-side limits
+    settings.semantic_cache_enabled = False
+    settings.hedging_enabled = False
+    settings.rate_limit_enabled = False
+    settings.cascade_enabled = False
+
+
+def _llm_calls() -> int:
+    return sum(
+        EXTERNAL_LATENCY.count(service="anthropic", operation=operation)
+        for operation in ("route", "generate")
+    )
+
+
+def _category(query: Dict) -> str:
+    sources = (("rag", "should_use_rag"), ("web", "should_search_web"))
+    needs = [name for name, key in sources if query.get(key)]
+    return "+".join(needs) or "none"
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_topology(topology: str, queries: List[Dict]) -> List[Tuple[str, float, int]]:
+    """Run every query through a fresh graph and get (category, seconds, LLM calls)."""
+    settings.graph_topology = topology
+    graph = create_graph()
+
+    results = []
+    for query in queries:
+        conversation_id = str(uuid.uuid4())
+        calls_before = _llm_calls()
+        start = time.perf_counter()
+        await graph.ainvoke(
+            turn_input(conversation_id, query["message"]), thread_config(conversation_id)
+        )
+        elapsed = time.perf_counter() - start
+        results.append((_category(query), elapsed, _llm_calls() - calls_before))
+    return results
+
+
+def _report(topology: str, results: List[Tuple[str, float, int]]) -> None:
+    groups: Dict[str, List[Tuple[float, int]]] = {"all": []}
+    for category, seconds, calls in results:
+        groups["all"].append((seconds, calls))
+        groups.setdefault(category, []).append((seconds, calls))
+
+    for name, rows in groups.items():
+        ms = [seconds * 1000 for seconds, _ in rows]
+        calls = statistics.mean(c for _, c in rows)
+        print(
+            f"{topology:<7} {name:<9} n={len(rows):<3} "
+            f"p50={_percentile(ms, 50):8.1f}ms p95={_percentile(ms, 95):8.1f}ms "
+            f"mean={statistics.mean(ms):8.1f}ms  llm_calls={calls:.2f}"
+        )
+
+
+async def run(queries: List[Dict], topologies: List[str]) -> None:
+    for topology in topologies:
+        _report(topology, await run_topology(topology, queries))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=Path, default=DEFAULT_QUERIES)
+    parser.add_argument("--topologies", nargs="+", default=["router", "tools"])
+    parser.add_argument("--router-mode", default="llm", help="router_mode for the router graph")
+    parser.add_argument("--live", action="store_true", help="Call the real LLM and services")
+    parser.add_argument(
+        "--llm-overhead", type=float, default=0.4, help="Seconds per LLM call before output"
+    )
+    parser.add_argument("--tokens-per-second", type=float, default=80.0)
+    parser.add_argument("--rag-latency", type=float, default=0.05)
+    parser.add_argument("--web-latency", type=float, default=0.8)
+    args = parser.parse_args()
+
+    with open(args.queries, encoding="utf-8") as f:
+        queries = [json.loads(line) for line in f if line.strip()]
+
+    settings.router_mode = args.router_mode
+    # Each query is a fresh conversation; keep checkpoints out of ./data
+    settings.checkpointer_backend = "memory"
+    if not args.live:
+        _simulate(queries, args)
+
+    print(f"Queries: {len(queries)}  mode: {'live' if args.live else 'simulated'}")
+    asyncio.run(run(queries, args.topologies))
+
+
+if __name__ == "__main__":
+    main()
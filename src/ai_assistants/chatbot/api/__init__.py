@@ -1,5 +1,6 @@
 """API layer for the chatbot."""
 
 from ai_assistants.chatbot.api.routes import router
+from ai_assistants.chatbot.api.websocket import ws_router
 
-__all__ = ["router"]
+__all__ = ["router", "ws_router"]
@@ -0,0 +1,157 @@
+"""Admission control and load shedding for graph execution."""
+
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from ai_assistants.chatbot.core.metrics import REGISTRY
+from ai_assistants.shared.config import settings
+from ai_assistants.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+ADMISSION_ACTIVE = REGISTRY.gauge(
+    "chatbot_admission_active", "Requests currently holding an execution slot."
+)
+ADMISSION_QUEUE_DEPTH = REGISTRY.gauge(
+    "chatbot_admission_queue_depth", "Requests waiting for an execution slot."
+)
+ADMISSION_WAIT = REGISTRY.histogram(
+    "chatbot_admission_wait_seconds", "Time spent waiting for an execution slot."
+)
+ADMISSION_REJECTED = REGISTRY.counter(
+    "chatbot_admission_rejected_total",
+    "Requests shed by admission control.",
+    ["reason"],
+)
+
+
+class OverloadedError(Exception):
+    """Raised when a request cannot be admitted.
+
+    Attributes:
+        reason: "queue_full" or "timeout".
+        retry_after: Seconds the client should wait before retrying.
+    """
+
+    def __init__(self, reason: str, retry_after: int) -> None:
+        super().__init__(f"Server overloaded ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Admission:
+    """A held execution slot that is returned at most once.
+
+    Useful when several code paths may end the work holding the slot, e.g. a
+    streamed response that may or may not get to iterate its body.
+    """
+
+    def __init__(self, controller: "AdmissionController") -> None:
+        self._controller = controller
+        self._released = False
+
+    def release(self) -> None:
+        """Return the slot; later calls do nothing."""
+        if not self._released:
+            self._released = True
+            self._controller.release()
+
+
+class AdmissionController:
+    """Concurrency limiter with a bounded, deadline-limited wait queue.
+
+    At most ``max_concurrent`` requests run at once. Up to ``max_queue``
+    more may wait for ``queue_timeout`` seconds; anything beyond that is
+    rejected immediately, so overload sheds fast instead of timing out slowly.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 32,
+        max_queue: int = 64,
+        queue_timeout: float = 5.0,
+        retry_after: Optional[int] = None,
+    ) -> None:
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after or max(1, math.ceil(queue_timeout))
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._waiting = 0
+        self._active = 0
+
+    def _reject(self, reason: str) -> OverloadedError:
+        ADMISSION_REJECTED.inc(reason=reason)
+        logger.warning(f"Shedding request: {reason} ({self._waiting} waiting)")
+        return OverloadedError(reason, self.retry_after)
+
+    async def acquire(self) -> None:
+        """Wait for an execution slot.
+
+        Raises:
+            OverloadedError: If the queue is full or the wait deadline passes.
+        """
+        # Count requests still acquiring too, since a free slot is only taken
+        # once the waiter runs
+        if self._active + self._waiting >= self.max_concurrent + self.max_queue:
+            raise self._reject("queue_full")
+
+        self._waiting += 1
+        ADMISSION_QUEUE_DEPTH.set(self._waiting)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise self._reject("timeout") from None
+        finally:
+            self._waiting -= 1
+            ADMISSION_QUEUE_DEPTH.set(self._waiting)
+            ADMISSION_WAIT.observe(time.perf_counter() - start)
+
+        self._active += 1
+        ADMISSION_ACTIVE.set(self._active)
+
+    def release(self) -> None:
+        """Return an execution slot."""
+        self._active -= 1
+        ADMISSION_ACTIVE.set(self._active)
+        self._semaphore.release()
+
+    async def admit(self) -> Admission:
+        """Wait for an execution slot and get a handle that releases it once.
+
+        Raises:
+            OverloadedError: If the queue is full or the wait deadline passes.
+        """
+        await self.acquire()
+        return Admission(self)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold an execution slot for the duration of the block."""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+# Global controller instance
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get the process-wide admission controller."""
+    global _controller
+
+    if _controller is None:
+        _controller = AdmissionController(
+            max_concurrent=settings.admission_max_concurrent,
+            max_queue=settings.admission_max_queue,
+            queue_timeout=settings.admission_queue_timeout_seconds,
+            retry_after=settings.admission_retry_after_seconds,
+        )
+    return _controller
@@ -0,0 +1,118 @@
+"""Cancel request work when the HTTP client goes away."""
+
+import asyncio
+from typing import AsyncIterator, Awaitable, TypeVar
+
+from fastapi import Request
+
+from ai_assistants.chatbot.core.metrics import REGISTRY
+from ai_assistants.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+ABANDONED_REQUESTS = REGISTRY.counter(
+    "chatbot_abandoned_requests_total",
+    "Requests cancelled because the client disconnected before completion.",
+    ["endpoint"],
+)
+
+# Frames buffered ahead of a slow streaming client
+STREAM_BUFFER_FRAMES = 64
+
+
+class ClientDisconnected(Exception):
+    """Raised when the client disconnects before the work completes."""
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    """Return once the server reports that the client disconnected.
+
+    The request body has already been read, so the next ASGI message is the
+    disconnect (sent when the client goes away or the response completes).
+    """
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def _cancel(task: asyncio.Future) -> None:
+    """Cancel a task and wait for it to unwind."""
+    task.cancel()
+    try:
+        await task
+    except BaseException:
+        pass
+
+
+async def run_until_disconnect(request: Request, work: Awaitable[T], endpoint: str) -> T:
+    """Await work, cancelling it if the client disconnects first.
+
+    Cancellation propagates into the awaited graph run, so in-flight LLM and
+    search calls are abandoned and the admission slot is freed right away.
+
+    Raises:
+        ClientDisconnected: If the client went away before the work finished.
+    """
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        if not task.done():
+            await _cancel(task)
+        if not watcher.done():
+            await _cancel(watcher)
+
+    if task.cancelled() and watcher.done():
+        ABANDONED_REQUESTS.inc(endpoint=endpoint)
+        logger.info(f"Client disconnected, cancelled {endpoint} request")
+        raise ClientDisconnected()
+    return task.result()
+
+
+async def stream_until_disconnect(
+    request: Request, frames: AsyncIterator[T], endpoint: str
+) -> AsyncIterator[T]:
+    """Relay streamed frames, cancelling the producer if the client disconnects.
+
+    Frames are produced in a separate task so a disconnect is noticed even
+    while nothing is being sent (e.g. during retrieval), not only on the
+    next write.
+    """
+    queue: "asyncio.Queue[T]" = asyncio.Queue(maxsize=STREAM_BUFFER_FRAMES)
+
+    async def produce() -> None:
+        async for frame in frames:
+            await queue.put(frame)
+
+    producer = asyncio.ensure_future(produce())
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        while True:
+            get = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait(
+                {get, producer, watcher}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if get in done:
+                yield get.result()
+                continue
+
+            await _cancel(get)
+            if watcher in done:
+                return
+
+            # The producer finished: surface its error, then drain the buffer
+            producer.result()
+            while not queue.empty():
+                yield queue.get_nowait()
+            return
+    finally:
+        if not producer.done():
+            ABANDONED_REQUESTS.inc(endpoint=endpoint)
+            logger.info(f"Client disconnected, cancelled {endpoint} stream")
+            await _cancel(producer)
+        if not watcher.done():
+            await _cancel(watcher)
@@ -1,29 +1,83 @@
 """API routes for the chatbot."""
 
+import json
 import uuid
-from typing import Dict
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
 
-from fastapi import APIRouter, HTTPException
-from langgraph.graph import StateGraph
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
 
+from ai_assistants.chatbot.api.admission import (
+    Admission,
+    OverloadedError,
+    get_admission_controller,
+)
+from ai_assistants.chatbot.api.disconnect import (
+    ClientDisconnected,
+    run_until_disconnect,
+    stream_until_disconnect,
+)
 from ai_assistants.chatbot.api.schemas import (
     ChatRequest,
     ChatResponse,
     ConversationHistory,
     HealthResponse,
 )
-from ai_assistants.chatbot.core.graph import create_graph
+from ai_assistants.chatbot.core.cascade import get_cascade_stats
+from ai_assistants.chatbot.core.checkpoint import (
+    delete_thread,
+    get_checkpointer,
+    prune_thread,
+    thread_config,
+)
+from ai_assistants.chatbot.core.coalescing import (
+    first_turn_key,
+    run_coalesced,
+    stream_coalesced,
+)
+from ai_assistants.chatbot.core.compression import get_compression_stats
+from ai_assistants.chatbot.core.context import schedule_summary_update
+from ai_assistants.chatbot.core.graph import get_graph
+from ai_assistants.chatbot.core.hedging import get_hedging_stats
+from ai_assistants.chatbot.core.semantic_cache import get_semantic_cache
+from ai_assistants.chatbot.core.speculation import get_speculation_stats
+from ai_assistants.chatbot.core.state import turn_input
+from ai_assistants.chatbot.store import get_conversation_store
+from ai_assistants.chatbot.tools import get_search_stats
 from ai_assistants.shared.logging import get_logger
 
 logger = get_logger(__name__)
 
 router = APIRouter(prefix="/api/v1", tags=["chat"])
 
-# In-memory conversation store (replace with persistent storage in production)
-conversations: Dict[str, list] = {}
+# Graph nodes whose start/end are reported to streaming clients
+STREAMED_NODES = ("route", "retrieve", "generate")
+
+FALLBACK_RESPONSE = "I apologize, but I couldn't generate a response."
+
+# Non-standard status (nginx convention) logged for requests the client abandoned
+CLIENT_CLOSED_REQUEST = 499
+
+
+def _format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Format a single Server-Sent Event frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 
-# Create the LangGraph workflow
-graph: StateGraph = create_graph()
+def _chunk_text(chunk: Any) -> str:
+    """Extract the text delta from a streamed LLM message chunk."""
+    content = getattr(chunk, "content", "")
+    if isinstance(content, str):
+        return content
+
+    # Anthropic chunks may carry a list of content blocks
+    return "".join(
+        block.get("text", "")
+        for block in content
+        if isinstance(block, dict) and block.get("type") == "text"
+    )
 
 
 @router.get("/health", response_model=HealthResponse)
@@ -32,75 +86,325 @@ async def health_check() -> HealthResponse:
     return HealthResponse()
 
 
-@router.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest) -> ChatResponse:
-    """Process a chat message and return a response."""
-    conversation_id = request.conversation_id or str(uuid.uuid4())
+@router.get("/stats")
+async def stats() -> Dict[str, Any]:
+    """Cache, speculative retrieval, web compression, hedging and cascade counters."""
+    return {
+        "semantic_cache": get_semantic_cache().stats(),
+        "speculative_retrieval": get_speculation_stats().stats(),
+        "web_search_cache": get_search_stats(),
+        "web_compression": get_compression_stats().stats(),
+        "hedging": get_hedging_stats(),
+        "model_cascade": get_cascade_stats().stats(),
+    }
+
 
-    # Get or create conversation history
-    if conversation_id not in conversations:
-        conversations[conversation_id] = []
+async def _is_new_conversation(conversation_id: str, server_generated: bool) -> bool:
+    """Check that a conversation has no earlier turns in the store or its checkpoints."""
+    if server_generated:
+        return True
+    if get_conversation_store().get(conversation_id) is not None:
+        return False
+    if get_checkpointer() is None:
+        # Without checkpoints, history comes only from the store
+        return True
+    snapshot = await get_graph().aget_state(thread_config(conversation_id))
+    return not snapshot.values.get("messages")
 
-    # Add user message to history
-    conversations[conversation_id].append(
-        {"role": "user", "content": request.message}
+
+@router.post("/chat", response_model=ChatResponse)
+async def chat(request: ChatRequest, http_request: Request) -> ChatResponse:
+    """Process a chat message and return a response.
+
+    If the client disconnects first, the graph run is cancelled and the
+    turn is not recorded. Steps dropped to meet the request deadline are
+    listed in ``skipped_steps``.
+    """
+    conversation_id = request.conversation_id or str(uuid.uuid4())
+    new_conversation = await _is_new_conversation(
+        conversation_id, server_generated=request.conversation_id is None
     )
+    graph_input = turn_input(conversation_id, request.message, request.deadline_seconds)
+
+    async def run_graph() -> Dict[str, Any]:
+        # Wait for an execution slot; OverloadedError becomes a 503 response
+        async with get_admission_controller().slot():
+            result = await get_graph().ainvoke(graph_input, thread_config(conversation_id))
+        await prune_thread(conversation_id)
+        return result
 
     try:
-        # Run the graph
-        result = await graph.ainvoke(
-            {
-                "messages": conversations[conversation_id],
-                "conversation_id": conversation_id,
-            }
+        # Identical first-turn messages in flight share one graph run
+        result = await run_until_disconnect(
+            http_request,
+            run_coalesced(first_turn_key(request.message, new_conversation), run_graph),
+            "chat",
         )
+    except ClientDisconnected:
+        # Nobody is listening; the status code is only for access logs
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    except OverloadedError:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing chat: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Extract response
-        response_message = result.get("response", "I apologize, but I couldn't generate a response.")
-        sources = result.get("sources", [])
+    # Extract response
+    response_message = result.get("response", FALLBACK_RESPONSE)
+    sources = result.get("sources", [])
 
-        # Add assistant response to history
-        conversations[conversation_id].append(
-            {"role": "assistant", "content": response_message}
-        )
+    # Record the completed turn in history, creating the conversation if needed
+    store = get_conversation_store()
+    store.append(conversation_id, "user", request.message)
+    store.append(conversation_id, "assistant", response_message)
+    schedule_summary_update(conversation_id)
+
+    return ChatResponse(
+        message=response_message,
+        conversation_id=conversation_id,
+        sources=sources if sources else None,
+        usage=result.get("token_usage"),
+        skipped_steps=result.get("skipped_steps") or None,
+    )
+
+
+async def _graph_events(
+    conversation_id: str, message: str, deadline_seconds: Optional[float] = None
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """Run the graph for one turn and yield its (event, data) pairs.
+
+    Yields ``node``, ``token`` and ``reset`` events while the graph runs, then
+    a ``final_state`` event carrying the graph's output.
+    """
+    graph_input = turn_input(conversation_id, message, deadline_seconds)
+    streamed = False
+    final_state: Dict[str, Any] = {}
+
+    async for event in get_graph().astream_events(
+        graph_input, thread_config(conversation_id), version="v2"
+    ):
+        kind = event["event"]
+        name = event.get("name")
+        node = event.get("metadata", {}).get("langgraph_node")
+
+        if kind == "on_chat_model_start" and node == "generate" and streamed:
+            # A new generator call supersedes the text streamed so far: it
+            # came from a tool-calling round or a failed attempt
+            streamed = False
+            yield "reset", {}
+
+        elif kind == "on_chat_model_stream" and node == "generate":
+            # Only the generator's tokens are user-facing; router output is JSON
+            token = _chunk_text(event["data"].get("chunk"))
+            if token:
+                streamed = True
+                yield "token", {"content": token}
+
+        elif (
+            kind in ("on_chain_start", "on_chain_end")
+            and name in STREAMED_NODES
+            and node == name
+        ):
+            status = "started" if kind == "on_chain_start" else "completed"
+            yield "node", {"node": name, "status": status}
+
+        elif kind == "on_chain_end" and not event.get("parent_ids"):
+            # The root run's output is the final graph state
+            output = event["data"].get("output")
+            if isinstance(output, dict):
+                final_state = output
+
+    await prune_thread(conversation_id)
+    yield "final_state", final_state
 
-        return ChatResponse(
-            message=response_message,
-            conversation_id=conversation_id,
-            sources=sources if sources else None,
+
+async def stream_turn(
+    conversation_id: str,
+    message: str,
+    deadline_seconds: Optional[float] = None,
+    server_generated: bool = False,
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """Run one chat turn and yield (event, data) pairs for streaming transports.
+
+    Yields ``start``, then ``node`` and ``token`` events while the graph
+    runs, then ``sources``, ``usage`` (when token counts are available) and
+    ``done``, which lists any ``skipped_steps``. A ``reset`` event means the
+    tokens streamed so far are superseded (a tool-calling round, a failed
+    attempt before escalation, or a fallback answer) and should be
+    discarded; the tokens after it make up the response. Failures are reported as an
+    ``error`` event. The turn is recorded in the conversation store once it
+    completes.
+
+    Identical first turns of new conversations in flight share one graph
+    run, as on ``/chat``; each stream still records the turn under its own
+    conversation.
+
+    Args:
+        conversation_id: Conversation the turn belongs to.
+        message: The user message.
+        deadline_seconds: Optional override of the request deadline.
+        server_generated: Whether the server generated ``conversation_id``
+            for this turn, so it cannot have history.
+    """
+    store = get_conversation_store()
+    yield "start", {"conversation_id": conversation_id}
+
+    streamed_parts = []
+    final_state: Dict[str, Any] = {}
+
+    try:
+        new_conversation = await _is_new_conversation(conversation_id, server_generated)
+        events = stream_coalesced(
+            first_turn_key(message, new_conversation),
+            lambda: _graph_events(conversation_id, message, deadline_seconds),
         )
+        async with aclosing(events):
+            async for event, data in events:
+                if event == "final_state":
+                    final_state = data
+                    continue
+                if event == "reset":
+                    streamed_parts = []
+                elif event == "token":
+                    streamed_parts.append(data["content"])
+                yield event, data
 
     except Exception as e:
-        logger.error(f"Error processing chat: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error(f"Error streaming chat: {e}")
+        yield "error", {"detail": str(e)}
+        return
+
+    response_message = final_state.get("response") or "".join(streamed_parts) or FALLBACK_RESPONSE
+    sources = final_state.get("sources", [])
+
+    # Generation that ran out of time or failed answers with a fallback instead
+    if streamed_parts and "".join(streamed_parts) != response_message:
+        streamed_parts = []
+        yield "reset", {}
+
+    # Nodes that answer without the LLM (e.g. cache hits) never stream tokens
+    if not streamed_parts:
+        yield "token", {"content": response_message}
+
+    # Record the completed turn in history, creating the conversation if needed
+    store.append(conversation_id, "user", message)
+    store.append(conversation_id, "assistant", response_message)
+    schedule_summary_update(conversation_id)
+
+    yield "sources", {"sources": sources}
+    if final_state.get("token_usage"):
+        yield "usage", final_state["token_usage"]
+    yield "done", {
+        "conversation_id": conversation_id,
+        "skipped_steps": final_state.get("skipped_steps") or [],
+    }
+
+
+async def _sse_frames(
+    conversation_id: str,
+    message: str,
+    deadline_seconds: Optional[float] = None,
+    server_generated: bool = False,
+) -> AsyncIterator[str]:
+    """Format a streamed chat turn as SSE frames."""
+    async for event, data in stream_turn(
+        conversation_id, message, deadline_seconds, server_generated
+    ):
+        yield _format_sse(event, data)
+
+
+async def _stream_chat(
+    http_request: Request,
+    admission: Admission,
+    conversation_id: str,
+    message: str,
+    deadline_seconds: Optional[float] = None,
+    server_generated: bool = False,
+) -> AsyncIterator[str]:
+    """Stream a chat turn while holding an admission slot.
+
+    The turn is cancelled as soon as the client disconnects.
+    """
+    try:
+        async for frame in stream_until_disconnect(
+            http_request,
+            _sse_frames(conversation_id, message, deadline_seconds, server_generated),
+            "chat_stream",
+        ):
+            yield frame
+    finally:
+        admission.release()
+
+
+class _AdmittedStreamingResponse(StreamingResponse):
+    """Streaming response that returns its admission slot however it ends.
+
+    The body releases the slot when it finishes, but it never starts if
+    sending the response start fails; releasing here covers that case too.
+    """
+
+    def __init__(self, admission: Admission, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.admission = admission
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.admission.release()
+
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest, http_request: Request) -> StreamingResponse:
+    """Process a chat message and stream the response as Server-Sent Events.
+
+    Emits ``start``, ``node`` and ``token`` events while the graph runs (with
+    ``reset`` when the tokens so far are superseded), then a final
+    ``sources`` event, a ``usage`` event when token counts are available,
+    and ``done`` with any ``skipped_steps``. Failures are reported as an
+    ``error`` event.
+    """
+    conversation_id = request.conversation_id or str(uuid.uuid4())
+
+    # Acquire the slot before streaming so overload is reported as a 503;
+    # it is released when the stream ends or the response fails to start
+    admission = await get_admission_controller().admit()
+
+    return _AdmittedStreamingResponse(
+        admission,
+        _stream_chat(
+            http_request,
+            admission,
+            conversation_id,
+            request.message,
+            request.deadline_seconds,
+            server_generated=request.conversation_id is None,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/conversations/{conversation_id}", response_model=ConversationHistory)
 async def get_conversation(conversation_id: str) -> ConversationHistory:
     """Get conversation history by ID."""
-    if conversation_id not in conversations:
+    conversation = get_conversation_store().get(conversation_id)
+    if conversation is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
-    from datetime import datetime
-
-    messages = [
-        {"role": msg["role"], "content": msg["content"], "timestamp": datetime.utcnow()}
-        for msg in conversations[conversation_id]
-    ]
-
     return ConversationHistory(
         conversation_id=conversation_id,
-        messages=messages,
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow(),
+        messages=conversation.messages,
+        created_at=conversation.created_at,
+        updated_at=conversation.updated_at,
     )
 
 
 @router.delete("/conversations/{conversation_id}")
 async def delete_conversation(conversation_id: str) -> Dict[str, str]:
     """Delete a conversation."""
-    if conversation_id not in conversations:
+    if not get_conversation_store().delete(conversation_id):
         raise HTTPException(status_code=404, detail="Conversation not found")
+    await delete_thread(conversation_id)
 
-    del conversations[conversation_id]
     return {"status": "deleted", "conversation_id": conversation_id}
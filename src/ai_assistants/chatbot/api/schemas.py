@@ -1,7 +1,7 @@
 """Request and response schemas for the chatbot API."""
 
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -21,6 +21,12 @@ class ChatRequest(BaseModel):
     conversation_id: Optional[str] = Field(
         None, description="Optional conversation ID for context"
     )
+    deadline_seconds: Optional[float] = Field(
+        None,
+        gt=0,
+        le=300,
+        description="Time budget for the turn; overrides the server default",
+    )
 
 
 class ChatResponse(BaseModel):
@@ -31,6 +37,12 @@ class ChatResponse(BaseModel):
     sources: Optional[List[str]] = Field(
         None, description="Sources used in the response"
     )
+    usage: Optional[Dict[str, int]] = Field(
+        None, description="Token usage, including prompt-cache reads and writes"
+    )
+    skipped_steps: Optional[List[str]] = Field(
+        None, description="Steps skipped or degraded to meet the deadline"
+    )
 
 
 class ConversationHistory(BaseModel):
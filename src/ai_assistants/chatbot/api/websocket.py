@@ -0,0 +1,298 @@
+"""WebSocket chat sessions.
+
+Protocol (JSON text frames):
+
+Client to server:
+    ``{"type": "message", "content": "..."}`` starts a turn; sent while a
+    turn is streaming, it cancels that turn first. An optional
+    ``"deadline_seconds"`` overrides the server's per-turn deadline.
+    ``{"type": "cancel"}`` cancels the streaming turn.
+    ``{"type": "ping"}`` / ``{"type": "pong"}`` keep the connection alive.
+
+Server to client:
+    ``{"type": "session", "session_id": ..., "conversation_id": ...}`` on connect,
+    then per turn the same events as ``/chat/stream`` (``start``, ``node``,
+    ``token``, ``reset``, ``sources``, ``usage``, ``done``, ``error``) as
+    ``{"type": event, ...}``, plus ``cancelled``, and ``ping`` / ``pong`` for
+    keep-alive.
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from starlette.websockets import WebSocketState
+
+from ai_assistants.chatbot.api.admission import OverloadedError, get_admission_controller
+from ai_assistants.chatbot.api.routes import stream_turn
+from ai_assistants.chatbot.core.metrics import REGISTRY
+from ai_assistants.shared.config import settings
+from ai_assistants.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+ws_router = APIRouter(prefix="/api/v1", tags=["chat"])
+
+WS_SESSIONS = REGISTRY.gauge("chatbot_ws_sessions", "Open WebSocket chat sessions.")
+WS_CLOSED = REGISTRY.counter(
+    "chatbot_ws_sessions_closed_total",
+    "WebSocket chat sessions closed by the server, by reason.",
+    ["reason"],
+)
+WS_CANCELLED_TURNS = REGISTRY.counter(
+    "chatbot_ws_cancelled_turns_total",
+    "WebSocket turns cancelled by the client or a newer message.",
+)
+
+# Close codes (RFC 6455)
+CLOSE_GOING_AWAY = 1001
+CLOSE_TRY_AGAIN_LATER = 1013
+
+
+class ChatSession:
+    """A WebSocket connection bound to one conversation.
+
+    Attributes:
+        session_id: Unique identifier for the session.
+        conversation_id: Conversation all turns on this connection belong to.
+        last_active: Monotonic time of the last chat message or connect.
+        last_seen: Monotonic time of the last frame of any kind.
+    """
+
+    def __init__(self, websocket: WebSocket, conversation_id: str) -> None:
+        self.session_id = str(uuid.uuid4())
+        self.conversation_id = conversation_id
+        self.websocket = websocket
+        self.last_active = time.monotonic()
+        self.last_seen = self.last_active
+        self.turn: Optional[asyncio.Task] = None
+        self._send_lock = asyncio.Lock()
+
+    async def send(self, event: str, **data: Any) -> None:
+        """Send one event frame; frames from turns and keep-alive never interleave."""
+        async with self._send_lock:
+            await self.websocket.send_json({"type": event, **data})
+
+    async def cancel_turn(self) -> bool:
+        """Cancel the streaming turn, if any, and wait for it to stop.
+
+        Returns:
+            True if a turn was cancelled.
+        """
+        turn = self.turn
+        if turn is None or turn.done():
+            return False
+
+        turn.cancel()
+        try:
+            await turn
+        except asyncio.CancelledError:
+            pass
+        WS_CANCELLED_TURNS.inc()
+        return True
+
+    async def close(self, code: int, reason: str) -> None:
+        """Cancel any turn and close the connection."""
+        await self.cancel_turn()
+        if self.websocket.application_state == WebSocketState.CONNECTED:
+            try:
+                await self.websocket.close(code=code, reason=reason)
+            except RuntimeError:
+                # Already closed by the client
+                pass
+
+
+class SessionRegistry:
+    """Bounded registry of open sessions with idle eviction.
+
+    Sessions with no chat activity for ``idle_timeout`` seconds are closed.
+    When all ``max_sessions`` slots are taken by active sessions, new
+    connections are refused rather than evicting someone mid-conversation.
+    """
+
+    def __init__(self, max_sessions: int = 1000, idle_timeout: float = 300.0) -> None:
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def is_idle(self, session: ChatSession) -> bool:
+        return time.monotonic() - session.last_active >= self.idle_timeout
+
+    async def evict_idle(self) -> int:
+        """Close idle sessions.
+
+        Returns:
+            Number of sessions evicted.
+        """
+        idle = [session for session in self._sessions.values() if self.is_idle(session)]
+        for session in idle:
+            self.unregister(session)
+            WS_CLOSED.inc(reason="idle")
+            await session.close(CLOSE_GOING_AWAY, "idle")
+        return len(idle)
+
+    async def register(self, session: ChatSession) -> bool:
+        """Add a session, evicting idle ones to make room.
+
+        Returns:
+            False if the registry is full of active sessions.
+        """
+        if len(self._sessions) >= self.max_sessions:
+            await self.evict_idle()
+        if len(self._sessions) >= self.max_sessions:
+            return False
+
+        self._sessions[session.session_id] = session
+        WS_SESSIONS.set(len(self._sessions))
+        return True
+
+    def touch(self, session: ChatSession) -> None:
+        """Mark a session as active, keeping the registry in activity order."""
+        session.last_active = time.monotonic()
+        if session.session_id in self._sessions:
+            self._sessions.move_to_end(session.session_id)
+
+    def unregister(self, session: ChatSession) -> None:
+        self._sessions.pop(session.session_id, None)
+        WS_SESSIONS.set(len(self._sessions))
+
+    async def close_all(self) -> None:
+        """Close every session, e.g. on shutdown."""
+        for session in list(self._sessions.values()):
+            self.unregister(session)
+            await session.close(CLOSE_GOING_AWAY, "server shutdown")
+
+
+# Global session registry
+_registry: Optional[SessionRegistry] = None
+
+
+def get_session_registry() -> SessionRegistry:
+    """Get the shared WebSocket session registry."""
+    global _registry
+
+    if _registry is None:
+        _registry = SessionRegistry(
+            max_sessions=settings.ws_max_sessions,
+            idle_timeout=settings.ws_idle_timeout_seconds,
+        )
+    return _registry
+
+
+async def _run_turn(
+    session: ChatSession, message: str, deadline_seconds: Optional[float] = None
+) -> None:
+    """Stream one turn to the client under an admission slot."""
+    try:
+        async with get_admission_controller().slot():
+            async for event, data in stream_turn(
+                session.conversation_id, message, deadline_seconds
+            ):
+                await session.send(event, **data)
+    except OverloadedError as e:
+        await session.send("error", detail=str(e), retry_after=e.retry_after)
+    except asyncio.CancelledError:
+        try:
+            await session.send("cancelled", conversation_id=session.conversation_id)
+        except Exception:
+            # The client may already be gone
+            pass
+        raise
+    except WebSocketDisconnect:
+        pass
+
+
+async def _handle_frame(session: ChatSession, frame: Dict[str, Any]) -> None:
+    """Act on one client frame."""
+    registry = get_session_registry()
+    kind = frame.get("type")
+
+    if kind == "ping":
+        await session.send("pong")
+    elif kind == "pong":
+        pass
+    elif kind == "cancel":
+        await session.cancel_turn()
+    elif kind == "message":
+        content = frame.get("content")
+        if not isinstance(content, str) or not content.strip():
+            await session.send("error", detail="Message content is required")
+            return
+        deadline_seconds = frame.get("deadline_seconds")
+        if deadline_seconds is not None and (
+            isinstance(deadline_seconds, bool)
+            or not isinstance(deadline_seconds, (int, float))
+            or deadline_seconds <= 0
+        ):
+            await session.send("error", detail="deadline_seconds must be a positive number")
+            return
+        registry.touch(session)
+        # A new message supersedes the turn still streaming
+        await session.cancel_turn()
+        session.turn = asyncio.create_task(_run_turn(session, content, deadline_seconds))
+    else:
+        await session.send("error", detail=f"Unknown message type: {kind!r}")
+
+
+@ws_router.websocket("/ws/chat")
+async def chat_websocket(websocket: WebSocket, conversation_id: Optional[str] = None) -> None:
+    """Multi-turn chat over one WebSocket connection.
+
+    Pass ``?conversation_id=...`` to continue an existing conversation. The
+    server pings after ``ws_ping_interval_seconds`` without traffic and
+    closes the connection if nothing arrives for another interval, or once
+    the session has been idle for ``ws_idle_timeout_seconds``.
+    """
+    await websocket.accept()
+    session = ChatSession(websocket, conversation_id or str(uuid.uuid4()))
+    registry = get_session_registry()
+
+    if not await registry.register(session):
+        WS_CLOSED.inc(reason="full")
+        await session.close(CLOSE_TRY_AGAIN_LATER, "too many sessions")
+        return
+
+    ping_interval = settings.ws_ping_interval_seconds
+    try:
+        await session.send(
+            "session",
+            session_id=session.session_id,
+            conversation_id=session.conversation_id,
+        )
+
+        while True:
+            try:
+                frame = await asyncio.wait_for(websocket.receive_json(), timeout=ping_interval)
+            except asyncio.TimeoutError:
+                streaming = session.turn is not None and not session.turn.done()
+                if registry.is_idle(session) and not streaming:
+                    WS_CLOSED.inc(reason="idle")
+                    await session.close(CLOSE_GOING_AWAY, "idle")
+                    return
+                if time.monotonic() - session.last_seen >= 2 * ping_interval:
+                    WS_CLOSED.inc(reason="unresponsive")
+                    await session.close(CLOSE_GOING_AWAY, "no pong")
+                    return
+                await session.send("ping")
+                continue
+            except ValueError:
+                await session.send("error", detail="Frames must be JSON objects")
+                continue
+
+            session.last_seen = time.monotonic()
+            if not isinstance(frame, dict):
+                await session.send("error", detail="Frames must be JSON objects")
+                continue
+            await _handle_frame(session, frame)
+
+    except WebSocketDisconnect:
+        logger.debug(f"WebSocket session {session.session_id} disconnected")
+    finally:
+        registry.unregister(session)
+        await session.cancel_turn()
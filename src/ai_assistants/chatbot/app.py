@@ -1,9 +1,19 @@
 """FastAPI application factory."""
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
+from ai_assistants.chatbot.api.admission import OverloadedError
 from ai_assistants.chatbot.api.routes import router
+from ai_assistants.chatbot.api.websocket import get_session_registry, ws_router
+from ai_assistants.chatbot.core.concurrency import shutdown_executor
+from ai_assistants.chatbot.core.graph import close_graph, get_graph
+from ai_assistants.chatbot.core.llm import close_llm_registry, init_llm_registry
+from ai_assistants.chatbot.core.metrics import REGISTRY
+from ai_assistants.chatbot.core.rate_limit import close_rate_limiter
+from ai_assistants.chatbot.store.factory import close_conversation_store
+from ai_assistants.chatbot.tools.web_search import close_web_search
 from ai_assistants.shared.logging import get_logger
 
 logger = get_logger(__name__)
@@ -34,11 +44,32 @@ def create_app() -> FastAPI:
 
     # Include routers
     app.include_router(router)
+    app.include_router(ws_router)
+
+    @app.exception_handler(OverloadedError)
+    async def overloaded_handler(request: Request, exc: OverloadedError) -> JSONResponse:
+        """Shed load with a fast 503 and a Retry-After hint."""
+        return JSONResponse(
+            status_code=503,
+            content={"detail": str(exc)},
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics() -> Response:
+        """Expose metrics in the Prometheus text format."""
+        return Response(
+            content=REGISTRY.render(),
+            media_type="text/plain; version=0.0.4; charset=utf-8",
+        )
 
     @app.on_event("startup")
     async def startup_event():
         """Initialize resources on startup."""
         logger.info("Starting AI Financial Advisor chatbot...")
+        init_llm_registry()
+        # Compile the graph inside the loop its checkpointer will run on
+        get_graph()
 
         # Optionally initialize vectorstore
         # from ai_assistants.chatbot.rag.vectorstore import initialize_vectorstore
@@ -48,5 +79,12 @@ def create_app() -> FastAPI:
     async def shutdown_event():
         """Cleanup resources on shutdown."""
         logger.info("Shutting down AI Financial Advisor chatbot...")
+        await get_session_registry().close_all()
+        await close_llm_registry()
+        close_rate_limiter()
+        await close_web_search()
+        close_conversation_store()
+        await close_graph()
+        shutdown_executor()
 
     return app
@@ -0,0 +1,197 @@
+"""Model cascade: a small model for simple questions, the large one otherwise."""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict
+
+from ai_assistants.chatbot.core.metrics import REGISTRY
+from ai_assistants.shared.config import settings
+
+CASCADE_DECISIONS = REGISTRY.counter(
+    "chatbot_cascade_decisions_total",
+    "Generator tier chosen per attempt, by reason.",
+    ["tier", "reason"],
+)
+GENERATION_LATENCY = REGISTRY.histogram(
+    "chatbot_generation_duration_seconds",
+    "Latency of response generation by model tier.",
+    ["tier"],
+)
+
+SMALL_TIER = "small"
+LARGE_TIER = "large"
+
+# Definitional questions a small model answers as well as a large one
+SIMPLE_PATTERNS = [
+    re.compile(p, re.IGNORECASE)
+    for p in [
+        r"^\s*(what|what's|whats) (is|are) (a |an |the )?[\w\s()'-]{1,40}\??\s*$",
+        r"^\s*(define|definition of|meaning of)\b",
+        r"\bwhat (does|do) .{1,40} (mean|stand for)\??\s*$",
+        r"^\s*(explain|describe) (what|the term)\b",
+        r"^\s*(hi|hello|hey|thanks|thank you|good (morning|afternoon|evening))\b",
+    ]
+]
+
+# Signs the answer needs planning, arithmetic or weighing trade-offs
+COMPLEX_PATTERNS = [
+    re.compile(p, re.IGNORECASE)
+    for p in [
+        r"\bshould (i|we)\b|\bis it (a good idea|worth|better)\b",
+        r"\b(compare|comparison|versus|vs\.?|better than|trade-?offs?|pros and cons)\b",
+        r"\b(plan|planning|strategy|strategies|allocate|allocation|rebalanc\w*)\b",
+        r"\b(calculate|how much|how long|project(ed|ion)?|estimate)\b",
+        r"\b(my|our) (portfolio|situation|income|debt|savings|taxes|retirement)\b",
+        r"[$€£]\s?\d|\d+(\.\d+)?\s?%|\b\d{4,}\b",
+    ]
+]
+
+# Simple questions longer than this are treated as low-confidence
+MAX_SIMPLE_WORDS = 25
+
+
+@dataclass
+class ComplexityDecision:
+    """Whether a query is simple enough for the small model.
+
+    Attributes:
+        simple: True if the small model should answer.
+        confidence: Confidence in the classification, from 0 to 1.
+        reason: Why the query was classified this way.
+    """
+
+    simple: bool
+    confidence: float
+    reason: str
+
+
+def classify_complexity(message: str) -> ComplexityDecision:
+    """Classify a query as simple or complex with keyword rules.
+
+    Complex patterns win over simple ones, so "what is the best allocation
+    for my 401k" is complex even though it starts like a definition.
+    """
+    if any(p.search(message) for p in COMPLEX_PATTERNS):
+        return ComplexityDecision(False, 0.9, "complex")
+
+    words = len(message.split())
+    multiple_questions = message.count("?") > 1
+    if any(p.search(message) for p in SIMPLE_PATTERNS):
+        if words <= MAX_SIMPLE_WORDS and not multiple_questions:
+            return ComplexityDecision(True, 0.9, "simple")
+        return ComplexityDecision(True, 0.5, "simple_long")
+
+    # No rule fired; short messages lean simple but not confidently
+    return ComplexityDecision(words <= MAX_SIMPLE_WORDS / 2, 0.5, "unknown")
+
+
+@dataclass
+class GeneratorTier:
+    """Model chosen to generate a response.
+
+    Attributes:
+        tier: ``SMALL_TIER`` or ``LARGE_TIER``.
+        model: Model name.
+        reason: Why this tier was chosen.
+    """
+
+    tier: str
+    model: str
+    reason: str
+
+
+@dataclass
+class CascadeStats:
+    """Per-tier generation counts, escalations and latency.
+
+    Attributes:
+        generations: Completed generations per tier.
+        routed_small: Queries sent to the small model.
+        escalations: Queries sent to the large model while the cascade was
+            on, per reason ("complex", "low_confidence", "small_failed", ...).
+        seconds: Total generation time per tier.
+    """
+
+    generations: Dict[str, int] = field(default_factory=dict)
+    routed_small: int = 0
+    escalations: Dict[str, int] = field(default_factory=dict)
+    seconds: Dict[str, float] = field(default_factory=dict)
+
+    def record_tier(self, tier: GeneratorTier) -> None:
+        if tier.tier == SMALL_TIER:
+            self.routed_small += 1
+        elif tier.reason != "cascade_disabled":
+            self.escalations[tier.reason] = self.escalations.get(tier.reason, 0) + 1
+
+    def record_generation(self, tier: str, seconds: float) -> None:
+        self.generations[tier] = self.generations.get(tier, 0) + 1
+        self.seconds[tier] = self.seconds.get(tier, 0.0) + seconds
+        GENERATION_LATENCY.observe(seconds, tier=tier)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the counters with the escalation rate and mean latency per tier."""
+        escalated = sum(self.escalations.values())
+        # Small-model failures were already counted once when routed small
+        cascaded = self.routed_small + escalated - self.escalations.get("small_failed", 0)
+        return {
+            "routed_small": self.routed_small,
+            "escalations": dict(self.escalations),
+            "escalation_rate": escalated / cascaded if cascaded else None,
+            "generations": dict(self.generations),
+            "mean_seconds": {
+                tier: round(self.seconds[tier] / count, 3)
+                for tier, count in self.generations.items()
+                if count
+            },
+        }
+
+
+# Global stats instance
+_stats = CascadeStats()
+
+
+def generator_model() -> str:
+    """Get the large (default) generator model."""
+    return settings.generator_model or settings.chatbot_model
+
+
+def router_model() -> str:
+    """Get the model used for LLM routing."""
+    return settings.router_model or settings.chatbot_model
+
+
+def select_generator(message: str) -> GeneratorTier:
+    """Pick the generator tier for a query.
+
+    Without ``cascade_enabled`` every query goes to the large model.
+    Otherwise queries classified as simple with at least
+    ``cascade_confidence_threshold`` confidence go to ``cascade_small_model``
+    and the rest escalate.
+    """
+    if not settings.cascade_enabled:
+        tier = GeneratorTier(LARGE_TIER, generator_model(), "cascade_disabled")
+    else:
+        decision = classify_complexity(message)
+        if decision.simple and decision.confidence >= settings.cascade_confidence_threshold:
+            tier = GeneratorTier(SMALL_TIER, settings.cascade_small_model, decision.reason)
+        elif decision.simple:
+            tier = GeneratorTier(LARGE_TIER, generator_model(), "low_confidence")
+        else:
+            tier = GeneratorTier(LARGE_TIER, generator_model(), decision.reason)
+
+    CASCADE_DECISIONS.inc(tier=tier.tier, reason=tier.reason)
+    _stats.record_tier(tier)
+    return tier
+
+
+def escalate(reason: str) -> GeneratorTier:
+    """Move a query to the large model after the small one failed."""
+    tier = GeneratorTier(LARGE_TIER, generator_model(), reason)
+    CASCADE_DECISIONS.inc(tier=LARGE_TIER, reason=reason)
+    _stats.record_tier(tier)
+    return tier
+
+
+def get_cascade_stats() -> CascadeStats:
+    """Get the process-wide cascade stats."""
+    return _stats
@@ -0,0 +1,161 @@
+"""Checkpointer for per-conversation graph state."""
+
+from pathlib import Path
+from typing import Any, Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
+
+from ai_assistants.shared.config import settings
+from ai_assistants.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Global checkpointer and the SQLite connection backing it
+_checkpointer: Optional[BaseCheckpointSaver] = None
+_connection: Any = None
+_resolved = False
+
+
+def _create_sqlite_checkpointer() -> Optional[BaseCheckpointSaver]:
+    """Create the async SQLite checkpointer, or None if it is not installed."""
+    global _connection
+
+    try:
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    except ImportError as e:
+        logger.warning(f"SQLite checkpointer unavailable, graph state will not persist: {e}")
+        return None
+
+    Path(settings.checkpoint_path).parent.mkdir(parents=True, exist_ok=True)
+    # The connection is opened lazily by the saver on first use
+    _connection = aiosqlite.connect(settings.checkpoint_path, check_same_thread=False)
+    return AsyncSqliteSaver(_connection)
+
+
+def get_checkpointer() -> Optional[BaseCheckpointSaver]:
+    """Get the configured checkpointer, creating it on first use.
+
+    The SQLite checkpointer binds to the running event loop, so call this
+    (and ``create_graph``) from inside it, e.g. in the startup hook.
+
+    Returns:
+        An async SQLite checkpointer for ``checkpointer_backend`` "sqlite",
+        an in-memory one for "memory", or None for "none" (or when SQLite
+        support is not installed), in which case every turn is rebuilt from
+        the conversation store.
+    """
+    global _checkpointer, _resolved
+
+    if not _resolved:
+        backend = settings.checkpointer_backend.lower()
+        if backend == "sqlite":
+            _checkpointer = _create_sqlite_checkpointer()
+        elif backend == "memory":
+            _checkpointer = InMemorySaver()
+        elif backend != "none":
+            logger.warning(f"Unknown checkpointer '{backend}', graph state will not persist")
+        _resolved = True
+
+    return _checkpointer
+
+
+def thread_config(conversation_id: str) -> dict:
+    """Build the run config selecting a conversation's checkpoint thread."""
+    return {"configurable": {"thread_id": conversation_id}}
+
+
+async def delete_thread(conversation_id: str) -> None:
+    """Delete all checkpoints for a conversation."""
+    checkpointer = get_checkpointer()
+    if checkpointer is None:
+        return
+
+    try:
+        await checkpointer.adelete_thread(conversation_id)
+    except Exception as e:
+        logger.warning(f"Could not delete checkpoints for {conversation_id}: {e}")
+
+
+def _prune_memory(saver: InMemorySaver, thread_id: str) -> None:
+    """Drop all but the latest checkpoint and its blobs from an in-memory saver."""
+    for checkpoint_ns, checkpoints in saver.storage.get(thread_id, {}).items():
+        if len(checkpoints) < 2:
+            continue
+        latest = max(checkpoints)
+        for checkpoint_id in [c for c in checkpoints if c != latest]:
+            del checkpoints[checkpoint_id]
+            saver.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+
+        versions = saver.serde.loads_typed(checkpoints[latest][0])["channel_versions"]
+        stale = [
+            key
+            for key in saver.blobs
+            if key[:2] == (thread_id, checkpoint_ns) and versions.get(key[2]) != key[3]
+        ]
+        for key in stale:
+            del saver.blobs[key]
+
+
+async def _prune_sqlite(saver: BaseCheckpointSaver, thread_id: str) -> None:
+    """Delete all but the latest checkpoint, and their writes, from a SQLite saver."""
+    async with saver.lock, saver.conn.cursor() as cur:
+        await cur.execute(
+            """
+            DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_id < (
+                SELECT MAX(latest.checkpoint_id) FROM checkpoints AS latest
+                WHERE latest.thread_id = checkpoints.thread_id
+                AND latest.checkpoint_ns = checkpoints.checkpoint_ns
+            )
+            """,
+            (thread_id,),
+        )
+        await cur.execute(
+            """
+            DELETE FROM writes WHERE thread_id = ? AND checkpoint_id < (
+                SELECT MAX(latest.checkpoint_id) FROM checkpoints AS latest
+                WHERE latest.thread_id = writes.thread_id
+                AND latest.checkpoint_ns = writes.checkpoint_ns
+            )
+            """,
+            (thread_id,),
+        )
+        await saver.conn.commit()
+
+
+async def prune_thread(conversation_id: str) -> None:
+    """Delete all but the latest checkpoint of a conversation.
+
+    Every graph step writes a checkpoint, but only the latest is read back,
+    so call this after each turn to keep the store from growing per step.
+    """
+    checkpointer = get_checkpointer()
+    if checkpointer is None:
+        return
+
+    try:
+        if isinstance(checkpointer, InMemorySaver):
+            _prune_memory(checkpointer, conversation_id)
+        else:
+            await _prune_sqlite(checkpointer, conversation_id)
+    except Exception as e:
+        logger.warning(f"Could not prune checkpoints for {conversation_id}: {e}")
+
+
+async def close_checkpointer() -> None:
+    """Close the SQLite connection if one was opened.
+
+    The next ``get_checkpointer`` call creates a fresh checkpointer, so a
+    restarted app binds it to its own event loop.
+    """
+    global _checkpointer, _connection, _resolved
+
+    if _connection is not None:
+        try:
+            await _connection.close()
+        except Exception as e:
+            logger.warning(f"Error closing checkpoint database: {e}")
+        _connection = None
+    _checkpointer = None
+    _resolved = False
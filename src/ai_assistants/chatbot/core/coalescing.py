@@ -0,0 +1,219 @@
+"""Single-flight coalescing of identical in-flight work."""
+
+import asyncio
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from ai_assistants.chatbot.core.metrics import REGISTRY
+
+COALESCED_REQUESTS = REGISTRY.counter(
+    "chatbot_coalesced_requests_total",
+    "Requests that shared an identical in-flight graph run.",
+)
+
+
+class _Call:
+    """A shared in-flight call and the number of callers awaiting it."""
+
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs at most one call per key; concurrent callers share its result.
+
+    A caller that is cancelled stops waiting without affecting the others.
+    The shared call itself is cancelled only once every caller has gone.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``factory()`` for ``key``, or join the call already in flight.
+
+        Args:
+            key: Identity of the work.
+            factory: Coroutine factory doing the work when no call is in flight.
+
+        Returns:
+            The shared call's result.
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(factory()))
+            self._calls[key] = call
+
+            def _forget(_: asyncio.Task, call: _Call = call) -> None:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+
+            call.task.add_done_callback(_forget)
+        else:
+            COALESCED_REQUESTS.inc()
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Every caller gave up; stop the shared work
+                call.task.cancel()
+
+
+class _Broadcast:
+    """A shared in-flight event stream, the events so far and its subscribers."""
+
+    def __init__(self) -> None:
+        self.events: List[Any] = []
+        self.changed = asyncio.Event()
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+
+    def notify(self) -> None:
+        """Wake the subscribers waiting for the next event."""
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class SingleFlightStream:
+    """Runs at most one event stream per key; concurrent subscribers share it.
+
+    A subscriber that joins late first replays the events it missed, so
+    every subscriber sees the whole stream. A subscriber that leaves stops
+    receiving without affecting the others; the shared stream is cancelled
+    only once every subscriber has gone.
+    """
+
+    def __init__(self) -> None:
+        self._streams: Dict[Hashable, _Broadcast] = {}
+
+    def __len__(self) -> int:
+        return len(self._streams)
+
+    def _forget(self, key: Hashable, broadcast: _Broadcast) -> None:
+        if self._streams.get(key) is broadcast:
+            del self._streams[key]
+
+    async def subscribe(
+        self, key: Hashable, factory: Callable[[], AsyncIterator[Any]]
+    ) -> AsyncIterator[Any]:
+        """Iterate ``factory()`` for ``key``, or join the stream already in flight.
+
+        Args:
+            key: Identity of the work.
+            factory: Async iterator factory producing the events when no
+                stream is in flight.
+
+        Yields:
+            Every event of the shared stream, in order. An exception raised
+            by the stream is raised after the events before it.
+        """
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            broadcast = _Broadcast()
+            broadcast.task = asyncio.ensure_future(self._pump(broadcast, factory))
+            broadcast.task.add_done_callback(lambda _: self._forget(key, broadcast))
+            self._streams[key] = broadcast
+        else:
+            COALESCED_REQUESTS.inc()
+
+        broadcast.subscribers += 1
+        index = 0
+        try:
+            while True:
+                while index < len(broadcast.events):
+                    yield broadcast.events[index]
+                    index += 1
+                if broadcast.task.done():
+                    break
+                await broadcast.changed.wait()
+            # Re-raise the stream's failure, if any
+            broadcast.task.result()
+        finally:
+            broadcast.subscribers -= 1
+            if broadcast.subscribers == 0 and not broadcast.task.done():
+                # Every subscriber gave up; stop the shared work
+                self._forget(key, broadcast)
+                broadcast.task.cancel()
+
+    @staticmethod
+    async def _pump(broadcast: _Broadcast, factory: Callable[[], AsyncIterator[Any]]) -> None:
+        try:
+            async with aclosing(factory()) as events:
+                async for event in events:
+                    broadcast.events.append(event)
+                    broadcast.notify()
+        finally:
+            broadcast.notify()
+
+
+def first_turn_key(message: str, new_conversation: bool) -> Optional[str]:
+    """Get the coalescing key for the first message of a new conversation.
+
+    Args:
+        message: The user message.
+        new_conversation: True only if the conversation has no history
+            anywhere: neither in the conversation store nor in its
+            checkpoint thread. The store evicts conversations the
+            checkpointer still holds, so a store miss alone is not enough.
+
+    Returns:
+        The normalized message, or None if the conversation has earlier
+        turns and must not share a result with other conversations.
+    """
+    if not new_conversation:
+        return None
+    return " ".join(message.lower().split())
+
+
+# Global single-flight groups for graph runs and streamed graph runs
+_graph_runs = SingleFlight()
+_graph_streams = SingleFlightStream()
+
+
+async def run_coalesced(
+    key: Optional[str],
+    run: Callable[[], Awaitable[Dict[str, Any]]],
+) -> Dict[str, Any]:
+    """Run a graph invocation, sharing it with identical first-turn requests.
+
+    Args:
+        key: Coalescing key from ``first_turn_key``; None runs alone.
+        run: Coroutine factory performing the graph run.
+
+    Returns:
+        The final graph state.
+    """
+    if key is None:
+        return await run()
+    return await _graph_runs.run(key, run)
+
+
+async def stream_coalesced(
+    key: Optional[str],
+    stream: Callable[[], AsyncIterator[Any]],
+) -> AsyncIterator[Any]:
+    """Stream a graph run's events, sharing them with identical first-turn requests.
+
+    Args:
+        key: Coalescing key from ``first_turn_key``; None streams alone.
+        stream: Async iterator factory streaming the graph run's events.
+
+    Yields:
+        The graph run's events.
+    """
+    if key is None:
+        async with aclosing(stream()) as events:
+            async for event in events:
+                yield event
+        return
+
+    async with aclosing(_graph_streams.subscribe(key, stream)) as events:
+        async for event in events:
+            yield event
@@ -0,0 +1,167 @@
+"""Extractive compression of web search results."""
+
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from ai_assistants.chatbot.core.context import estimate_tokens
+from ai_assistants.chatbot.core.metrics import REGISTRY
+from ai_assistants.chatbot.core.packing import ContextCandidate, embed_texts, lexical_relevance
+
+COMPRESSION_RATIO = REGISTRY.histogram(
+    "chatbot_web_compression_ratio",
+    "Compressed to original token ratio of web search results.",
+    buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0),
+)
+
+# Sentence ends followed by whitespace, or line breaks between list items
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\s*\n+\s*")
+
+# Fragments shorter than this (e.g. "Read more.") are not worth scoring
+MIN_SENTENCE_CHARS = 20
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences, dropping very short fragments.
+
+    Text made up only of short fragments is returned as one sentence.
+    """
+    sentences = [
+        sentence.strip()
+        for sentence in _SENTENCE_BOUNDARY.split(text)
+        if len(sentence.strip()) >= MIN_SENTENCE_CHARS
+    ]
+    if not sentences and text.strip():
+        return [text.strip()]
+    return sentences
+
+
+@dataclass
+class CompressionStats:
+    """Running totals for web result compression.
+
+    Attributes:
+        compressed: Searches whose results were compressed.
+        original_tokens: Estimated tokens before compression.
+        compressed_tokens: Estimated tokens after compression.
+    """
+
+    compressed: int = 0
+    original_tokens: int = 0
+    compressed_tokens: int = 0
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+
+    def record(self, original_tokens: int, compressed_tokens: int) -> None:
+        with self._lock:
+            self.compressed += 1
+            self.original_tokens += original_tokens
+            self.compressed_tokens += compressed_tokens
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the totals along with the overall compression ratio."""
+        with self._lock:
+            return {
+                "compressed": self.compressed,
+                "original_tokens": self.original_tokens,
+                "compressed_tokens": self.compressed_tokens,
+                "ratio": (
+                    self.compressed_tokens / self.original_tokens
+                    if self.original_tokens
+                    else None
+                ),
+            }
+
+
+# Global stats instance
+_stats = CompressionStats()
+
+
+def get_compression_stats() -> CompressionStats:
+    """Get the process-wide web compression stats."""
+    return _stats
+
+
+def compress_candidates(
+    query: str,
+    candidates: List[ContextCandidate],
+    token_budget: int,
+    sentences_per_source: int = 3,
+) -> List[ContextCandidate]:
+    """Keep only the sentences of each result most relevant to the query.
+
+    Every result is split into sentences, which are scored against the query
+    with the shared embedding model (word overlap when it is unavailable).
+    Each result keeps at most ``sentences_per_source`` of its best sentences,
+    and sentences are then admitted best-first across results until
+    ``token_budget`` is reached; sentences with no relevance are skipped
+    unless nothing is relevant. Kept sentences stay in their original order
+    under the result's title and source; results left with no sentences are
+    dropped.
+
+    This is CPU-bound when embeddings are used; call it via ``run_blocking``.
+
+    Args:
+        query: The user message the results were retrieved for.
+        candidates: Web search results as context candidates.
+        token_budget: Maximum estimated tokens of kept sentences.
+        sentences_per_source: Maximum sentences kept from each result.
+
+    Returns:
+        The compressed candidates, in their original order.
+    """
+    # (candidate index, sentence index, sentence)
+    sentences: List[Tuple[int, int, str]] = [
+        (index, position, sentence)
+        for index, candidate in enumerate(candidates)
+        for position, sentence in enumerate(split_sentences(candidate.text))
+    ]
+    if not sentences:
+        return candidates
+
+    texts = [sentence for _, _, sentence in sentences]
+    vectors = embed_texts(query, texts)
+    if vectors is None:
+        scores = lexical_relevance(query, texts)
+    else:
+        query_vector, sentence_vectors = vectors
+        scores = sentence_vectors @ query_vector
+
+    kept: Dict[int, List[Tuple[int, str]]] = {}
+    used_tokens = 0
+    # Sentences sharing nothing with the query are only kept if none do
+    has_relevant = bool(scores.max() > 0)
+    # Stable sort so earlier sentences win ties
+    for order in np.argsort(-scores, kind="stable"):
+        if has_relevant and scores[order] <= 0:
+            break
+        index, position, sentence = sentences[order]
+        per_source = kept.setdefault(index, [])
+        tokens = estimate_tokens(sentence)
+        if len(per_source) >= sentences_per_source or used_tokens + tokens > token_budget:
+            continue
+        per_source.append((position, sentence))
+        used_tokens += tokens
+
+    compressed = [
+        ContextCandidate(
+            text=" ".join(sentence for _, sentence in sorted(kept[index])),
+            source=candidate.source,
+            origin=candidate.origin,
+            title=candidate.title,
+        )
+        for index, candidate in enumerate(candidates)
+        if kept.get(index)
+    ]
+
+    original_tokens = sum(estimate_tokens(c.full_text()) for c in candidates)
+    compressed_tokens = sum(estimate_tokens(c.full_text()) for c in compressed)
+    if original_tokens:
+        COMPRESSION_RATIO.observe(compressed_tokens / original_tokens)
+    _stats.record(original_tokens, compressed_tokens)
+
+    return compressed
@@ -0,0 +1,80 @@
+"""Helpers for running blocking work off the event loop."""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from ai_assistants.shared.config import settings
+from ai_assistants.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Global executor for blocking retrieval work
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get the bounded thread pool used for blocking I/O and CPU work."""
+    global _executor
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.retrieval_max_workers,
+            thread_name_prefix="retrieval",
+        )
+    return _executor
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking callable in the bounded thread pool.
+
+    Args:
+        func: Synchronous callable to run.
+        *args: Positional arguments for the callable.
+        **kwargs: Keyword arguments for the callable.
+
+    Returns:
+        The callable's return value.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(), functools.partial(func, *args, **kwargs)
+    )
+
+
+async def with_timeout(
+    awaitable: Awaitable[T],
+    timeout: float,
+    default: T,
+    label: str,
+) -> T:
+    """Await with a timeout, returning a default on timeout or error.
+
+    Args:
+        awaitable: The work to await.
+        timeout: Timeout in seconds.
+        default: Value returned if the work times out or raises.
+        label: Name used in log messages.
+
+    Returns:
+        The awaited result, or ``default``.
+    """
+    try:
+        return await asyncio.wait_for(awaitable, timeout=timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"{label} timed out after {timeout}s")
+    except Exception as e:
+        logger.warning(f"{label} failed: {e}")
+    return default
+
+
+def shutdown_executor() -> None:
+    """Shut down the thread pool if it was created."""
+    global _executor
+
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,275 @@
+"""Prompt context assembly: conversation windowing and rolling summaries."""
+
+import asyncio
+from typing import Dict, List, Optional, Set, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+from ai_assistants.chatbot.core.cascade import generator_model, router_model
+from ai_assistants.chatbot.core.llm import get_llm, token_usage, total_tokens
+from ai_assistants.chatbot.core.metrics import record_token_usage, track_external
+from ai_assistants.chatbot.core.prompts import SUMMARY_PROMPT
+from ai_assistants.chatbot.core.rate_limit import rate_limited
+from ai_assistants.chatbot.store import Conversation, get_conversation_store
+from ai_assistants.shared.config import settings
+from ai_assistants.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Rough characters-per-token ratio used for budgeting
+CHARS_PER_TOKEN = 4
+
+# Summary updates in flight, by conversation ID
+_pending: Dict[str, asyncio.Task] = {}
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a piece of text."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def estimate_message_tokens(messages: List[BaseMessage]) -> int:
+    """Estimate the input tokens of chat messages, including content blocks."""
+    total = 0
+    for message in messages:
+        content = message.content
+        if isinstance(content, list):
+            content = " ".join(
+                block.get("text", "") if isinstance(block, dict) else str(block)
+                for block in content
+            )
+        total += estimate_tokens(content)
+    return total
+
+
+def get_token_budget(model: str) -> int:
+    """Get the conversation token budget for a model."""
+    return settings.context_token_budgets.get(model, settings.context_token_budget)
+
+
+def window_start(
+    messages: List[Dict[str, str]],
+    user_turns: int,
+    token_budget: Optional[int] = None,
+) -> int:
+    """Find where the verbatim window of recent messages begins.
+
+    The window holds the last ``user_turns`` user messages and everything
+    after the earliest of them, shrunk from the front if it exceeds
+    ``token_budget``. The newest message is always kept.
+
+    Returns:
+        Index of the first message in the window.
+    """
+    start = len(messages)
+    seen = 0
+    while start > 0 and seen < user_turns:
+        start -= 1
+        if messages[start]["role"] == "user":
+            seen += 1
+
+    if token_budget is not None:
+        used = 0
+        for index in range(len(messages) - 1, start - 1, -1):
+            used += estimate_tokens(messages[index]["content"])
+            if used > token_budget and index < len(messages) - 1:
+                return index + 1
+
+    return start
+
+
+def prompt_window_start(
+    messages: List[Dict[str, str]],
+    first_index: int,
+    summarized_through: int,
+    token_budget: Optional[int] = None,
+) -> int:
+    """Find where the verbatim window of the generator prompt begins.
+
+    With summarization on, the window starts at the first message the
+    summary does not cover. The summary and the start of the window then
+    stay the same from turn to turn until ``update_summary`` folds a chunk
+    of turns, so the prompt prefix can be served from Anthropic's prompt
+    cache. Without summaries, the window holds the last
+    ``context_recent_turns`` user turns. Either way it is trimmed to
+    ``token_budget``.
+
+    Args:
+        messages: Conversation messages, ending with the new one.
+        first_index: Conversation index of ``messages[0]``.
+        summarized_through: Number of leading conversation messages the
+            summary covers.
+        token_budget: Optional token budget for the window.
+
+    Returns:
+        Index into ``messages`` of the first message in the window.
+    """
+    if not settings.context_summarization_enabled:
+        return window_start(messages, settings.context_recent_turns, token_budget)
+
+    start = window_start(messages, len(messages), token_budget)
+    return max(start, min(summarized_through - first_index, len(messages) - 1))
+
+
+async def build_prompt_context(
+    conversation: Optional[Conversation],
+    new_message: Optional[str] = None,
+) -> Tuple[List[Dict[str, str]], str]:
+    """Select the messages and summary to send to the graph.
+
+    Args:
+        conversation: The stored conversation, or None for a new one.
+        new_message: The incoming user message, if not yet stored.
+
+    Returns:
+        Tuple of (recent messages kept verbatim, rolling summary of older turns).
+    """
+    if conversation is None:
+        conversation = Conversation(conversation_id="")
+
+    messages = [
+        {"role": msg["role"], "content": msg["content"]}
+        for msg in conversation.messages
+    ]
+    if new_message is not None:
+        messages.append({"role": "user", "content": new_message})
+
+    budget = get_token_budget(generator_model()) - estimate_tokens(conversation.summary)
+    offset = conversation.message_count - len(conversation.messages)
+    start = prompt_window_start(
+        messages, offset, conversation.summarized_through, max(budget, 0)
+    )
+    summary = await summarize_trimmed(conversation, messages[:start], offset + start)
+    return messages[start:], summary
+
+
+async def summarize_trimmed(
+    conversation: Conversation,
+    trimmed: List[Dict[str, str]],
+    through: int,
+) -> str:
+    """Fold messages trimmed from the window into the summary before they are dropped.
+
+    Budget trimming can drop messages the background summarizer has not
+    reached yet. Those are summarized now, so the prompt never loses them.
+
+    Args:
+        conversation: The stored conversation.
+        trimmed: Messages dropped from the front of the window, in order.
+        through: Number of conversation messages up to and including the
+            last trimmed one.
+
+    Returns:
+        The summary covering the trimmed messages, or the stored summary if
+        it already does (or summarization is off or fails).
+    """
+    first = through - len(trimmed)
+    pending = trimmed[max(conversation.summarized_through - first, 0) :]
+    if not pending or not settings.context_summarization_enabled:
+        return conversation.summary
+
+    logger.debug(
+        f"Conversation {conversation.conversation_id}: summarizing {len(pending)} "
+        "messages trimmed from the window before the summary covered them"
+    )
+    summary = await _summarize(conversation.summary, pending)
+    if summary is None:
+        return conversation.summary
+
+    get_conversation_store().set_summary(conversation.conversation_id, summary, through)
+    return summary
+
+
+async def _summarize(summary: str, messages: List[Dict[str, str]]) -> Optional[str]:
+    """Fold new messages into the running summary with the cheaper router model."""
+    llm = get_llm(router_model(), max_tokens=settings.summary_max_tokens)
+    transcript = "\n".join(
+        f"{'User' if msg['role'] == 'user' else 'Assistant'}: {msg['content']}"
+        for msg in messages
+    )
+
+    messages = [
+        SystemMessage(content=SUMMARY_PROMPT),
+        HumanMessage(
+            content=f"Current summary:\n{summary or '(none)'}\n\nNew messages:\n{transcript}"
+        ),
+    ]
+
+    try:
+        async with track_external("anthropic", "summarize"):
+            response = await rate_limited(
+                "summarize",
+                lambda: llm.ainvoke(messages),
+                estimate_message_tokens(messages) + settings.summary_max_tokens,
+                usage=total_tokens,
+            )
+        record_token_usage("summarize", token_usage(response))
+    except Exception as e:
+        logger.warning(f"Conversation summarization failed: {e}")
+        return None
+
+    content = response.content
+    return content.strip() if isinstance(content, str) else None
+
+
+async def update_summary(conversation_id: str) -> None:
+    """Fold a chunk of turns that have left the recent window into the summary.
+
+    Runs after a turn completes. Once ``context_recent_turns +
+    context_fold_turns`` user turns are unsummarized, everything before the
+    last ``context_recent_turns - 1`` of them is folded in one call; the next
+    request adds the newest user message. Folding in chunks keeps the summary
+    and the window start stable for ``context_fold_turns`` turns between
+    folds, so those turns can reuse the cached prompt prefix.
+    """
+    store = get_conversation_store()
+    conversation = store.get(conversation_id)
+    if conversation is None:
+        return
+
+    messages = [
+        {"role": msg["role"], "content": msg["content"]}
+        for msg in conversation.messages
+    ]
+    offset = conversation.message_count - len(messages)
+    fold_from = max(conversation.summarized_through, offset)
+    pending_turns = sum(1 for msg in messages[fold_from - offset :] if msg["role"] == "user")
+    if pending_turns < settings.context_recent_turns + settings.context_fold_turns:
+        return
+
+    boundary = offset + window_start(messages, max(settings.context_recent_turns - 1, 0))
+    if boundary - fold_from < settings.summary_min_messages:
+        return
+
+    summary = await _summarize(
+        conversation.summary,
+        messages[fold_from - offset : boundary - offset],
+    )
+    if summary is not None:
+        store.set_summary(conversation_id, summary, boundary)
+        logger.debug(f"Summarized conversation {conversation_id} through message {boundary}")
+
+
+def schedule_summary_update(conversation_id: str) -> None:
+    """Update a conversation's summary in the background.
+
+    At most one update runs per conversation; it does not delay the response.
+    """
+    if not settings.context_summarization_enabled:
+        return
+
+    pending = _pending.get(conversation_id)
+    if pending is not None and not pending.done():
+        return
+
+    task = asyncio.create_task(update_summary(conversation_id))
+    _pending[conversation_id] = task
+    _background_tasks.add(task)
+
+    def _done(finished: asyncio.Task) -> None:
+        _background_tasks.discard(finished)
+        if _pending.get(conversation_id) is finished:
+            del _pending[conversation_id]
+
+    task.add_done_callback(_done)
@@ -0,0 +1,57 @@
+"""Per-request deadlines and node sub-budgets."""
+
+import time
+from typing import Any, List, Mapping, Optional
+
+from ai_assistants.chatbot.core.metrics import REGISTRY
+
+SKIPPED_STEPS = REGISTRY.counter(
+    "chatbot_skipped_steps_total",
+    "Graph steps skipped or degraded because they ran out of time or failed.",
+    ["step"],
+)
+
+
+def deadline_after(seconds: Optional[float]) -> Optional[float]:
+    """Get the absolute deadline (epoch seconds) ``seconds`` from now, or None if unset."""
+    if not seconds or seconds <= 0:
+        return None
+    return time.time() + seconds
+
+
+def remaining(state: Mapping[str, Any]) -> Optional[float]:
+    """Seconds left before the request deadline, or None without a deadline."""
+    deadline = state.get("deadline")
+    if deadline is None:
+        return None
+    return max(deadline - time.time(), 0.0)
+
+
+def node_budget(
+    state: Mapping[str, Any],
+    fraction: float = 1.0,
+    cap: Optional[float] = None,
+    floor: float = 0.0,
+) -> Optional[float]:
+    """Get a node's time budget as a fraction of the time remaining.
+
+    Args:
+        state: Graph state carrying the request ``deadline``.
+        fraction: Share of the remaining time this node may use.
+        cap: Upper bound, e.g. a per-service timeout.
+        floor: Lower bound, for steps worth attempting even when late.
+
+    Returns:
+        The budget in seconds, or ``cap`` (possibly None) without a deadline.
+    """
+    left = remaining(state)
+    if left is None:
+        return cap
+    budget = max(left * fraction, floor)
+    return min(budget, cap) if cap is not None else budget
+
+
+def skip_step(state: Mapping[str, Any], step: str) -> List[str]:
+    """Record a skipped step and get the updated ``skipped_steps`` list."""
+    SKIPPED_STEPS.inc(step=step)
+    return [*(state.get("skipped_steps") or []), step]
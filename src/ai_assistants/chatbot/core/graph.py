@@ -1,19 +1,37 @@
 """LangGraph workflow definition."""
 
+from typing import Optional
+
 from langgraph.graph import END, StateGraph
 
+from ai_assistants.chatbot.core.checkpoint import close_checkpointer, get_checkpointer
+from ai_assistants.chatbot.core.metrics import instrument_node
 from ai_assistants.chatbot.core.nodes import (
+    cache_response,
+    check_cache,
     generate_response,
+    generate_with_tools,
+    prepare_turn,
+    record_response,
     retrieve_context,
+    route_and_retrieve,
     route_query,
 )
 from ai_assistants.chatbot.core.state import ChatState
+from ai_assistants.shared.config import settings
 
 
 def should_retrieve(state: ChatState) -> str:
     """Determine if we should retrieve context."""
     if state.get("should_search_web") or state.get("should_use_rag"):
         return "retrieve"
+    return "check_cache"
+
+
+def should_generate(state: ChatState) -> str:
+    """Skip generation when the semantic cache already has an answer."""
+    if state.get("cache_hit"):
+        return "record"
     return "generate"
 
 
@@ -21,9 +39,23 @@ def create_graph() -> StateGraph:
     """Create the LangGraph workflow for the chatbot.
 
     The workflow:
-    1. Route the query to determine what tools to use
-    2. Optionally retrieve context from RAG/web search
-    3. Generate the final response
+    1. Trim the checkpointed conversation to the recent window
+    2. Route the query to determine what tools to use
+    3. Optionally retrieve context from RAG/web search
+    4. Check the semantic cache for a response to a similar query
+    5. On a miss, generate the final response and cache it
+    6. Record the response in the conversation's messages
+
+    State is checkpointed per conversation (``conversation_id`` as the
+    thread ID), so each turn only sends the new message.
+
+    With ``settings.speculative_retrieval`` enabled, routing and retrieval
+    are merged into one node that starts RAG lookup in parallel with the
+    router instead of after it.
+
+    With ``settings.graph_topology`` set to "tools" there is no separate
+    routing step: after the cache check, the generator answers directly or
+    calls the retrieval tools itself (see ``generate_with_tools``).
 
     Returns:
         Compiled StateGraph workflow.
@@ -32,28 +64,82 @@ def create_graph() -> StateGraph:
     workflow = StateGraph(ChatState)
 
     # Add nodes
-    workflow.add_node("route", route_query)
-    workflow.add_node("retrieve", retrieve_context)
-    workflow.add_node("generate", generate_response)
+    workflow.add_node("prepare", instrument_node("prepare", prepare_turn))
+    workflow.add_node("record", instrument_node("record", record_response))
+    workflow.add_node("check_cache", instrument_node("check_cache", check_cache))
+    workflow.add_node("cache_response", instrument_node("cache_response", cache_response))
 
-    # Define edges
-    workflow.set_entry_point("route")
+    tool_calling = settings.graph_topology == "tools"
+    generate = generate_with_tools if tool_calling else generate_response
+    workflow.add_node("generate", instrument_node("generate", generate))
 
-    # Conditional edge from route
+    if tool_calling:
+        # The generator routes itself by calling retrieval tools
+        workflow.add_edge("prepare", "check_cache")
+    elif settings.speculative_retrieval:
+        # Routing and (speculative) retrieval happen in a single node
+        workflow.add_node("route", instrument_node("route", route_and_retrieve))
+        workflow.add_edge("prepare", "route")
+        workflow.add_edge("route", "check_cache")
+    else:
+        workflow.add_node("route", instrument_node("route", route_query))
+        workflow.add_node("retrieve", instrument_node("retrieve", retrieve_context))
+        workflow.add_edge("prepare", "route")
+
+        # Conditional edge from route
+        workflow.add_conditional_edges(
+            "route",
+            should_retrieve,
+            {
+                "retrieve": "retrieve",
+                "check_cache": "check_cache",
+            },
+        )
+
+        # Retrieve always goes to the cache check
+        workflow.add_edge("retrieve", "check_cache")
+
+    workflow.set_entry_point("prepare")
+
+    # Cache hits are recorded directly, misses are generated
     workflow.add_conditional_edges(
-        "route",
-        should_retrieve,
+        "check_cache",
+        should_generate,
         {
-            "retrieve": "retrieve",
+            "record": "record",
             "generate": "generate",
         },
     )
 
-    # Retrieve always goes to generate
-    workflow.add_edge("retrieve", "generate")
-
-    # Generate goes to END
-    workflow.add_edge("generate", END)
+    # Generated responses are cached, then recorded
+    workflow.add_edge("generate", "cache_response")
+    workflow.add_edge("cache_response", "record")
+    workflow.add_edge("record", END)
 
     # Compile and return
-    return workflow.compile()
+    return workflow.compile(checkpointer=get_checkpointer())
+
+
+# Global compiled graph
+_graph: Optional[StateGraph] = None
+
+
+def get_graph() -> StateGraph:
+    """Get the compiled workflow, compiling it on first use.
+
+    Call it from inside the event loop: the SQLite checkpointer binds to
+    the running loop when it is created.
+    """
+    global _graph
+
+    if _graph is None:
+        _graph = create_graph()
+    return _graph
+
+
+async def close_graph() -> None:
+    """Drop the compiled workflow and close its checkpointer."""
+    global _graph
+
+    _graph = None
+    await close_checkpointer()
@@ -0,0 +1,270 @@
+"""Hedged requests for idempotent external calls.
+
+When a call has not returned by the observed latency percentile, a
+duplicate is sent and whichever finishes first wins; the other is
+cancelled. Only use this for calls that are safe to repeat, such as the
+router LLM call and web search.
+
+Waits inside an attempt that are not the call itself, such as waiting for
+rate-limit capacity, are marked with ``excluded_from_latency`` so they
+neither count towards the latency percentile nor trigger a hedge.
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, Optional, TypeVar
+
+from ai_assistants.chatbot.core.metrics import REGISTRY
+from ai_assistants.shared.config import settings
+from ai_assistants.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+HEDGEABLE_CALLS = REGISTRY.counter(
+    "chatbot_hedgeable_calls_total", "Calls eligible for hedging.", ["call"]
+)
+HEDGES_SENT = REGISTRY.counter(
+    "chatbot_hedges_sent_total",
+    "Duplicate requests sent because the first was slower than the hedge threshold.",
+    ["call"],
+)
+HEDGE_WINS = REGISTRY.counter(
+    "chatbot_hedge_wins_total", "Hedged calls where the duplicate returned first.", ["call"]
+)
+HEDGES_DENIED = REGISTRY.counter(
+    "chatbot_hedges_denied_total",
+    "Hedges not sent because the extra-request budget was spent.",
+    ["call"],
+)
+
+# Latencies kept per call for the percentile threshold
+LATENCY_WINDOW = 500
+
+# Cap on banked hedge budget, so quiet periods cannot save up a burst
+MAX_BUDGET_TOKENS = 5.0
+
+
+class _Attempt:
+    """Clock for one attempt that leaves out excluded waits."""
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.excluded = 0.0
+        self.paused_at: Optional[float] = None
+        self.running = asyncio.Event()
+        self.running.set()
+
+    def elapsed(self) -> float:
+        """Get the time spent in the call itself so far."""
+        now = self.paused_at if self.paused_at is not None else time.perf_counter()
+        return now - self.start - self.excluded
+
+    def pause(self) -> None:
+        self.paused_at = time.perf_counter()
+        self.running.clear()
+
+    def resume(self) -> None:
+        if self.paused_at is not None:
+            self.excluded += time.perf_counter() - self.paused_at
+            self.paused_at = None
+        self.running.set()
+
+
+# The attempt running in the current task, if it is hedged
+_attempt: ContextVar[Optional[_Attempt]] = ContextVar("hedge_attempt", default=None)
+
+
+@contextmanager
+def excluded_from_latency() -> Iterator[None]:
+    """Leave the time spent in this block out of the current hedged attempt.
+
+    Use it around waits before or between calls, such as waiting for
+    rate-limit capacity, so that only the call itself is timed. Outside a
+    hedged attempt it does nothing.
+    """
+    attempt = _attempt.get()
+    if attempt is None:
+        yield
+        return
+
+    attempt.pause()
+    try:
+        yield
+    finally:
+        attempt.resume()
+
+
+class Hedger:
+    """Hedging policy and latency history for one kind of call.
+
+    The hedge threshold is the ``percentile`` of recent latencies, so only
+    the slowest few percent of calls are duplicated. Each call earns
+    ``budget_ratio`` of a hedge token and each hedge spends one, which caps
+    extra requests at roughly ``budget_ratio`` of traffic.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        percentile: float = 95.0,
+        budget_ratio: float = 0.05,
+        min_samples: int = 20,
+        min_delay: float = 0.0,
+    ) -> None:
+        self.name = name
+        self.percentile = percentile
+        self.budget_ratio = budget_ratio
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._tokens = 0.0
+
+    def threshold(self) -> Optional[float]:
+        """Get the current hedge delay, or None until enough latencies are seen."""
+        if len(self._latencies) < self.min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return max(ordered[index], self.min_delay)
+
+    def _try_spend(self) -> bool:
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+    async def _timed(self, factory: Callable[[], Awaitable[T]], attempt: _Attempt) -> T:
+        # Each attempt runs in its own task, so this only sets it for that task
+        _attempt.set(attempt)
+        try:
+            result = await factory()
+        except asyncio.CancelledError:
+            # A loser cancelled mid-call took at least this long, which keeps
+            # the percentile from drifting down as hedges win
+            if attempt.paused_at is None:
+                self._latencies.append(attempt.elapsed())
+            raise
+        self._latencies.append(attempt.elapsed())
+        return result
+
+    @staticmethod
+    async def _run_for(primary: asyncio.Future, attempt: _Attempt, delay: float) -> bool:
+        """Wait until the primary finishes or its call has run for ``delay`` seconds.
+
+        Returns:
+            Whether the primary finished.
+        """
+        while not primary.done():
+            if attempt.paused_at is not None:
+                # The clock is stopped until the excluded wait ends
+                resumed = asyncio.ensure_future(attempt.running.wait())
+                try:
+                    await asyncio.wait({primary, resumed}, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    resumed.cancel()
+                continue
+
+            remaining = delay - attempt.elapsed()
+            if remaining <= 0:
+                return False
+            await asyncio.wait({primary}, timeout=remaining)
+        return True
+
+    async def call(self, factory: Callable[[], Awaitable[T]]) -> T:
+        """Run a call, hedging it if it is slower than the threshold.
+
+        Args:
+            factory: Creates a fresh awaitable for each attempt.
+
+        Returns:
+            The result of the first attempt to succeed. If every attempt
+            fails, the primary's exception is raised.
+        """
+        HEDGEABLE_CALLS.inc(call=self.name)
+        self._tokens = min(self._tokens + self.budget_ratio, MAX_BUDGET_TOKENS)
+        delay = self.threshold()
+
+        attempt = _Attempt()
+        primary = asyncio.ensure_future(self._timed(factory, attempt))
+        hedge: Optional[asyncio.Future] = None
+        try:
+            if delay is None:
+                return await primary
+
+            if await self._run_for(primary, attempt, delay):
+                return primary.result()
+            if not self._try_spend():
+                HEDGES_DENIED.inc(call=self.name)
+                return await primary
+
+            logger.debug(f"Hedging {self.name} after {delay:.3f}s")
+            HEDGES_SENT.inc(call=self.name)
+            hedge = asyncio.ensure_future(self._timed(factory, _Attempt()))
+
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            HEDGE_WINS.inc(call=self.name)
+                        return task.result()
+            return primary.result()
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hedge counts, rates and the current threshold."""
+        calls = HEDGEABLE_CALLS.get(call=self.name)
+        hedges = HEDGES_SENT.get(call=self.name)
+        wins = HEDGE_WINS.get(call=self.name)
+        return {
+            "calls": int(calls),
+            "hedges": int(hedges),
+            "wins": int(wins),
+            "denied": int(HEDGES_DENIED.get(call=self.name)),
+            "hedge_rate": hedges / calls if calls else None,
+            "win_rate": wins / hedges if hedges else None,
+            "threshold_seconds": self.threshold(),
+        }
+
+
+# Global hedgers, one per call name
+_hedgers: Dict[str, Hedger] = {}
+
+
+def get_hedger(name: str) -> Hedger:
+    """Get the shared hedger for a kind of call."""
+    if name not in _hedgers:
+        _hedgers[name] = Hedger(
+            name,
+            percentile=settings.hedge_percentile,
+            budget_ratio=settings.hedge_budget_ratio,
+            min_samples=settings.hedge_min_samples,
+            min_delay=settings.hedge_min_delay_seconds,
+        )
+    return _hedgers[name]
+
+
+async def hedged(name: str, factory: Callable[[], Awaitable[T]]) -> T:
+    """Run an idempotent call with hedging if ``hedging_enabled`` is set.
+
+    Args:
+        name: Call name used for latency history and metrics.
+        factory: Creates a fresh awaitable for each attempt.
+    """
+    if not settings.hedging_enabled:
+        return await factory()
+    return await get_hedger(name).call(factory)
+
+
+def get_hedging_stats() -> Dict[str, Any]:
+    """Get per-call hedging stats."""
+    return {name: hedger.stats() for name, hedger in _hedgers.items()}
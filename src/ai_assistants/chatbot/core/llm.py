@@ -0,0 +1,164 @@
+"""Process-wide registry of pooled Anthropic chat models."""
+
+from functools import cached_property
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import anthropic
+import httpx
+from langchain_anthropic import ChatAnthropic
+from pydantic import Field
+
+from ai_assistants.chatbot.core.rate_limit import observe_rate_limit_headers
+from ai_assistants.shared.config import settings
+from ai_assistants.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class PooledChatAnthropic(ChatAnthropic):
+    """ChatAnthropic that sends async requests through a caller-owned httpx client.
+
+    ChatAnthropic builds a private HTTP client per instance and has no
+    argument for supplying one. ``http_async_client`` mirrors the argument of
+    the same name on ChatOpenAI; the API key, base URL, retries and timeout
+    still come from the usual ChatAnthropic parameters.
+    """
+
+    http_async_client: Optional[httpx.AsyncClient] = Field(default=None, exclude=True)
+
+    @cached_property
+    def _async_client(self) -> anthropic.AsyncClient:
+        if self.http_async_client is None:
+            return super()._async_client
+        return anthropic.AsyncClient(**self._client_params, http_client=self.http_async_client)
+
+
+class LLMRegistry:
+    """Caches ChatAnthropic instances that share one pooled HTTP client.
+
+    Every cached model sends its requests through the same
+    ``httpx.AsyncClient``, so TLS connections are kept alive and reused
+    across requests instead of being set up for every node call.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 60.0,
+        max_retries: int = 2,
+        response_hooks: Optional[List[Callable[[httpx.Response], Awaitable[None]]]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self._http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=timeout,
+            event_hooks={"response": list(response_hooks or [])},
+            transport=transport,
+        )
+        self._timeout = timeout
+        self._max_retries = max_retries
+        self._llms: Dict[Tuple, ChatAnthropic] = {}
+
+    def get_llm(self, model: Optional[str] = None, **kwargs: Any) -> ChatAnthropic:
+        """Get a cached chat model.
+
+        Args:
+            model: Model name. Defaults to ``settings.chatbot_model``.
+            **kwargs: Extra ChatAnthropic parameters (e.g. max_tokens); each
+                distinct combination is cached separately.
+
+        Returns:
+            ChatAnthropic instance backed by the shared connection pool.
+        """
+        model = model or settings.chatbot_model
+        key = (model, tuple(sorted(kwargs.items())))
+
+        llm = self._llms.get(key)
+        if llm is None:
+            llm = PooledChatAnthropic(
+                model=model,
+                api_key=settings.anthropic_api_key,
+                max_retries=self._max_retries,
+                default_request_timeout=self._timeout,
+                http_async_client=self._http_client,
+                **kwargs,
+            )
+            self._llms[key] = llm
+            logger.info(f"Created pooled LLM client for {model}")
+
+        return llm
+
+    async def aclose(self) -> None:
+        """Close the shared connection pool."""
+        self._llms.clear()
+        await self._http_client.aclose()
+
+
+def token_usage(response: Any) -> Dict[str, int]:
+    """Extract input/output and prompt-cache token counts from a response."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    details = usage.get("input_token_details") or {}
+    return {
+        "input_tokens": usage.get("input_tokens", 0),
+        "output_tokens": usage.get("output_tokens", 0),
+        "cache_read_tokens": details.get("cache_read", 0) or 0,
+        "cache_creation_tokens": details.get("cache_creation", 0) or 0,
+    }
+
+
+def total_tokens(response: Any) -> int:
+    """Get the input plus output tokens of a response, for rate limiting."""
+    usage = token_usage(response)
+    return usage["input_tokens"] + usage["output_tokens"]
+
+
+# Global registry instance
+_registry: Optional[LLMRegistry] = None
+
+
+def init_llm_registry(transport: Optional[httpx.AsyncBaseTransport] = None) -> LLMRegistry:
+    """Create the global registry from settings if it does not exist yet.
+
+    With ``rate_limit_enabled``, responses feed their rate-limit headers to
+    the shared limiter, and retries are left to ``rate_limited`` so they
+    wait for capacity instead of hitting the API together.
+
+    Args:
+        transport: Optional httpx transport for the pooled client, e.g. a
+            simulated Anthropic API for offline load tests. Only used when
+            the registry is created.
+    """
+    global _registry
+
+    if _registry is None:
+        limited = settings.rate_limit_enabled
+        _registry = LLMRegistry(
+            max_connections=settings.anthropic_max_connections,
+            max_keepalive_connections=settings.anthropic_max_keepalive_connections,
+            keepalive_expiry=settings.anthropic_keepalive_expiry,
+            timeout=settings.anthropic_timeout,
+            max_retries=0 if limited else settings.anthropic_max_retries,
+            response_hooks=[observe_rate_limit_headers] if limited else None,
+            transport=transport,
+        )
+    return _registry
+
+
+def get_llm(model: Optional[str] = None, **kwargs: Any) -> ChatAnthropic:
+    """Get a pooled chat model from the global registry."""
+    return init_llm_registry().get_llm(model, **kwargs)
+
+
+async def close_llm_registry() -> None:
+    """Close the global registry and its connection pool."""
+    global _registry
+
+    if _registry is not None:
+        await _registry.aclose()
+        _registry = None
@@ -0,0 +1,276 @@
+"""Prometheus-style metrics for the chatbot.
+
+A small in-process registry that renders the Prometheus text exposition
+format, so the hot path only pays for a dict update per observation.
+"""
+
+import bisect
+import functools
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Sequence, Tuple
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+def _format_labels(labelnames: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric(ABC):
+    """Base class for labelled metrics."""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Get the exposition lines for every label combination."""
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing counter."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    type_name = "gauge"
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    """Cumulative histogram with fixed buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> (per-bucket counts incl. +Inf, sum)
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels: Any) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+
+        lines = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together on /metrics."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def metrics(self) -> List[Metric]:
+        return list(self._metrics.values())
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+NODE_LATENCY = REGISTRY.histogram(
+    "chatbot_node_duration_seconds", "Latency of LangGraph nodes.", ["node"]
+)
+NODE_IN_FLIGHT = REGISTRY.gauge(
+    "chatbot_node_in_flight", "LangGraph node executions in progress.", ["node"]
+)
+NODE_ERRORS = REGISTRY.counter(
+    "chatbot_node_errors_total", "LangGraph node executions that raised.", ["node"]
+)
+
+EXTERNAL_LATENCY = REGISTRY.histogram(
+    "chatbot_external_call_duration_seconds",
+    "Latency of calls to external services.",
+    ["service", "operation"],
+)
+EXTERNAL_IN_FLIGHT = REGISTRY.gauge(
+    "chatbot_external_calls_in_flight",
+    "External service calls in progress.",
+    ["service", "operation"],
+)
+EXTERNAL_ERRORS = REGISTRY.counter(
+    "chatbot_external_call_errors_total",
+    "External service calls that raised.",
+    ["service", "operation"],
+)
+
+ROUTER_DECISIONS = REGISTRY.counter(
+    "chatbot_router_decisions_total",
+    "Routing decisions by decision source and chosen tools.",
+    ["source", "web", "rag"],
+)
+
+LLM_TOKENS = REGISTRY.counter(
+    "chatbot_llm_tokens_total",
+    "LLM tokens by operation and token type.",
+    ["operation", "type"],
+)
+
+
+def instrument_node(
+    name: str,
+    func: Callable[[Any], Awaitable[Dict[str, Any]]],
+) -> Callable[[Any], Awaitable[Dict[str, Any]]]:
+    """Wrap a graph node to record its latency, concurrency and errors."""
+
+    @functools.wraps(func)
+    async def wrapper(state: Any) -> Dict[str, Any]:
+        NODE_IN_FLIGHT.inc(node=name)
+        start = time.perf_counter()
+        try:
+            return await func(state)
+        except Exception:
+            # Cancellation (e.g. a client disconnect) is not a node error
+            NODE_ERRORS.inc(node=name)
+            raise
+        finally:
+            NODE_LATENCY.observe(time.perf_counter() - start, node=name)
+            NODE_IN_FLIGHT.dec(node=name)
+
+    return wrapper
+
+
+@asynccontextmanager
+async def track_external(service: str, operation: str) -> AsyncIterator[None]:
+    """Record latency, concurrency and errors of an external call."""
+    EXTERNAL_IN_FLIGHT.inc(service=service, operation=operation)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        EXTERNAL_ERRORS.inc(service=service, operation=operation)
+        raise
+    finally:
+        EXTERNAL_LATENCY.observe(
+            time.perf_counter() - start, service=service, operation=operation
+        )
+        EXTERNAL_IN_FLIGHT.dec(service=service, operation=operation)
+
+
+def record_token_usage(operation: str, usage: Dict[str, int]) -> None:
+    """Count the tokens reported for an LLM call."""
+    for key, value in usage.items():
+        if value:
+            LLM_TOKENS.inc(value, operation=operation, type=key.removesuffix("_tokens"))
@@ -1,17 +1,69 @@
 """LangGraph node functions."""
 
+import asyncio
 import json
-from typing import Any, Dict
+import time
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
 
 from langchain_anthropic import ChatAnthropic
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
 
+from ai_assistants.chatbot.core.cascade import (
+    SMALL_TIER,
+    GeneratorTier,
+    escalate,
+    generator_model,
+    get_cascade_stats,
+    router_model,
+    select_generator,
+)
+from ai_assistants.chatbot.core.compression import compress_candidates
+from ai_assistants.chatbot.core.concurrency import run_blocking, with_timeout
+from ai_assistants.chatbot.core.context import (
+    build_prompt_context,
+    estimate_message_tokens,
+    estimate_tokens,
+    get_token_budget,
+    prompt_window_start,
+    summarize_trimmed,
+)
+from ai_assistants.chatbot.core.deadline import node_budget, skip_step
+from ai_assistants.chatbot.core.hedging import hedged
+from ai_assistants.chatbot.core.llm import get_llm, token_usage, total_tokens
+from ai_assistants.chatbot.core.metrics import (
+    ROUTER_DECISIONS,
+    record_token_usage,
+    track_external,
+)
+from ai_assistants.chatbot.core.packing import (
+    PASSAGE_SEPARATOR,
+    ContextCandidate,
+    PackedContext,
+    pack_context,
+)
 from ai_assistants.chatbot.core.prompts import (
     FINANCIAL_ADVISOR_SYSTEM_PROMPT,
     ROUTER_PROMPT,
+    TOOL_USE_PROMPT,
 )
+from ai_assistants.chatbot.core.rate_limit import rate_limited
+from ai_assistants.chatbot.core.router import RouteDecision, route_locally, route_with_rules
+from ai_assistants.chatbot.core.semantic_cache import get_semantic_cache, hash_context
+from ai_assistants.chatbot.core.speculation import get_speculation_stats
 from ai_assistants.chatbot.core.state import ChatState
+from ai_assistants.chatbot.rag.embeddings import get_embeddings
+from ai_assistants.chatbot.rag.hybrid import retrieve_documents
 from ai_assistants.chatbot.rag.vectorstore import get_vectorstore
+from ai_assistants.chatbot.store import get_conversation_store
+from ai_assistants.chatbot.tools.definitions import GENERATOR_TOOLS, TOOL_SOURCES
 from ai_assistants.chatbot.tools.web_search import search_web
 from ai_assistants.shared.config import settings
 from ai_assistants.shared.logging import get_logger
@@ -19,41 +71,88 @@ from ai_assistants.shared.logging import get_logger
 logger = get_logger(__name__)
 
 
-def get_anthropic_llm() -> ChatAnthropic:
-    """Get the LLM instance."""
-    return ChatAnthropic(
-        model=settings.chatbot_model,
-        api_key=settings.anthropic_api_key,
+def get_anthropic_llm(model: Optional[str] = None) -> ChatAnthropic:
+    """Get a shared, connection-pooled LLM instance.
+
+    Args:
+        model: Model name. Defaults to the generator model.
+    """
+    return get_llm(model or generator_model())
+
+
+async def _invoke_llm(operation: str, llm: ChatAnthropic, messages: List[BaseMessage]) -> Any:
+    """Call the LLM under the shared Anthropic rate limiter."""
+    max_tokens = getattr(llm, "max_tokens", None) or settings.rate_limit_output_tokens_estimate
+    estimate = estimate_message_tokens(messages) + min(
+        max_tokens, settings.rate_limit_output_tokens_estimate
+    )
+    return await rate_limited(
+        operation, lambda: llm.ainvoke(messages), estimate, usage=total_tokens
     )
 
 
-async def route_query(state: ChatState) -> Dict[str, Any]:
-    """Route the query to determine what tools to use."""
-    llm = get_anthropic_llm()
+def _role_and_content(message: Any) -> Tuple[str, str]:
+    """Get the ("user" or "assistant") role and text of a state message."""
+    if isinstance(message, dict):
+        return message.get("role", "user"), message.get("content", "")
+    # add_messages stores LangChain messages, typed "human" or "ai"
+    role = "assistant" if getattr(message, "type", "human") == "ai" else "user"
+    return role, getattr(message, "content", "")
 
-    # Get the last user message
+
+async def prepare_turn(state: ChatState) -> Dict[str, Any]:
+    """Bring the checkpointed conversation up to date for the new message.
+
+    The rolling summary is refreshed from the conversation store, where the
+    background summarizer writes it, and messages that have left the
+    verbatim window are removed from the checkpoint so per-turn state stays
+    bounded. Messages trimmed before the summary covers them are summarized
+    first. Threads without a checkpoint (a new checkpointer, or a
+    conversation whose turn was served by a coalesced run) are seeded from
+    the stored history.
+    """
     messages = state.get("messages", [])
-    if not messages:
+    conversation = get_conversation_store().get(state.get("conversation_id", ""))
+    if conversation is None:
+        return {}
+
+    if len(messages) == 1 and conversation.messages:
+        _, new_message = _role_and_content(messages[0])
+        window, summary = await build_prompt_context(conversation, new_message)
         return {
-            "should_search_web": False,
-            "should_use_rag": False,
+            "messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES), *window],
+            "summary": summary,
         }
 
-    last_message = messages[-1]
-    if isinstance(last_message, dict):
-        user_message = last_message.get("content", "")
-    else:
-        user_message = getattr(last_message, "content", "")
-        test_message:SystemMessage = SystemMessage(content="test")
-        test_message.content
+    window = [dict(zip(("role", "content"), _role_and_content(msg))) for msg in messages]
+    budget = get_token_budget(generator_model()) - estimate_tokens(conversation.summary)
+    # The checkpoint holds the tail of the stored conversation plus the new message
+    first_index = conversation.message_count - (len(messages) - 1)
+    start = prompt_window_start(
+        window, first_index, conversation.summarized_through, max(budget, 0)
+    )
+    summary = await summarize_trimmed(conversation, window[:start], first_index + start)
+    return {
+        "messages": [RemoveMessage(id=msg.id) for msg in messages[:start]],
+        "summary": summary,
+    }
+
+
+async def _route_with_llm(user_message: str) -> RouteDecision:
+    """Route using the ROUTER_PROMPT LLM call.
+
+    The call is idempotent, so slow responses are hedged.
+    """
+    llm = get_anthropic_llm(router_model())
+    messages = [
+        SystemMessage(content=ROUTER_PROMPT),
+        HumanMessage(content=user_message),
+    ]
 
     try:
-        response = await llm.ainvoke(
-            [
-                SystemMessage(content=ROUTER_PROMPT),
-                HumanMessage(content=user_message),
-            ]
-        )
+        async with track_external("anthropic", "route"):
+            response = await hedged("route", lambda: _invoke_llm("route", llm, messages))
+        record_token_usage("route", token_usage(response))
 
         # Parse the response
         response_content = response.content
@@ -61,27 +160,140 @@ async def route_query(state: ChatState) -> Dict[str, Any]:
             # Try to extract JSON from the response
             try:
                 result = json.loads(response_content)
-                return {
-                    "should_search_web": result.get("should_search_web", False),
-                    "should_use_rag": result.get("should_use_rag", False),
-                }
+                return RouteDecision(
+                    should_search_web=result.get("should_search_web", False),
+                    should_use_rag=result.get("should_use_rag", False),
+                    confidence=1.0,
+                    source="llm",
+                )
             except json.JSONDecodeError:
                 logger.warning("Could not parse router response as JSON")
 
     except Exception as e:
         logger.error(f"Error in route_query: {e}")
 
+    return RouteDecision(False, False, 0.0, "llm")
+
+
+async def _decide_route(user_message: str) -> RouteDecision:
+    """Route with the configured ``settings.router_mode``."""
+    mode = settings.router_mode.lower()
+    decision = None
+    if mode in ("local", "hybrid"):
+        decision = await route_locally(user_message)
+        if (
+            mode == "hybrid"
+            and decision is not None
+            and decision.confidence < settings.router_confidence_threshold
+        ):
+            decision = None
+
+    if decision is None and mode != "local":
+        decision = await _route_with_llm(user_message)
+    elif decision is None:
+        decision = RouteDecision(False, False, 0.0, "local")
+    return decision
+
+
+async def route_query(state: ChatState) -> Dict[str, Any]:
+    """Route the query to determine what tools to use.
+
+    Depending on ``settings.router_mode`` the decision comes from the LLM
+    ("llm"), the local rules and classifier ("local"), or the local router
+    with an LLM fallback when its confidence is low ("hybrid").
+
+    Routing gets ``route_budget_fraction`` of the time left before the
+    request deadline. If it runs out, the keyword rules decide, or no tools
+    are used when no rule matches, and "route" is added to ``skipped_steps``.
+    """
+    # Get the last user message
+    messages = state.get("messages", [])
+    if not messages:
+        return {
+            "should_search_web": False,
+            "should_use_rag": False,
+        }
+
+    last_message = messages[-1]
+    if isinstance(last_message, dict):
+        user_message = last_message.get("content", "")
+    else:
+        user_message = getattr(last_message, "content", "")
+
+    skipped: Dict[str, Any] = {}
+    budget = node_budget(state, settings.route_budget_fraction)
+    try:
+        decision = await asyncio.wait_for(_decide_route(user_message), timeout=budget)
+    except asyncio.TimeoutError:
+        logger.warning(f"Routing ran out of its {budget:.2f}s budget; using the default route")
+        rules = route_with_rules(user_message)
+        decision = RouteDecision(
+            should_search_web=rules.should_search_web if rules else False,
+            should_use_rag=rules.should_use_rag if rules else False,
+            confidence=0.0,
+            source="default",
+        )
+        skipped["skipped_steps"] = skip_step(state, "route")
+
+    ROUTER_DECISIONS.inc(
+        source=decision.source,
+        web=str(decision.should_search_web).lower(),
+        rag=str(decision.should_use_rag).lower(),
+    )
+    logger.debug(
+        f"Routed via {decision.source} (confidence {decision.confidence:.2f}): "
+        f"web={decision.should_search_web}, rag={decision.should_use_rag}"
+    )
+
     return {
-        "should_search_web": False,
-        "should_use_rag": False,
+        "should_search_web": decision.should_search_web,
+        "should_use_rag": decision.should_use_rag,
+        **skipped,
     }
 
 
+async def _retrieve_rag(query: str) -> List[ContextCandidate]:
+    """Search the vectorstore in the thread pool."""
+    vectorstore = get_vectorstore()
+    if not vectorstore:
+        return []
+
+    # Over-fetch when packing so MMR has alternatives to near-duplicates
+    k = settings.rag_candidates if settings.context_packing_enabled else 3
+    async with track_external("chroma", "similarity_search"):
+        docs = await run_blocking(retrieve_documents, query, k)
+    return [
+        ContextCandidate(text=doc.page_content, source=doc.metadata.get("source"), origin="rag")
+        for doc in docs
+    ]
+
+
+async def _retrieve_web(query: str) -> List[ContextCandidate]:
+    """Search the web and split the results into context candidates."""
+    web_results = await search_web(query)
+    if not web_results:
+        return []
+
+    return [
+        ContextCandidate(
+            text=result["content"],
+            source=result.get("url") or None,
+            origin="web",
+            title=result.get("title") or None,
+        )
+        for result in web_results.get("results", [])
+    ]
+
+
 async def retrieve_context(state: ChatState) -> Dict[str, Any]:
-    """Retrieve context from RAG and/or web search."""
-    context_parts = []
-    sources = []
+    """Retrieve context from RAG and/or web search.
 
+    Both sources run concurrently, each under its own timeout, so retrieval
+    takes as long as the slowest source rather than the sum of both. The
+    timeouts are also capped at ``retrieval_budget_fraction`` of the time left
+    before the request deadline; sources that time out or fail are left out
+    of the context and added to ``skipped_steps``.
+    """
     messages = state.get("messages", [])
     if not messages:
         return {"context": None, "sources": []}
@@ -92,75 +304,547 @@ async def retrieve_context(state: ChatState) -> Dict[str, Any]:
     else:
         query = getattr(last_message, "content", "")
 
-    # RAG retrieval
-    if state.get("should_use_rag", False):
-        try:
-            vectorstore = get_vectorstore()
-            if vectorstore:
-                docs = vectorstore.similarity_search(query, k=3)
-                for doc in docs:
-                    context_parts.append(doc.page_content)
-                    if doc.metadata.get("source"):
-                        sources.append(doc.metadata["source"])
-        except Exception as e:
-            logger.warning(f"RAG retrieval failed: {e}")
-
-    # Web search
-    if state.get("should_search_web", False):
-        try:
-            web_results = await search_web(query)
-            if web_results:
-                context_parts.append(f"Web search results:\n{web_results['content']}")
-                sources.extend(web_results.get("sources", []))
-        except Exception as e:
-            logger.warning(f"Web search failed: {e}")
-
-    context = "\n\n".join(context_parts) if context_parts else None
+    sources = [
+        source
+        for source, wanted in (
+            ("rag", state.get("should_use_rag", False)),
+            ("web", state.get("should_search_web", False)),
+        )
+        if wanted
+    ]
+    budget = node_budget(state, settings.retrieval_budget_fraction)
+    results = await asyncio.gather(*(_timed_retrieval(source, query, budget) for source in sources))
+
+    return await _merge_retrievals(state, query, dict(zip(sources, results)))
+
+
+# Names used in ``skipped_steps`` for each retrieval source
+RETRIEVAL_STEPS = {"rag": "rag", "web": "web_search"}
+
+
+def _timed_retrieval(
+    source: str, query: str, budget: Optional[float] = None
+) -> Awaitable[Optional[List[ContextCandidate]]]:
+    """Retrieve from "rag" or "web" under that source's timeout.
+
+    Args:
+        source: "rag" or "web".
+        query: The search query.
+        budget: Time left for retrieval under the request deadline, if any;
+            the effective timeout is the smaller of this and the source's.
+
+    Returns:
+        An awaitable of the candidates, or None if the source timed out or failed.
+    """
+    if source == "rag":
+        retrieval = _retrieve_rag(query)
+        timeout = settings.rag_timeout_seconds
+        label = "RAG retrieval"
+    else:
+        retrieval = _retrieve_web(query)
+        timeout = settings.web_search_timeout_seconds
+        label = "Web search"
+    if budget is not None:
+        timeout = min(timeout, budget)
+    return with_timeout(retrieval, timeout, None, label)
+
+
+async def _merge_retrievals(
+    state: Dict[str, Any],
+    query: str,
+    results: Dict[str, Optional[List[ContextCandidate]]],
+) -> Dict[str, Any]:
+    """Pack retrieved candidates into the context block and its sources.
+
+    Web results are first reduced to their most query-relevant sentences when
+    ``web_compression_enabled`` is set. With packing enabled, candidates are
+    then ranked by maximal marginal relevance and packed into
+    ``retrieval_token_budget``; otherwise every candidate is included.
+
+    Args:
+        state: State holding the ``skipped_steps`` so far.
+        query: The user message.
+        results: Candidates by source; None for sources that timed out or failed.
+    """
+    skipped: Dict[str, Any] = {}
+    for source, result in results.items():
+        if result is None:
+            state = {**state, "skipped_steps": skip_step(state, RETRIEVAL_STEPS[source])}
+            skipped["skipped_steps"] = state["skipped_steps"]
+
+    candidates = [candidate for result in results.values() if result for candidate in result]
+    if not candidates:
+        return {"context": None, "sources": [], **skipped}
+
+    web_candidates = [candidate for candidate in candidates if candidate.origin == "web"]
+    if settings.web_compression_enabled and web_candidates:
+        compressed = await run_blocking(
+            compress_candidates,
+            query,
+            web_candidates,
+            settings.web_compression_token_budget,
+            sentences_per_source=settings.web_compression_sentences_per_source,
+        )
+        candidates = [c for c in candidates if c.origin != "web"] + compressed
+
+    if not settings.context_packing_enabled:
+        packed = PackedContext(
+            context=PASSAGE_SEPARATOR.join(candidate.full_text() for candidate in candidates),
+            sources=[candidate.source for candidate in candidates if candidate.source],
+        )
+    else:
+        packed = await run_blocking(
+            pack_context,
+            query,
+            candidates,
+            settings.retrieval_token_budget,
+            mmr_lambda=settings.mmr_lambda,
+            duplicate_threshold=settings.mmr_duplicate_threshold,
+        )
+        logger.debug(
+            f"Packed {len(packed.selected)}/{len(candidates)} context candidates "
+            f"({packed.packed_tokens}/{packed.candidate_tokens} tokens, "
+            f"{packed.duplicates} duplicates dropped)"
+        )
 
     return {
-        "context": context,
-        "sources": sources,
+        "context": packed.context,
+        "sources": packed.sources,
+        **skipped,
     }
 
 
-async def generate_response(state: ChatState) -> Dict[str, Any]:
-    """Generate the final response."""
-    llm = get_anthropic_llm()
+async def route_and_retrieve(state: ChatState) -> Dict[str, Any]:
+    """Route the query while speculatively retrieving in parallel.
+
+    RAG (and, if ``speculative_web_search`` is set, web search) starts at
+    the same time as ``route_query``. Speculative results are kept when the
+    router asks for that source and cancelled otherwise; sources the router
+    wants but that were not speculated are fetched once routing finishes.
+    """
+    messages = state.get("messages", [])
+    if not messages:
+        return await route_query(state)
+
+    last_message = messages[-1]
+    if isinstance(last_message, dict):
+        query = last_message.get("content", "")
+    else:
+        query = getattr(last_message, "content", "")
+
+    speculative_sources = ["rag"]
+    if settings.speculative_web_search:
+        speculative_sources.append("web")
+
+    stats = get_speculation_stats()
+    started_at = time.perf_counter()
+    budget = node_budget(state, settings.retrieval_budget_fraction)
+    tasks = {
+        source: asyncio.ensure_future(_timed_retrieval(source, query, budget))
+        for source in speculative_sources
+    }
+    for source in tasks:
+        stats.record_started(source)
+
+    try:
+        route = await route_query(state)
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        raise
+
+    wanted = {
+        "rag": route.get("should_use_rag", False),
+        "web": route.get("should_search_web", False),
+    }
+
+    retrievals: Dict[str, Awaitable[Optional[List[ContextCandidate]]]] = {}
+    for source in ("rag", "web"):
+        task = tasks.get(source)
+        if task is not None and not wanted[source]:
+            task.cancel()
+            stats.record_wasted(source, time.perf_counter() - started_at)
+        elif task is not None:
+            stats.record_used(source)
+            retrievals[source] = task
+        elif wanted[source]:
+            budget = node_budget(state, settings.retrieval_budget_fraction)
+            retrievals[source] = _timed_retrieval(source, query, budget)
+
+    if not retrievals:
+        return {**route, "context": None, "sources": []}
+
+    results = await asyncio.gather(*retrievals.values())
+    merged = await _merge_retrievals(
+        {**state, **route}, query, dict(zip(retrievals, results))
+    )
+    return {**route, **merged}
+
+
+async def check_cache(state: ChatState) -> Dict[str, Any]:
+    """Look up a semantically similar cached response.
+
+    Only first-turn messages that were not routed to web search are eligible,
+    since follow-ups depend on earlier turns and web results go stale.
+    """
+    if not settings.semantic_cache_enabled:
+        return {"cache_hit": False}
 
+    messages = state.get("messages", [])
+    cache = get_semantic_cache()
+
+    is_first_turn = len(messages) == 1 and not state.get("summary")
+    if not is_first_turn or state.get("should_search_web", False):
+        cache.record_bypass()
+        return {"cache_hit": False}
+
+    embeddings = get_embeddings()
+    if embeddings is None:
+        cache.record_bypass()
+        return {"cache_hit": False}
+
+    last_message = messages[-1]
+    if isinstance(last_message, dict):
+        query = last_message.get("content", "")
+    else:
+        query = getattr(last_message, "content", "")
+
+    try:
+        embedding = await run_blocking(embeddings.embed_query, query)
+    except Exception as e:
+        logger.warning(f"Semantic cache embedding failed: {e}")
+        cache.record_bypass()
+        return {"cache_hit": False}
+
+    cached = cache.lookup(embedding, hash_context(state.get("context")))
+    if cached is None:
+        # Held outside the state so the embedding is never checkpointed
+        cache.hold(state["conversation_id"], embedding)
+        return {"cache_hit": False}
+
+    return {
+        "cache_hit": True,
+        "response": cached.response,
+        "sources": cached.sources,
+    }
+
+
+async def cache_response(state: ChatState) -> Dict[str, Any]:
+    """Store the generated response in the semantic cache.
+
+    Answers that used web search are not cached since they go stale. In the
+    "tools" topology the cache is checked before any retrieval, so only
+    answers given without tools could ever be hit.
+    """
+    cache = get_semantic_cache()
+    embedding = cache.release(state["conversation_id"])
+    response = state.get("response")
+    used_tools = settings.graph_topology == "tools" and state.get("context")
+    if (
+        embedding is not None
+        and response
+        and not state.get("generation_failed")
+        and not state.get("should_search_web")
+        and not used_tools
+    ):
+        cache.store(
+            embedding,
+            hash_context(state.get("context")),
+            response,
+            state.get("sources") or [],
+        )
+    return {}
+
+
+def _text_block(text: str, cache: bool = False) -> Dict[str, Any]:
+    """Build a text content block, optionally ending a prompt-cache prefix."""
+    block: Dict[str, Any] = {"type": "text", "text": text}
+    if cache:
+        block["cache_control"] = {"type": "ephemeral"}
+    return block
+
+
+def _build_generation_messages(
+    state: ChatState, system_prompt: str = FINANCIAL_ADVISOR_SYSTEM_PROMPT
+) -> List[BaseMessage]:
+    """Build the generator prompt with Anthropic prompt-cache breakpoints.
+
+    The prompt is ordered from most to least stable: the static system
+    prompt and the rolling summary, the earlier turns, and finally the
+    retrieved context together with the new user message. Breakpoints end
+    the system prefix and the earlier turns. Each is only set once its
+    prefix reaches ``prompt_cache_min_tokens``, since Anthropic does not cache
+    shorter prefixes. The summary and window start only change when a chunk
+    of turns is folded (see ``prompt_window_start``), so consecutive turns
+    read the previous turn's prefix from the cache.
+    """
+    cache = settings.prompt_caching_enabled
+    min_tokens = settings.prompt_cache_min_tokens
     messages = state.get("messages", [])
     context = state.get("context")
+    summary = state.get("summary")
 
     # Build the system message
-    system_content = FINANCIAL_ADVISOR_SYSTEM_PROMPT
-    if context:
-        system_content += f"\n\nRelevant context:\n{context}"
-
-    # Convert messages to LangChain format
-    lc_messages = [SystemMessage(content=system_content)]
-    for msg in messages:
-        if isinstance(msg, dict):
-            role = msg.get("role", "user")
-            content = msg.get("content", "")
+    system_blocks = [_text_block(system_prompt)]
+    if summary:
+        system_blocks.append(
+            _text_block(f"Summary of the earlier conversation:\n{summary}")
+        )
+    prefix_tokens = sum(estimate_tokens(block["text"]) for block in system_blocks)
+    if cache and prefix_tokens >= min_tokens:
+        system_blocks[-1]["cache_control"] = {"type": "ephemeral"}
+
+    # Convert the recent turns (both roles) to LangChain format
+    turns = [_role_and_content(msg) for msg in messages]
+
+    lc_messages: List[BaseMessage] = [SystemMessage(content=system_blocks)]
+    for index, (role, content) in enumerate(turns):
+        is_last = index == len(turns) - 1
+        prefix_tokens += estimate_tokens(content)
+        blocks = []
+        if is_last and context:
+            blocks.append(_text_block(f"Relevant context:\n{context}"))
+        # The turn before the new message closes the stable history prefix
+        closes_history = index == len(turns) - 2 and prefix_tokens >= min_tokens
+        blocks.append(_text_block(content, cache=cache and closes_history))
+
+        if role == "assistant":
+            lc_messages.append(AIMessage(content=blocks))
         else:
-            role = getattr(msg, "role", "user")
-            content = getattr(msg, "content", "")
+            lc_messages.append(HumanMessage(content=blocks))
+
+    return lc_messages
+
+
+def _response_text(response: Any) -> str:
+    """Get the text of a response whose content may be a list of blocks."""
+    content = response.content if hasattr(response, "content") else str(response)
+    if isinstance(content, list):
+        return "".join(
+            block.get("text", "") if isinstance(block, dict) else str(block)
+            for block in content
+        )
+    return content
+
+
+async def _generate_with(
+    tier: GeneratorTier,
+    state: ChatState,
+    lc_messages: List[BaseMessage],
+    tools: Optional[List[Dict[str, Any]]] = None,
+) -> Any:
+    """Call one generator tier within the time left for the request."""
+    llm = get_anthropic_llm(tier.model)
+    if tools:
+        llm = llm.bind_tools(tools)
+    budget = node_budget(state, floor=settings.generation_min_seconds)
+    start = time.perf_counter()
+    async with track_external("anthropic", "generate"):
+        response = await asyncio.wait_for(
+            _invoke_llm("generate", llm, lc_messages), timeout=budget
+        )
+    get_cascade_stats().record_generation(tier.tier, time.perf_counter() - start)
+    return response
+
 
-        if role == "user":
-            lc_messages.append(HumanMessage(content=content))
-        # Skip assistant messages for now to avoid duplication
+async def _generate_or_escalate(
+    tier: GeneratorTier,
+    state: ChatState,
+    lc_messages: List[BaseMessage],
+    tools: Optional[List[Dict[str, Any]]] = None,
+) -> Tuple[Any, GeneratorTier]:
+    """Generate with a tier, escalating to the large model if the small one fails.
 
+    Returns:
+        The response and the tier that produced it.
+    """
     try:
-        response = await llm.ainvoke(lc_messages)
-        response_text = response.content if hasattr(response, "content") else str(response)
+        return await _generate_with(tier, state, lc_messages, tools), tier
+    except Exception as e:
+        # Out of time means no time for the large model either
+        if tier.tier != SMALL_TIER or isinstance(e, asyncio.TimeoutError):
+            raise
+        logger.warning(f"Small model failed ({e}); escalating")
+        tier = escalate("small_failed")
+        return await _generate_with(tier, state, lc_messages, tools), tier
 
-        return {
-            "response": response_text,
-            "sources": state.get("sources", []),
-        }
 
+def _log_usage(state: ChatState, usage: Dict[str, int]) -> None:
+    logger.info(
+        f"Generation tokens for {state.get('conversation_id')}: "
+        f"input={usage['input_tokens']} output={usage['output_tokens']} "
+        f"cache_read={usage['cache_read_tokens']} "
+        f"cache_write={usage['cache_creation_tokens']}"
+    )
+
+
+def _generation_failed(state: ChatState, error: Exception) -> Dict[str, Any]:
+    """Fallback state update when generation raised or ran out of time."""
+    timed_out = isinstance(error, asyncio.TimeoutError)
+    if timed_out:
+        logger.error("Generation ran out of time before the request deadline")
+    else:
+        logger.error(f"Error generating response: {error}")
+    return {
+        "response": "I apologize, but I encountered an error generating a response. Please try again.",
+        "sources": [],
+        "generation_failed": True,
+        **({"skipped_steps": skip_step(state, "generate")} if timed_out else {}),
+    }
+
+
+async def generate_response(state: ChatState) -> Dict[str, Any]:
+    """Generate the final response.
+
+    With ``cascade_enabled``, simple queries are answered by the small model
+    and escalate to the generator model only if it fails; see
+    ``select_generator``. Generation gets the time left before the request
+    deadline, but at least ``generation_min_seconds``. If that runs out, the
+    fallback message is returned and "generate" is added to ``skipped_steps``.
+    """
+    lc_messages = _build_generation_messages(state)
+    messages = state.get("messages", [])
+    tier = select_generator(_role_and_content(messages[-1])[1] if messages else "")
+    logger.debug(f"Generating with the {tier.tier} model {tier.model} ({tier.reason})")
+
+    try:
+        response, _ = await _generate_or_escalate(tier, state, lc_messages)
     except Exception as e:
-        logger.error(f"Error generating response: {e}")
-        return {
-            "response": "I apologize, but I encountered an error generating a response. Please try again.",
-            "sources": [],
-        }
+        return _generation_failed(state, e)
+
+    usage = token_usage(response)
+    record_token_usage("generate", usage)
+    _log_usage(state, usage)
+
+    return {
+        "response": _response_text(response),
+        "sources": state.get("sources", []),
+        "generation_failed": False,
+        "token_usage": usage,
+    }
+
+
+async def _run_tool_calls(
+    state: ChatState, tool_calls: List[Dict[str, Any]]
+) -> Tuple[List[ToolMessage], Dict[str, Any]]:
+    """Run the generator's retrieval tool calls concurrently.
+
+    Each call is packed into its own context block, like routed retrieval.
+
+    Returns:
+        Tool result messages in call order, and the state update with the
+        combined context, sources, tools used and skipped steps.
+    """
+    budget = node_budget(state, settings.retrieval_budget_fraction)
+
+    async def run(call: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, Any]]:
+        source = TOOL_SOURCES.get(call["name"])
+        query = str(call.get("args", {}).get("query", ""))
+        if source is None or not query:
+            return None, {}
+        result = await _timed_retrieval(source, query, budget)
+        return source, await _merge_retrievals(state, query, {source: result})
+
+    results = await asyncio.gather(*(run(call) for call in tool_calls))
+
+    tool_messages: List[ToolMessage] = []
+    contexts: List[str] = []
+    sources: List[str] = []
+    skipped = list(state.get("skipped_steps") or [])
+    used = {"rag": False, "web": False}
+    for call, (source, merged) in zip(tool_calls, results):
+        if source is None:
+            content = f"Unknown tool or missing query: {call['name']}"
+        else:
+            used[source] = True
+            content = merged.get("context") or "No results found."
+            if merged.get("context"):
+                contexts.append(merged["context"])
+            sources.extend(s for s in merged.get("sources", []) if s not in sources)
+            skipped.extend(s for s in merged.get("skipped_steps", []) if s not in skipped)
+        tool_messages.append(ToolMessage(content=content, tool_call_id=call["id"]))
+
+    update = {
+        "context": "\n\n".join(contexts) or None,
+        "sources": sources,
+        "should_use_rag": used["rag"],
+        "should_search_web": used["web"],
+    }
+    if skipped:
+        update["skipped_steps"] = skipped
+    return tool_messages, update
+
+
+async def generate_with_tools(state: ChatState) -> Dict[str, Any]:
+    """Answer in one LLM call, letting the generator call retrieval tools.
+
+    The generator is offered ``retrieve_documents`` and ``search_web``. When
+    it calls tools (both at once if it needs both), they run concurrently
+    and their results go back to it; after ``tool_max_rounds`` rounds it
+    must answer without tools. Queries needing no retrieval therefore take
+    one LLM call instead of a router call plus generation.
+    """
+    lc_messages = _build_generation_messages(
+        state, FINANCIAL_ADVISOR_SYSTEM_PROMPT + TOOL_USE_PROMPT
+    )
+    messages = state.get("messages", [])
+    tier = select_generator(_role_and_content(messages[-1])[1] if messages else "")
+
+    update: Dict[str, Any] = {"should_use_rag": False, "should_search_web": False}
+    totals: Dict[str, int] = {}
+    try:
+        for round_index in range(settings.tool_max_rounds + 1):
+            # The last round withholds the tools so the generator must answer
+            tools = GENERATOR_TOOLS if round_index < settings.tool_max_rounds else None
+            response, tier = await _generate_or_escalate(
+                tier, {**state, **update}, lc_messages, tools
+            )
+            usage = token_usage(response)
+            record_token_usage("generate", usage)
+            totals = {key: totals.get(key, 0) + value for key, value in usage.items()}
+
+            tool_calls = getattr(response, "tool_calls", None) or []
+            if not tool_calls:
+                break
+            lc_messages.append(response)
+            tool_messages, tool_update = await _run_tool_calls({**state, **update}, tool_calls)
+            lc_messages.extend(tool_messages)
+            # Keep earlier rounds' context and citations alongside this round's
+            contexts = [c for c in (update.get("context"), tool_update["context"]) if c]
+            sources = list(update.get("sources", []))
+            sources.extend(s for s in tool_update["sources"] if s not in sources)
+            update = {
+                **update,
+                **tool_update,
+                "context": "\n\n".join(contexts) or None,
+                "sources": sources,
+                "should_use_rag": update["should_use_rag"] or tool_update["should_use_rag"],
+                "should_search_web": (
+                    update["should_search_web"] or tool_update["should_search_web"]
+                ),
+            }
+    except Exception as e:
+        return _generation_failed(state, e)
+
+    ROUTER_DECISIONS.inc(
+        source="tools",
+        web=str(update["should_search_web"]).lower(),
+        rag=str(update["should_use_rag"]).lower(),
+    )
+    _log_usage(state, totals)
+
+    return {
+        **update,
+        "response": _response_text(response),
+        "sources": update.get("sources", []),
+        "generation_failed": False,
+        "token_usage": totals,
+    }
+
+
+async def record_response(state: ChatState) -> Dict[str, Any]:
+    """Append the turn's response to the checkpointed messages."""
+    response = state.get("response")
+    if not response:
+        return {}
+    return {"messages": [AIMessage(content=response)]}
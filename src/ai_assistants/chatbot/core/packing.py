@@ -0,0 +1,231 @@
+"""Token-budgeted packing of retrieved context."""
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from ai_assistants.chatbot.core.context import CHARS_PER_TOKEN, estimate_tokens
+from ai_assistants.chatbot.core.metrics import REGISTRY
+from ai_assistants.chatbot.rag.embeddings import get_embeddings
+from ai_assistants.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+CONTEXT_TOKENS = REGISTRY.histogram(
+    "chatbot_retrieved_context_tokens",
+    "Estimated tokens of retrieved context before and after packing.",
+    ["stage"],
+    buckets=(100, 250, 500, 1000, 2000, 4000, 8000, 16000),
+)
+CONTEXT_DUPLICATES = REGISTRY.counter(
+    "chatbot_context_duplicates_total",
+    "Retrieved candidates dropped as near-duplicates of packed context.",
+)
+
+_WORD_PATTERN = re.compile(r"[a-z0-9$%]+")
+
+# Word overlap scores paraphrases far lower than embedding cosine does, so
+# the lexical fallback uses its own duplicate threshold
+LEXICAL_DUPLICATE_THRESHOLD = 0.6
+
+# Joins passages in the context block, packed or not
+PASSAGE_SEPARATOR = "\n\n"
+
+
+@dataclass
+class ContextCandidate:
+    """A retrieved passage that may be packed into the prompt."""
+
+    text: str
+    source: Optional[str] = None
+    origin: str = "rag"  # "rag" or "web"
+    title: Optional[str] = None
+
+    def full_text(self) -> str:
+        """The passage as sent to the model, with its title if it has one."""
+        return f"**{self.title}**\n{self.text}" if self.title else self.text
+
+
+@dataclass
+class PackedContext:
+    """The packed context block and what went into it."""
+
+    context: Optional[str]
+    sources: List[str] = field(default_factory=list)
+    selected: List[ContextCandidate] = field(default_factory=list)
+    candidate_tokens: int = 0
+    packed_tokens: int = 0
+    duplicates: int = 0
+
+
+def _words(text: str) -> set:
+    return set(_WORD_PATTERN.findall(text.lower()))
+
+
+def lexical_relevance(query: str, texts: List[str]) -> np.ndarray:
+    """Score texts by the fraction of query words they contain."""
+    query_words = _words(query)
+    if not query_words:
+        return np.zeros(len(texts))
+    return np.array([len(query_words & _words(text)) / len(query_words) for text in texts])
+
+
+def embed_texts(query: str, texts: List[str]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Embed a query and texts with the shared model, L2-normalized.
+
+    Returns:
+        Tuple of (query vector, text vectors), or None if embeddings are
+        unavailable or fail.
+    """
+    embeddings = get_embeddings()
+    if embeddings is None:
+        return None
+
+    try:
+        query_vector = np.asarray(embeddings.embed_query(query), dtype=np.float32)
+        doc_vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+    except Exception as e:
+        logger.warning(f"Embedding retrieved text failed, using lexical scores: {e}")
+        return None
+
+    query_vector /= np.linalg.norm(query_vector) or 1.0
+    norms = np.linalg.norm(doc_vectors, axis=1, keepdims=True)
+    doc_vectors /= np.where(norms == 0, 1.0, norms)
+    return query_vector, doc_vectors
+
+
+def _lexical_scores(query: str, texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Score by query term overlap and pairwise overlap coefficient."""
+    relevance = lexical_relevance(query, texts)
+    doc_words = [_words(text) for text in texts]
+    similarity = np.zeros((len(texts), len(texts)))
+    for i, a in enumerate(doc_words):
+        for j, b in enumerate(doc_words):
+            smaller = min(len(a), len(b))
+            similarity[i, j] = len(a & b) / smaller if smaller else 1.0
+    return relevance, similarity
+
+
+def _embedding_scores(query: str, texts: List[str]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Score by cosine similarity of sentence embeddings."""
+    vectors = embed_texts(query, texts)
+    if vectors is None:
+        return None
+
+    query_vector, doc_vectors = vectors
+    return doc_vectors @ query_vector, doc_vectors @ doc_vectors.T
+
+
+def _format_candidate(index: int, candidate: ContextCandidate) -> str:
+    header = f"[{index}] Source: {candidate.source}" if candidate.source else f"[{index}]"
+    return f"{header}\n{candidate.full_text()}"
+
+
+def pack_context(
+    query: str,
+    candidates: List[ContextCandidate],
+    token_budget: int,
+    mmr_lambda: float = 0.7,
+    duplicate_threshold: float = 0.9,
+) -> PackedContext:
+    """Select candidates by maximal marginal relevance until the budget is full.
+
+    Each step picks the candidate maximizing
+    ``mmr_lambda * relevance - (1 - mmr_lambda) * max_similarity_to_selected``.
+    Relevance and similarity come from the shared embedding model, or from
+    word overlap when it is unavailable. Candidates at least
+    ``duplicate_threshold`` similar (embedding cosine) to an already packed
+    one are dropped, and candidates that do not fit the remaining budget are
+    skipped in favour of smaller ones. Packed passages are numbered and
+    labelled with their source so the answer can cite them. The budget is
+    capped at the size of all candidates joined unlabelled, so packing never
+    makes the context larger than sending everything.
+
+    This is CPU-bound when embeddings are used; call it via ``run_blocking``.
+
+    Args:
+        query: The user message the context is retrieved for.
+        candidates: Retrieved passages in retriever rank order.
+        token_budget: Maximum estimated tokens of the packed context block,
+            including source labels and separators.
+        mmr_lambda: Trade-off between relevance (1.0) and novelty (0.0).
+        duplicate_threshold: Similarity at which a candidate is a duplicate.
+
+    Returns:
+        The packed context and the sources of the passages it contains.
+    """
+    candidates = [c for c in candidates if c.text and c.text.strip()]
+    candidate_tokens = sum(estimate_tokens(c.full_text()) for c in candidates)
+    if not candidates:
+        return PackedContext(context=None)
+
+    texts = [c.full_text() for c in candidates]
+    token_budget = min(token_budget, estimate_tokens(PASSAGE_SEPARATOR.join(texts)))
+    # Largest context block whose estimate fits the budget
+    max_chars = token_budget * CHARS_PER_TOKEN - 1
+
+    scores = _embedding_scores(query, texts)
+    if scores is None:
+        scores = _lexical_scores(query, texts)
+        duplicate_threshold = LEXICAL_DUPLICATE_THRESHOLD
+    relevance, similarity = scores
+
+    remaining = list(range(len(candidates)))
+    redundancy = np.zeros(len(candidates))
+    selected: List[ContextCandidate] = []
+    used_chars = 0
+    duplicates = 0
+
+    while remaining and used_chars < max_chars:
+        mmr_scores = mmr_lambda * relevance[remaining] - (1 - mmr_lambda) * redundancy[remaining]
+        best = remaining.pop(int(np.argmax(mmr_scores)))
+        candidate = candidates[best]
+
+        if selected and redundancy[best] >= duplicate_threshold:
+            duplicates += 1
+            continue
+
+        separator = len(PASSAGE_SEPARATOR) if selected else 0
+        chars = separator + len(_format_candidate(len(selected) + 1, candidate))
+        if used_chars + chars > max_chars:
+            # Never return nothing because the best passage alone is too long
+            keep = len(candidate.text) - (chars - max_chars)
+            if selected or keep < CHARS_PER_TOKEN:
+                continue
+            candidate = ContextCandidate(
+                text=candidate.text[:keep],
+                source=candidate.source,
+                origin=candidate.origin,
+                title=candidate.title,
+            )
+            chars = len(_format_candidate(1, candidate))
+
+        selected.append(candidate)
+        used_chars += chars
+        redundancy = np.maximum(redundancy, similarity[best])
+
+    sources: List[str] = []
+    for candidate in selected:
+        if candidate.source and candidate.source not in sources:
+            sources.append(candidate.source)
+
+    context = PASSAGE_SEPARATOR.join(
+        _format_candidate(index, candidate) for index, candidate in enumerate(selected, start=1)
+    )
+    used_tokens = estimate_tokens(context) if context else 0
+
+    CONTEXT_TOKENS.observe(candidate_tokens, stage="candidates")
+    CONTEXT_TOKENS.observe(used_tokens, stage="packed")
+    if duplicates:
+        CONTEXT_DUPLICATES.inc(duplicates)
+
+    return PackedContext(
+        context=context or None,
+        sources=sources,
+        selected=selected,
+        candidate_tokens=candidate_tokens,
+        packed_tokens=used_tokens,
+        duplicates=duplicates,
+    )
@@ -13,6 +13,10 @@ Important guidelines:
 If you have access to retrieved documents or web search results, use them to provide more accurate and up-to-date information. Always indicate when you're using external sources.
 """
 
+TOOL_USE_PROMPT = """
+You can call tools to look things up. Answer directly when you need neither. If you need both the knowledge base and the web, call both tools in the same turn so they run in parallel.
+"""
+
 ROUTER_PROMPT = """Analyze the user's message and determine what tools are needed to answer it.
 
 Based on the message, decide:
@@ -26,3 +30,14 @@ Respond with a JSON object:
     "reasoning": "brief explanation"
 }
 """
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and a financial advisor assistant.
+
+You will be given the current summary (which may be empty) and the next messages of the conversation. Produce an updated summary that:
+1. Keeps the user's goals, circumstances, preferences and any figures they shared
+2. Records the key points and recommendations the assistant already gave
+3. Notes open questions the user still wants answered
+4. Drops greetings, filler and anything superseded by later messages
+
+Respond with the updated summary only, as concise plain prose.
+"""
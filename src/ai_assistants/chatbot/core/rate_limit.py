@@ -0,0 +1,379 @@
+"""Client-side Anthropic rate limiting shared across workers."""
+
+import asyncio
+import functools
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+import anthropic
+import httpx
+
+from ai_assistants.chatbot.core.hedging import excluded_from_latency
+from ai_assistants.chatbot.core.metrics import REGISTRY
+from ai_assistants.shared.config import settings
+from ai_assistants.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+RATE_LIMIT_WAIT = REGISTRY.histogram(
+    "chatbot_rate_limit_wait_seconds",
+    "Time LLM calls waited for client-side rate-limit capacity.",
+    ["operation"],
+    buckets=(0.0, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+RATE_LIMITED = REGISTRY.counter(
+    "chatbot_rate_limited_total",
+    "LLM calls rejected by Anthropic with a 429.",
+    ["operation"],
+)
+RATE_LIMIT_RETRIES = REGISTRY.counter(
+    "chatbot_llm_retries_total",
+    "LLM call retries after rate limiting or transient errors.",
+    ["operation"],
+)
+RATE_LIMIT_CAPACITY = REGISTRY.gauge(
+    "chatbot_rate_limit_capacity",
+    "Per-minute Anthropic limits in use by the client-side limiter.",
+    ["kind"],
+)
+
+# Response headers carrying the account's limits and what is left of them
+LIMIT_HEADERS = {
+    "requests": (
+        "anthropic-ratelimit-requests-limit",
+        "anthropic-ratelimit-requests-remaining",
+    ),
+    "tokens": (
+        "anthropic-ratelimit-tokens-limit",
+        "anthropic-ratelimit-tokens-remaining",
+    ),
+}
+
+# Reservation waits are stretched by up to this fraction so workers that
+# reserve together do not all fire at the same instant
+WAIT_JITTER = 0.1
+
+
+class SharedRateLimiter:
+    """Requests- and tokens-per-minute buckets shared through SQLite.
+
+    Every uvicorn worker on the host opens the same database, so they all
+    draw from one budget. Callers reserve capacity before each call: a
+    bucket may go negative, and the caller sleeps until its reservation is
+    covered by the refill. Calls are therefore released at the refill rate
+    in arrival order, which keeps throughput steady at the limit instead of
+    bursting into 429s and backing off.
+
+    A 429 pauses every worker until its ``retry-after`` has passed. Limits
+    and remaining capacity reported in response headers replace the
+    configured limits and correct the local estimate.
+
+    Methods are blocking; call them via ``run``, which runs them on the
+    limiter's own thread so the short SQLite transactions never queue
+    behind retrieval work in the shared pool.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+    ) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rate-limit")
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        with self._transaction() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "kind TEXT PRIMARY KEY, level REAL, capacity REAL, updated REAL)"
+            )
+            db.execute("CREATE TABLE IF NOT EXISTS pause (id INTEGER PRIMARY KEY, until REAL)")
+            now = time.time()
+            for kind, capacity in (("requests", requests_per_minute), ("tokens", tokens_per_minute)):
+                # The first worker to start seeds the buckets; others join them
+                db.execute(
+                    "INSERT OR IGNORE INTO buckets VALUES (?, ?, ?, ?)",
+                    (kind, capacity, capacity, now),
+                )
+            db.execute("INSERT OR IGNORE INTO pause VALUES (1, 0)")
+
+    async def run(self, method: Callable[..., T], *args: Any) -> T:
+        """Run one of the limiter's blocking methods on its own thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(method, *args))
+
+    def close(self) -> None:
+        """Stop the limiter's thread once queued calls have run."""
+        self._executor.shutdown(wait=True)
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread; sqlite3 connections are not shared
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+        return db
+
+    def _transaction(self) -> "_Transaction":
+        return _Transaction(self._connection())
+
+    @staticmethod
+    def _refill(level: float, capacity: float, updated: float, now: float) -> float:
+        return min(capacity, level + (now - updated) * capacity / 60.0)
+
+    def reserve(self, requests: int = 1, tokens: int = 0) -> float:
+        """Reserve capacity for a call.
+
+        Args:
+            requests: Requests the call makes.
+            tokens: Estimated input plus output tokens.
+
+        Returns:
+            Seconds to wait before making the call.
+        """
+        with self._transaction() as db:
+            now = time.time()
+            wait = 0.0
+            for kind, amount in (("requests", requests), ("tokens", tokens)):
+                level, capacity, updated = db.execute(
+                    "SELECT level, capacity, updated FROM buckets WHERE kind = ?", (kind,)
+                ).fetchone()
+                if capacity <= 0:
+                    continue
+                level = self._refill(level, capacity, updated, now) - amount
+                db.execute(
+                    "UPDATE buckets SET level = ?, updated = ? WHERE kind = ?",
+                    (level, now, kind),
+                )
+                if level < 0:
+                    wait = max(wait, -level * 60.0 / capacity)
+
+            (until,) = db.execute("SELECT until FROM pause WHERE id = 1").fetchone()
+            return max(wait, until - now)
+
+    def adjust(self, tokens: int) -> None:
+        """Correct the token bucket once a call's actual usage is known.
+
+        Args:
+            tokens: Actual minus reserved tokens; negative values refund.
+        """
+        if not tokens:
+            return
+        with self._transaction() as db:
+            db.execute("UPDATE buckets SET level = level - ? WHERE kind = 'tokens'", (tokens,))
+
+    def pause(self, seconds: float) -> None:
+        """Hold all reservations, in every worker, for ``seconds``."""
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE pause SET until = MAX(until, ?) WHERE id = 1", (time.time() + seconds,)
+            )
+
+    def observe(self, kind: str, limit: Optional[float], remaining: Optional[float]) -> None:
+        """Adopt the limit and remaining capacity reported by Anthropic.
+
+        The bucket is only ever lowered to ``remaining``: in-flight calls
+        already reserved locally may not be counted by the server yet.
+        """
+        with self._transaction() as db:
+            now = time.time()
+            level, capacity, updated = db.execute(
+                "SELECT level, capacity, updated FROM buckets WHERE kind = ?", (kind,)
+            ).fetchone()
+            level = self._refill(level, capacity, updated, now)
+            if limit:
+                capacity = limit
+            if remaining is not None:
+                level = min(level, remaining)
+            db.execute(
+                "UPDATE buckets SET level = ?, capacity = ?, updated = ? WHERE kind = ?",
+                (level, capacity, now, kind),
+            )
+        RATE_LIMIT_CAPACITY.set(capacity, kind=kind)
+
+    def levels(self) -> Dict[str, Dict[str, float]]:
+        """Get the current level and per-minute capacity of each bucket."""
+        db = self._connection()
+        now = time.time()
+        rows = db.execute("SELECT kind, level, capacity, updated FROM buckets").fetchall()
+        return {
+            kind: {"level": self._refill(level, capacity, updated, now), "capacity": capacity}
+            for kind, level, capacity, updated in rows
+        }
+
+
+class _Transaction:
+    """``BEGIN IMMEDIATE`` transaction, so read-modify-write is atomic across workers."""
+
+    def __init__(self, db: sqlite3.Connection) -> None:
+        self.db = db
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+# Global limiter instance
+_limiter: Optional[SharedRateLimiter] = None
+
+
+def get_rate_limiter() -> Optional[SharedRateLimiter]:
+    """Get the shared limiter, or None if ``rate_limit_enabled`` is off."""
+    global _limiter
+
+    if _limiter is None and settings.rate_limit_enabled:
+        _limiter = SharedRateLimiter(
+            settings.rate_limit_path,
+            requests_per_minute=settings.rate_limit_requests_per_minute,
+            tokens_per_minute=settings.rate_limit_tokens_per_minute,
+        )
+    return _limiter
+
+
+def close_rate_limiter() -> None:
+    """Shut down the shared limiter's thread, if it was created."""
+    global _limiter
+
+    if _limiter is not None:
+        _limiter.close()
+        _limiter = None
+
+
+def _header_float(headers: httpx.Headers, name: str) -> Optional[float]:
+    value = headers.get(name)
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def retry_after_seconds(headers: httpx.Headers) -> Optional[float]:
+    """Parse ``retry-after`` as seconds or an HTTP date."""
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+async def observe_rate_limit_headers(response: httpx.Response) -> None:
+    """httpx response hook feeding Anthropic rate-limit headers to the limiter."""
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return
+
+    for kind, (limit_header, remaining_header) in LIMIT_HEADERS.items():
+        limit = _header_float(response.headers, limit_header)
+        remaining = _header_float(response.headers, remaining_header)
+        if limit is not None or remaining is not None:
+            await limiter.run(limiter.observe, kind, limit, remaining)
+
+    if response.status_code == 429:
+        retry_after = retry_after_seconds(response.headers)
+        if retry_after:
+            await limiter.run(limiter.pause, retry_after)
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Match the Anthropic SDK's retry policy: connection errors, 408, 409, 429 and 5xx."""
+    if isinstance(error, anthropic.APIConnectionError):
+        return True
+    if isinstance(error, anthropic.APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return False
+
+
+def backoff_seconds(attempt: int, base: float = 0.5, cap: float = 8.0) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+async def rate_limited(
+    operation: str,
+    call: Callable[[], Awaitable[T]],
+    estimated_tokens: int,
+    usage: Callable[[T], int] = lambda _: 0,
+) -> T:
+    """Run an Anthropic call under the shared rate limiter.
+
+    Capacity is reserved before every attempt, and retryable failures are
+    retried up to ``anthropic_max_retries`` times with jittered exponential
+    backoff (the SDK's own retries are disabled while the limiter is on).
+    Tokens reserved for an attempt that fails or is cancelled are refunded.
+    Waits are left out of hedged latencies, so hedging times only the call.
+    Without a limiter the call runs as is.
+
+    Args:
+        operation: Operation name for metrics (e.g. "route", "generate").
+        call: Creates a fresh awaitable for each attempt.
+        estimated_tokens: Input plus expected output tokens to reserve.
+        usage: Gets the actual tokens used from the result, to correct the
+            reservation.
+
+    Returns:
+        The call's result.
+    """
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return await call()
+
+    attempt = 0
+    while True:
+        with excluded_from_latency():
+            wait = await limiter.run(limiter.reserve, 1, estimated_tokens)
+        # Reserved tokens the call is not known to have used, refunded on exit
+        unused = estimated_tokens
+        try:
+            RATE_LIMIT_WAIT.observe(max(wait, 0.0), operation=operation)
+            if wait > 0:
+                with excluded_from_latency():
+                    await asyncio.sleep(wait * (1 + random.uniform(0, WAIT_JITTER)))
+
+            try:
+                result = await call()
+            except Exception as e:
+                if isinstance(e, anthropic.RateLimitError):
+                    RATE_LIMITED.inc(operation=operation)
+                if attempt >= settings.anthropic_max_retries or not _is_retryable(e):
+                    raise
+                delay = backoff_seconds(attempt)
+                logger.warning(
+                    f"Anthropic {operation} call failed ({e}); retrying in {delay:.2f}s"
+                )
+                RATE_LIMIT_RETRIES.inc(operation=operation)
+                attempt += 1
+                # The next reservation also waits out any retry-after pause
+                with excluded_from_latency():
+                    await asyncio.sleep(delay)
+                continue
+
+            actual = usage(result)
+            # Without reported usage the estimate stands
+            unused = estimated_tokens - actual if actual else 0
+            return result
+        finally:
+            if unused:
+                # Queued on the limiter's thread, so it runs even if this
+                # task is cancelled again while waiting for it
+                await limiter.run(limiter.adjust, -unused)
@@ -0,0 +1,213 @@
+"""Local query router that avoids an LLM round trip for most messages."""
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from ai_assistants.chatbot.core.concurrency import run_blocking
+from ai_assistants.chatbot.rag.embeddings import get_embeddings
+from ai_assistants.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Patterns that indicate the answer depends on current information
+WEB_PATTERNS = [
+    re.compile(p, re.IGNORECASE)
+    for p in [
+        r"\btoday\b|\btonight\b|\byesterday\b|\bright now\b",
+        r"\b(current(ly)?|latest|recent(ly)?|live|breaking)\b",
+        r"\bnews\b|\bheadlines?\b",
+        r"\bthis (week|month|quarter|year)\b",
+        r"\b(price|quote|yield|rate)s? (of|for|on)\b",
+        r"\b(stock|share) price\b",
+        r"\bmarkets? (is |are )?(up|down|doing|crash(ing|ed)?|rall(y|ying|ied))\b",
+        r"\b(earnings|fed|fomc|cpi|jobs report)\b",
+        r"\b20[2-9]\d\b",
+    ]
+]
+
+# Ticker symbols such as $AAPL; case-sensitive to avoid matching plain words
+TICKER_PATTERN = re.compile(r"\$[A-Z]{1,5}\b")
+
+# Patterns that indicate a conceptual question answerable from our documents
+RAG_PATTERNS = [
+    re.compile(p, re.IGNORECASE)
+    for p in [
+        r"\b(explain|define|definition|meaning of|difference between)\b",
+        r"\b(pros and cons|advantages|disadvantages)\b",
+        r"\b(roth|ira|401\(?k\)?|403\(?b\)?|hsa|529|index funds?|etfs?|bonds?|"
+        r"dividends?|annuit(y|ies)|mortgages?|budget(ing)?|emergency fund|"
+        r"compound interest|diversification|asset allocation|credit score)\b",
+    ]
+]
+
+# Generic question openers that lean towards RAG but also start questions
+# about current prices ("What is the S&P at?") and small talk ("How can you
+# help?"), so they only hint at a route
+RAG_HINT_PATTERNS = [
+    re.compile(p, re.IGNORECASE)
+    for p in [
+        r"^(what|what's) (is|are) (a |an |the )?",
+        r"\bhow (do|does|should|can)\b",
+    ]
+]
+
+# Labelled examples for the embedding classifier: (message, web, rag)
+ROUTER_EXAMPLES: List[Tuple[str, bool, bool]] = [
+    ("Hi there!", False, False),
+    ("Thanks, that was helpful", False, False),
+    ("Can you say that more simply?", False, False),
+    ("Who are you?", False, False),
+    ("Good morning", False, False),
+    ("Can you summarize what we discussed?", False, False),
+    ("What is a Roth IRA?", False, True),
+    ("How do index funds work?", False, True),
+    ("Explain the difference between stocks and bonds", False, True),
+    ("What is dollar cost averaging?", False, True),
+    ("How should I build an emergency fund?", False, True),
+    ("What are the tax advantages of a 401k?", False, True),
+    ("How does compound interest work?", False, True),
+    ("What is asset allocation?", False, True),
+    ("How do I start budgeting?", False, True),
+    ("What's the S&P 500 at right now?", True, False),
+    ("Why is the market down today?", True, False),
+    ("What did the Fed announce this week?", True, False),
+    ("Latest news on Tesla stock", True, False),
+    ("What is Apple's current share price?", True, False),
+    ("How did bitcoin do yesterday?", True, False),
+    ("What are current 30-year mortgage rates?", True, True),
+    ("What's the current yield on 10-year treasuries and what does it mean for bonds?", True, True),
+    ("Are CD rates good right now and how do CDs work?", True, True),
+    ("What are this year's IRA contribution limits?", True, True),
+    ("Is now a good time to refinance my mortgage?", True, True),
+]
+
+# Confidence assigned to a decision made by the keyword rules
+RULE_CONFIDENCE = 0.9
+
+# Confidence of a decision based only on RAG_HINT_PATTERNS; below the default
+# router_confidence_threshold, so hybrid routing confirms it with the LLM
+HINT_CONFIDENCE = 0.5
+
+# Softmax temperature for the centroid classifier
+CLASSIFIER_TEMPERATURE = 0.05
+
+
+@dataclass
+class RouteDecision:
+    """Outcome of routing a message.
+
+    Attributes:
+        should_search_web: Whether to perform web search.
+        should_use_rag: Whether to use RAG for document retrieval.
+        confidence: Confidence in the decision, from 0 to 1.
+        source: What produced the decision ("rules", "classifier" or "llm").
+    """
+
+    should_search_web: bool
+    should_use_rag: bool
+    confidence: float
+    source: str
+
+
+def route_with_rules(message: str) -> Optional[RouteDecision]:
+    """Route using keyword and regex rules.
+
+    Returns:
+        A decision if any rule fired, otherwise None. A decision based only
+        on RAG_HINT_PATTERNS has HINT_CONFIDENCE.
+    """
+    web = bool(TICKER_PATTERN.search(message)) or any(
+        p.search(message) for p in WEB_PATTERNS
+    )
+    rag = any(p.search(message) for p in RAG_PATTERNS)
+    if web or rag:
+        return RouteDecision(web, rag, RULE_CONFIDENCE, "rules")
+    if any(p.search(message) for p in RAG_HINT_PATTERNS):
+        return RouteDecision(False, True, HINT_CONFIDENCE, "rules")
+    return None
+
+
+class EmbeddingRouteClassifier:
+    """Nearest-centroid classifier over the four web/RAG route combinations."""
+
+    def __init__(self, examples: List[Tuple[str, bool, bool]] = ROUTER_EXAMPLES) -> None:
+        self.examples = examples
+        self._centroids: Optional[Dict[Tuple[bool, bool], List[float]]] = None
+
+    def _fit(self, embeddings) -> Dict[Tuple[bool, bool], List[float]]:
+        vectors = embeddings.embed_documents([text for text, _, _ in self.examples])
+
+        grouped: Dict[Tuple[bool, bool], List[List[float]]] = {}
+        for (_, web, rag), vector in zip(self.examples, vectors):
+            grouped.setdefault((web, rag), []).append(vector)
+
+        return {
+            label: _normalize([sum(dims) / len(group) for dims in zip(*group)])
+            for label, group in grouped.items()
+        }
+
+    def classify(self, message: str) -> Optional[RouteDecision]:
+        """Classify a message (blocking; call from a worker thread).
+
+        Returns:
+            A decision, or None if no embedding model is available.
+        """
+        embeddings = get_embeddings()
+        if embeddings is None:
+            return None
+
+        if self._centroids is None:
+            self._centroids = self._fit(embeddings)
+
+        vector = _normalize(embeddings.embed_query(message))
+        scores = {
+            label: sum(a * b for a, b in zip(vector, centroid))
+            for label, centroid in self._centroids.items()
+        }
+
+        # Softmax over cosine similarities gives a calibrated-ish confidence
+        top = max(scores.values())
+        weights = {
+            label: math.exp((score - top) / CLASSIFIER_TEMPERATURE)
+            for label, score in scores.items()
+        }
+        (web, rag), weight = max(weights.items(), key=lambda item: item[1])
+        return RouteDecision(web, rag, weight / sum(weights.values()), "classifier")
+
+
+def _normalize(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+# Global classifier instance (centroids are computed on first use)
+_classifier = EmbeddingRouteClassifier()
+
+
+async def route_locally(message: str) -> Optional[RouteDecision]:
+    """Route a message without calling the LLM.
+
+    Keyword rules are tried first. Unless a specific rule fired, the
+    embedding classifier runs in the thread pool, and the more confident of
+    its decision and the rules' hint is returned.
+
+    Returns:
+        The local decision, or None if neither rules nor classifier apply.
+    """
+    decision = route_with_rules(message)
+    if decision is not None and decision.confidence >= RULE_CONFIDENCE:
+        return decision
+
+    try:
+        classified = await run_blocking(_classifier.classify, message)
+    except Exception as e:
+        logger.warning(f"Embedding router failed: {e}")
+        return decision
+
+    if classified is None:
+        return decision
+    if decision is not None and decision.confidence > classified.confidence:
+        return decision
+    return classified
@@ -0,0 +1,168 @@
+"""Semantic cache for generated responses."""
+
+import hashlib
+import itertools
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+from ai_assistants.shared.config import settings
+
+
+@dataclass
+class CachedResponse:
+    """A cached response and the inputs it was generated from."""
+
+    embedding: np.ndarray
+    context_hash: str
+    response: str
+    sources: List[str] = field(default_factory=list)
+    expires_at: float = 0.0
+
+
+def hash_context(context: Optional[str]) -> str:
+    """Hash retrieved context so answers are only reused for the same context."""
+    return hashlib.sha256((context or "").encode("utf-8")).hexdigest()
+
+
+class SemanticCache:
+    """Response cache matched by query embedding similarity.
+
+    An entry is reused when the retrieved context hashes identically and the
+    cosine similarity between query embeddings reaches ``threshold``. Entries
+    expire after ``ttl_seconds`` and the least recently used entry is evicted
+    once ``max_entries`` is exceeded.
+
+    Between lookup and store, a missed query's embedding is held outside the
+    graph state (see ``hold``), so it is never written to checkpoints.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: float = 3600,
+        threshold: float = 0.95,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self._entries: "OrderedDict[int, CachedResponse]" = OrderedDict()
+        # context hash -> entry ids, so lookups only compare matching contexts
+        self._by_context: Dict[str, Set[int]] = {}
+        self._ids = itertools.count()
+        # run key -> embedding of a missed query awaiting its response
+        self._pending: "OrderedDict[str, List[float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        ids = self._by_context.get(entry.context_hash)
+        if ids is not None:
+            ids.discard(entry_id)
+            if not ids:
+                del self._by_context[entry.context_hash]
+
+    def lookup(self, embedding: List[float], context_hash: str) -> Optional[CachedResponse]:
+        """Find the most similar unexpired entry for the same context."""
+        now = time.time()
+        query = _normalize(embedding)
+
+        best_id, best_score = None, self.threshold
+        for entry_id in list(self._by_context.get(context_hash, ())):
+            entry = self._entries[entry_id]
+            if entry.expires_at <= now:
+                self._remove(entry_id)
+                continue
+            score = float(np.dot(query, entry.embedding))
+            if score >= best_score:
+                best_id, best_score = entry_id, score
+
+        if best_id is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(best_id)
+        return self._entries[best_id]
+
+    def store(
+        self,
+        embedding: List[float],
+        context_hash: str,
+        response: str,
+        sources: Optional[List[str]] = None,
+    ) -> None:
+        """Cache a response, evicting the least recently used entries if full."""
+        entry_id = next(self._ids)
+        self._entries[entry_id] = CachedResponse(
+            embedding=_normalize(embedding),
+            context_hash=context_hash,
+            response=response,
+            sources=list(sources or []),
+            expires_at=time.time() + self.ttl_seconds,
+        )
+        self._by_context.setdefault(context_hash, set()).add(entry_id)
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def hold(self, key: str, embedding: List[float]) -> None:
+        """Keep a missed query's embedding until its response can be stored.
+
+        Runs that never finish do not release their embedding, so only the
+        ``max_entries`` most recent are kept.
+        """
+        self._pending[key] = embedding
+        self._pending.move_to_end(key)
+        while len(self._pending) > self.max_entries:
+            self._pending.popitem(last=False)
+
+    def release(self, key: str) -> Optional[List[float]]:
+        """Take back the embedding held for ``key``, if any."""
+        return self._pending.pop(key, None)
+
+    def record_bypass(self) -> None:
+        """Count a query that was not eligible for caching."""
+        self.bypasses += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss/bypass counters and the current size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "size": len(self._entries),
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
+
+
+def _normalize(embedding: List[float]) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+# Global cache instance
+_cache: Optional[SemanticCache] = None
+
+
+def get_semantic_cache() -> SemanticCache:
+    """Get the shared semantic response cache."""
+    global _cache
+
+    if _cache is None:
+        _cache = SemanticCache(
+            max_entries=settings.semantic_cache_max_entries,
+            ttl_seconds=settings.semantic_cache_ttl_seconds,
+            threshold=settings.semantic_cache_threshold,
+        )
+    return _cache
@@ -0,0 +1,55 @@
+"""Bookkeeping for speculative retrieval."""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict
+
+
+@dataclass
+class SpeculationStats:
+    """Counts of speculative retrievals that were used or thrown away.
+
+    Attributes:
+        started: Speculative retrievals started, per source.
+        used: Speculative retrievals the router asked for, per source.
+        wasted: Speculative retrievals cancelled because the router did not
+            need them, per source.
+        wasted_seconds: Time spent on wasted retrievals before cancellation.
+    """
+
+    started: Dict[str, int] = field(default_factory=dict)
+    used: Dict[str, int] = field(default_factory=dict)
+    wasted: Dict[str, int] = field(default_factory=dict)
+    wasted_seconds: float = 0.0
+
+    def record_started(self, source: str) -> None:
+        self.started[source] = self.started.get(source, 0) + 1
+
+    def record_used(self, source: str) -> None:
+        self.used[source] = self.used.get(source, 0) + 1
+
+    def record_wasted(self, source: str, seconds: float) -> None:
+        self.wasted[source] = self.wasted.get(source, 0) + 1
+        self.wasted_seconds += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the counters along with the per-source waste rate."""
+        return {
+            "started": dict(self.started),
+            "used": dict(self.used),
+            "wasted": dict(self.wasted),
+            "wasted_seconds": round(self.wasted_seconds, 3),
+            "waste_rate": {
+                source: self.wasted.get(source, 0) / count
+                for source, count in self.started.items()
+                if count
+            },
+        }
+
+
+# Global stats instance
+_stats = SpeculationStats()
+
+
+def get_speculation_stats() -> SpeculationStats:
+    """Get the process-wide speculative retrieval stats."""
+    return _stats
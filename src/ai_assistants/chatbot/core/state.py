@@ -1,27 +1,81 @@
 """LangGraph state definitions."""
 
-from typing import Annotated, List, Optional, TypedDict
+from typing import Annotated, Any, Dict, List, Optional, TypedDict
 
 from langgraph.graph.message import add_messages
 
+from ai_assistants.chatbot.core.deadline import deadline_after
+from ai_assistants.shared.config import settings
+
 
 class ChatState(TypedDict):
     """State for the chat workflow.
 
     Attributes:
-        messages: List of conversation messages with automatic accumulation.
+        messages: Recent conversation messages, accumulated across turns in
+            the checkpoint and trimmed to the verbatim window each turn.
         conversation_id: Unique identifier for the conversation.
+        summary: Rolling summary of turns older than ``messages``.
         response: The final response to return to the user.
         sources: List of sources used in generating the response.
         should_search_web: Whether to perform web search.
         should_use_rag: Whether to use RAG for document retrieval.
         context: Retrieved context from RAG or web search.
+        cache_hit: Whether the response was served from the semantic cache.
+        generation_failed: Whether the generator fell back to an error message.
+        token_usage: Generator token counts, including prompt-cache reads/writes.
+        deadline: Absolute request deadline (epoch seconds), or None.
+        skipped_steps: Steps skipped or degraded by timeouts or failures.
     """
 
     messages: Annotated[list, add_messages]
     conversation_id: str
+    summary: Optional[str]
     response: Optional[str]
     sources: Optional[List[str]]
     should_search_web: bool
     should_use_rag: bool
     context: Optional[str]
+    cache_hit: bool
+    generation_failed: bool
+    token_usage: Optional[Dict[str, int]]
+    deadline: Optional[float]
+    skipped_steps: List[str]
+
+
+# Per-turn fields reset on every input, since checkpointed state carries
+# the previous turn's values forward
+TURN_DEFAULTS: Dict[str, Any] = {
+    "response": None,
+    "sources": [],
+    "should_search_web": False,
+    "should_use_rag": False,
+    "context": None,
+    "cache_hit": False,
+    "generation_failed": False,
+    "token_usage": None,
+    "skipped_steps": [],
+}
+
+
+def turn_input(
+    conversation_id: str,
+    message: str,
+    deadline_seconds: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Build the graph input for one turn: the new message and fresh per-turn fields.
+
+    Args:
+        conversation_id: The conversation (and checkpoint thread) ID.
+        message: The new user message.
+        deadline_seconds: Time budget for the turn; defaults to
+            ``settings.request_deadline_seconds``.
+    """
+    if deadline_seconds is None:
+        deadline_seconds = settings.request_deadline_seconds
+    return {
+        **TURN_DEFAULTS,
+        "messages": [{"role": "user", "content": message}],
+        "conversation_id": conversation_id,
+        "deadline": deadline_after(deadline_seconds),
+    }
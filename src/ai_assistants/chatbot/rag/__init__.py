@@ -1,5 +1,24 @@
 """RAG components for document retrieval."""
 
-from ai_assistants.chatbot.rag.vectorstore import get_vectorstore, initialize_vectorstore
+from ai_assistants.chatbot.rag.embeddings import get_embeddings
+from ai_assistants.chatbot.rag.hybrid import hybrid_search, retrieve_documents
+from ai_assistants.chatbot.rag.keyword_index import KeywordIndex
+from ai_assistants.chatbot.rag.vectorstore import (
+    add_documents,
+    get_keyword_index,
+    get_vectorstore,
+    initialize_vectorstore,
+    save_keyword_index,
+)
 
-__all__ = ["get_vectorstore", "initialize_vectorstore"]
+__all__ = [
+    "KeywordIndex",
+    "add_documents",
+    "get_embeddings",
+    "get_keyword_index",
+    "get_vectorstore",
+    "hybrid_search",
+    "initialize_vectorstore",
+    "retrieve_documents",
+    "save_keyword_index",
+]
@@ -0,0 +1,35 @@
+"""Shared embedding model for the chatbot."""
+
+from ai_assistants.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Global embeddings instance
+_embeddings = None
+_unavailable = False
+
+
+def get_embeddings():
+    """Get the HuggingFace embeddings instance, loading it on first use.
+
+    Returns:
+        The embeddings instance, or None if the dependencies are missing.
+    """
+    global _embeddings, _unavailable
+
+    if _embeddings is None and not _unavailable:
+        try:
+            from langchain_community.embeddings import HuggingFaceEmbeddings
+
+            # Use HuggingFace embeddings (free, no API key needed)
+            _embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+            logger.info(f"Loaded embedding model {EMBEDDING_MODEL_NAME}")
+
+        except ImportError as e:
+            logger.warning(f"Could not load embeddings: {e}")
+            _unavailable = True
+            return None
+
+    return _embeddings
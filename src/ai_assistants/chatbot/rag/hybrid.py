@@ -0,0 +1,116 @@
+"""Hybrid dense + keyword retrieval with reciprocal rank fusion."""
+
+import hashlib
+from typing import Dict, List, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+from ai_assistants.chatbot.rag.vectorstore import get_keyword_index, get_vectorstore
+from ai_assistants.shared.config import settings
+from ai_assistants.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def _document_key(text: str, metadata: Dict) -> str:
+    """Identify a chunk by its content and source, common to both retrievers."""
+    raw = f"{metadata.get('source', '')}\x00{text}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Tuple[List[str], float]],
+    rrf_k: int = 60,
+) -> List[Tuple[str, float]]:
+    """Fuse ranked lists of keys with weighted reciprocal rank fusion.
+
+    Each key scores ``sum(weight / (rrf_k + rank))`` over the rankings it
+    appears in, with ranks starting at 1.
+
+    Args:
+        rankings: (ranked keys, weight) pairs.
+        rrf_k: Damping constant; larger values flatten the rank curve.
+
+    Returns:
+        (key, fused score) pairs, best first.
+    """
+    scores: Dict[str, float] = {}
+    for keys, weight in rankings:
+        for rank, key in enumerate(keys, start=1):
+            scores[key] = scores.get(key, 0.0) + weight / (rrf_k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def hybrid_search(
+    query: str,
+    k: int,
+    pool_size: int = 20,
+    vector_weight: float = 1.0,
+    keyword_weight: float = 1.0,
+    rrf_k: int = 60,
+) -> List[Document]:
+    """Retrieve from the vectorstore and the keyword index and fuse the rankings.
+
+    Blocking; call it via ``run_blocking``.
+
+    Args:
+        query: The search query.
+        k: Number of documents to return.
+        pool_size: Candidates taken from each retriever before fusion.
+        vector_weight: RRF weight of the dense ranking.
+        keyword_weight: RRF weight of the BM25 ranking.
+        rrf_k: RRF damping constant.
+
+    Returns:
+        The top ``k`` fused documents.
+    """
+    vectorstore = get_vectorstore()
+    index = get_keyword_index()
+
+    documents: Dict[str, Document] = {}
+    dense_keys: List[str] = []
+    if vectorstore is not None:
+        for doc in vectorstore.similarity_search(query, k=pool_size):
+            key = _document_key(doc.page_content, doc.metadata)
+            documents.setdefault(key, doc)
+            dense_keys.append(key)
+
+    keyword_keys: List[str] = []
+    if index is not None:
+        for doc_id, _ in index.search(query, pool_size):
+            indexed = index.get(doc_id)
+            if indexed is None:
+                continue
+            text, metadata = indexed
+            key = _document_key(text, metadata)
+            documents.setdefault(key, Document(page_content=text, metadata=metadata))
+            keyword_keys.append(key)
+
+    fused = reciprocal_rank_fusion(
+        [(dense_keys, vector_weight), (keyword_keys, keyword_weight)],
+        rrf_k=rrf_k,
+    )
+    return [documents[key] for key, _ in fused[:k]]
+
+
+def retrieve_documents(query: str, k: int) -> List[Document]:
+    """Retrieve documents using the configured ``rag_retrieval_mode``.
+
+    Falls back to dense retrieval when the keyword index is empty. Blocking;
+    call it via ``run_blocking``.
+    """
+    index = get_keyword_index()
+    if settings.rag_retrieval_mode == "hybrid" and index is not None and len(index):
+        return hybrid_search(
+            query,
+            k,
+            pool_size=max(settings.hybrid_candidate_pool, k),
+            vector_weight=settings.hybrid_vector_weight,
+            keyword_weight=settings.hybrid_keyword_weight,
+            rrf_k=settings.hybrid_rrf_k,
+        )
+
+    vectorstore = get_vectorstore()
+    if vectorstore is None:
+        return []
+    return vectorstore.similarity_search(query, k=k)
@@ -0,0 +1,166 @@
+"""Local BM25 keyword index kept alongside the vectorstore."""
+
+import heapq
+import json
+import math
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ai_assistants.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Standard BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Single characters in parentheses are folded in, so "401(k)" becomes "401k"
+_PAREN_SUFFIX = re.compile(r"\((\w)\)")
+# Words with internal hyphens or slashes, such as "1099-INT" or "W-2"
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-/][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase index terms.
+
+    Compound terms such as form numbers ("1099-int") are indexed both whole
+    and by their parts, so "form 1099" still matches "Form 1099-INT".
+    """
+    text = _PAREN_SUFFIX.sub(r"\1", text.lower())
+    terms: List[str] = []
+    for token in _TOKEN_PATTERN.findall(text):
+        terms.append(token)
+        if "-" in token or "/" in token:
+            terms.extend(re.split(r"[-/]", token))
+    return terms
+
+
+class KeywordIndex:
+    """Incrementally updated BM25 inverted index.
+
+    Documents can be added or removed at any time; postings, document
+    lengths and collection statistics are updated in place, so there is no
+    rebuild step. All methods are thread-safe, since searches run in the
+    shared thread pool.
+    """
+
+    def __init__(self, persist_path: str = "") -> None:
+        self.persist_path = persist_path
+        # term -> {doc_id: term frequency}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._documents: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+        # Whether documents changed since the last load or save
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def ids(self) -> List[str]:
+        """Get the IDs of all indexed documents."""
+        with self._lock:
+            return list(self._documents)
+
+    def add(self, doc_id: str, text: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Index a document, replacing any document with the same ID."""
+        with self._lock:
+            if doc_id in self._documents:
+                self.remove(doc_id)
+
+            terms = tokenize(text)
+            for term, count in Counter(terms).items():
+                self._postings.setdefault(term, {})[doc_id] = count
+            self._lengths[doc_id] = len(terms)
+            self._total_length += len(terms)
+            self._documents[doc_id] = (text, dict(metadata or {}))
+            self.dirty = True
+
+    def remove(self, doc_id: str) -> bool:
+        """Remove a document from the index.
+
+        Returns:
+            True if the document was indexed.
+        """
+        with self._lock:
+            if doc_id not in self._documents:
+                return False
+
+            text, _ = self._documents.pop(doc_id)
+            for term in set(tokenize(text)):
+                postings = self._postings.get(term)
+                if postings is not None:
+                    postings.pop(doc_id, None)
+                    if not postings:
+                        del self._postings[term]
+            self._total_length -= self._lengths.pop(doc_id)
+            self.dirty = True
+            return True
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Rank documents against the query with BM25.
+
+        Returns:
+            Up to ``k`` (doc_id, score) pairs, best first.
+        """
+        with self._lock:
+            total_docs = len(self._documents)
+            if not total_docs:
+                return []
+
+            average_length = self._total_length / total_docs
+            scores: Dict[str, float] = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[doc_id] / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (BM25_K1 + 1) / (
+                        frequency + norm
+                    )
+
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def get(self, doc_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Get the text and metadata of an indexed document."""
+        with self._lock:
+            return self._documents.get(doc_id)
+
+    def load(self) -> None:
+        """Load indexed documents from the persistence file."""
+        path = Path(self.persist_path)
+        if not self.persist_path or not path.exists():
+            return
+
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except Exception as e:
+            logger.warning(f"Could not load keyword index from {path}: {e}")
+            return
+
+        for doc_id, (text, metadata) in data.items():
+            self.add(doc_id, text, metadata)
+        self.dirty = False
+        logger.info(f"Loaded {len(self)} documents into the keyword index from {path}")
+
+    def save(self) -> None:
+        """Write indexed documents to the persistence file if they changed."""
+        if not self.persist_path or not self.dirty:
+            return
+
+        with self._lock:
+            data = {doc_id: [text, metadata] for doc_id, (text, metadata) in self._documents.items()}
+            self.dirty = False
+        path = Path(self.persist_path)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(data), encoding="utf-8")
+        except Exception as e:
+            self.dirty = True
+            logger.warning(f"Could not save keyword index to {path}: {e}")
@@ -1,14 +1,20 @@
 """Vector store setup and management."""
 
+from pathlib import Path
 from typing import List, Optional
 
+from ai_assistants.chatbot.rag.embeddings import get_embeddings
+from ai_assistants.chatbot.rag.keyword_index import KeywordIndex
 from ai_assistants.shared.config import settings
 from ai_assistants.shared.logging import get_logger
 
 logger = get_logger(__name__)
 
-# Global vectorstore instance
+KEYWORD_INDEX_FILENAME = "keyword_index.json"
+
+# Global vectorstore and keyword index instances
 _vectorstore = None
+_keyword_index: Optional[KeywordIndex] = None
 
 
 def get_vectorstore():
@@ -20,6 +26,75 @@ def get_vectorstore():
     return _vectorstore
 
 
+def get_keyword_index() -> Optional[KeywordIndex]:
+    """Get the BM25 keyword index kept alongside the vectorstore.
+
+    Returns:
+        The keyword index, or None if the vectorstore is not initialized.
+    """
+    return _keyword_index
+
+
+def _sync_keyword_index(vectorstore, index: KeywordIndex) -> None:
+    """Bring the keyword index in line with the collection's chunk IDs.
+
+    Chunks missing from the index (e.g. added before it existed, or while
+    its file was not saved) are indexed, and chunks deleted from the
+    collection are removed. Only the missing chunks are fetched.
+    """
+    collection_ids = set(vectorstore.get(include=[])["ids"])
+    indexed_ids = set(index.ids())
+
+    missing = sorted(collection_ids - indexed_ids)
+    if missing:
+        collection = vectorstore.get(ids=missing, include=["documents", "metadatas"])
+        for doc_id, text, metadata in zip(
+            collection["ids"], collection["documents"], collection["metadatas"]
+        ):
+            index.add(doc_id, text or "", metadata)
+
+    stale = indexed_ids - collection_ids
+    for doc_id in stale:
+        index.remove(doc_id)
+
+    if missing or stale:
+        logger.info(
+            f"Synced keyword index with the vectorstore: {len(missing)} added, "
+            f"{len(stale)} removed"
+        )
+
+
+def add_documents(documents: List, save: bool = True) -> List[str]:
+    """Add documents to the vectorstore and the keyword index.
+
+    Args:
+        documents: Documents to embed and index.
+        save: Whether to write the keyword index file afterwards. Pass
+            False when adding many batches and call ``save_keyword_index``
+            once at the end; anything left unsaved is re-indexed from the
+            vectorstore on the next start.
+
+    Returns:
+        The IDs assigned to the documents.
+    """
+    if _vectorstore is None:
+        raise RuntimeError("Vectorstore is not initialized")
+
+    ids = _vectorstore.add_documents(documents)
+    if _keyword_index is not None:
+        for doc_id, doc in zip(ids, documents):
+            _keyword_index.add(doc_id, doc.page_content, doc.metadata)
+        if save:
+            _keyword_index.save()
+    return ids
+
+
+def save_keyword_index() -> None:
+    """Write the keyword index file if it has unsaved changes."""
+    if _keyword_index is not None:
+        _keyword_index.save()
+
+
 def initialize_vectorstore(documents: Optional[List] = None):
     """Initialize the ChromaDB vectorstore.
 
@@ -29,17 +104,14 @@ def initialize_vectorstore(documents: Optional[List] = None):
     Returns:
         The initialized vectorstore.
     """
-    global _vectorstore
+    global _vectorstore, _keyword_index
 
     try:
-        from langchain_anthropic import ChatAnthropic
-        from langchain_community.embeddings import HuggingFaceEmbeddings
         from langchain_community.vectorstores import Chroma
 
-        # Use HuggingFace embeddings (free, no API key needed)
-        embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2"
-        )
+        embeddings = get_embeddings()
+        if embeddings is None:
+            return None
 
         # Create or load the vectorstore
         _vectorstore = Chroma(
@@ -48,9 +120,16 @@ def initialize_vectorstore(documents: Optional[List] = None):
             collection_name="financial_docs",
         )
 
+        _keyword_index = KeywordIndex(
+            persist_path=str(Path(settings.chroma_persist_directory) / KEYWORD_INDEX_FILENAME)
+        )
+        _keyword_index.load()
+        _sync_keyword_index(_vectorstore, _keyword_index)
+
         if documents:
-            _vectorstore.add_documents(documents)
+            add_documents(documents, save=False)
             logger.info(f"Added {len(documents)} documents to vectorstore")
+        _keyword_index.save()
 
         logger.info("Vectorstore initialized successfully")
         return _vectorstore
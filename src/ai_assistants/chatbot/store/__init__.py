@@ -0,0 +1,14 @@
+"""Conversation storage backends."""
+
+from ai_assistants.chatbot.store.base import Conversation, ConversationStore
+from ai_assistants.chatbot.store.factory import get_conversation_store
+from ai_assistants.chatbot.store.memory import InMemoryConversationStore
+from ai_assistants.chatbot.store.sqlite import SQLiteConversationStore
+
+__all__ = [
+    "Conversation",
+    "ConversationStore",
+    "InMemoryConversationStore",
+    "SQLiteConversationStore",
+    "get_conversation_store",
+]
@@ -0,0 +1,72 @@
+"""Conversation store interface."""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+@dataclass
+class Conversation:
+    """A stored conversation.
+
+    Attributes:
+        conversation_id: Unique identifier for the conversation.
+        messages: Messages as dicts with 'role', 'content' and 'timestamp' keys.
+        created_at: When the conversation was first written.
+        updated_at: When a message was last appended.
+        message_count: Total messages ever appended, including any no longer
+            held in ``messages``.
+        summary: Rolling summary of earlier turns.
+        summarized_through: Number of leading messages folded into ``summary``.
+    """
+
+    conversation_id: str
+    messages: List[Dict] = field(default_factory=list)
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    updated_at: datetime = field(default_factory=datetime.utcnow)
+    message_count: int = 0
+    summary: str = ""
+    summarized_through: int = 0
+
+
+class ConversationStore(ABC):
+    """Storage for conversation histories keyed by conversation ID."""
+
+    @abstractmethod
+    def get(self, conversation_id: str) -> Optional[Conversation]:
+        """Get a conversation, or None if it does not exist."""
+
+    @abstractmethod
+    def append(self, conversation_id: str, role: str, content: str) -> None:
+        """Append a message, creating the conversation if needed."""
+
+    @abstractmethod
+    def set_summary(
+        self,
+        conversation_id: str,
+        summary: str,
+        summarized_through: int,
+    ) -> None:
+        """Store the rolling summary of a conversation's earlier messages."""
+
+    @abstractmethod
+    def delete(self, conversation_id: str) -> bool:
+        """Delete a conversation.
+
+        Returns:
+            True if the conversation existed.
+        """
+
+    def get_messages(self, conversation_id: str) -> List[Dict[str, str]]:
+        """Get the role/content pairs of a conversation for the graph."""
+        conversation = self.get(conversation_id)
+        if conversation is None:
+            return []
+        return [
+            {"role": msg["role"], "content": msg["content"]}
+            for msg in conversation.messages
+        ]
+
+    def close(self) -> None:
+        """Release any resources held by the store."""
@@ -0,0 +1,51 @@
+"""Conversation store selection."""
+
+from typing import Optional
+
+from ai_assistants.chatbot.store.base import ConversationStore
+from ai_assistants.chatbot.store.memory import InMemoryConversationStore
+from ai_assistants.chatbot.store.sqlite import SQLiteConversationStore
+from ai_assistants.shared.config import settings
+from ai_assistants.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Global conversation store instance
+_store: Optional[ConversationStore] = None
+
+
+def get_conversation_store() -> ConversationStore:
+    """Get the configured conversation store, creating it on first use.
+
+    Returns:
+        The SQLite store when ``conversation_store_backend`` is "sqlite",
+        otherwise the bounded in-memory store.
+    """
+    global _store
+
+    if _store is None:
+        backend = settings.conversation_store_backend.lower()
+        if backend == "sqlite":
+            _store = SQLiteConversationStore(
+                path=settings.conversation_store_path,
+                max_messages=settings.conversation_max_messages,
+            )
+        else:
+            if backend != "memory":
+                logger.warning(f"Unknown conversation store '{backend}', using memory")
+            _store = InMemoryConversationStore(
+                max_conversations=settings.conversation_max_conversations,
+                max_messages=settings.conversation_max_messages,
+                ttl_seconds=settings.conversation_ttl_seconds,
+            )
+
+    return _store
+
+
+def close_conversation_store() -> None:
+    """Close the conversation store if it was created."""
+    global _store
+
+    if _store is not None:
+        _store.close()
+        _store = None
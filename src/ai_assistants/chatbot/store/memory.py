@@ -0,0 +1,100 @@
+"""Bounded in-memory conversation store."""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Tuple
+
+from ai_assistants.chatbot.store.base import Conversation, ConversationStore
+
+
+class InMemoryConversationStore(ConversationStore):
+    """In-process store with LRU and TTL eviction.
+
+    Conversations are kept in least-recently-used order. Reading or writing a
+    conversation refreshes it; conversations idle for longer than ``ttl_seconds``
+    are dropped, and the least recently used one is evicted once
+    ``max_conversations`` is exceeded. Each conversation keeps only its last
+    ``max_messages`` messages, so total memory stays bounded.
+    """
+
+    def __init__(
+        self,
+        max_conversations: int = 10000,
+        max_messages: int = 100,
+        ttl_seconds: float = 86400,
+    ) -> None:
+        self.max_conversations = max_conversations
+        self.max_messages = max_messages
+        self.ttl_seconds = ttl_seconds
+        # conversation_id -> (last access monotonic time, conversation)
+        self._conversations: "OrderedDict[str, Tuple[float, Conversation]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._conversations)
+
+    def _evict_expired(self, now: float) -> None:
+        """Drop idle conversations from the LRU end."""
+        if self.ttl_seconds <= 0:
+            return
+        while self._conversations:
+            oldest_id, (last_access, _) = next(iter(self._conversations.items()))
+            if now - last_access < self.ttl_seconds:
+                break
+            del self._conversations[oldest_id]
+
+    def _touch(self, conversation_id: str, now: float) -> Optional[Conversation]:
+        """Mark a conversation as recently used and return it."""
+        entry = self._conversations.get(conversation_id)
+        if entry is None:
+            return None
+        self._conversations[conversation_id] = (now, entry[1])
+        self._conversations.move_to_end(conversation_id)
+        return entry[1]
+
+    def get(self, conversation_id: str) -> Optional[Conversation]:
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired(now)
+            return self._touch(conversation_id, now)
+
+    def append(self, conversation_id: str, role: str, content: str) -> None:
+        now = time.monotonic()
+        timestamp = datetime.utcnow()
+        with self._lock:
+            self._evict_expired(now)
+            conversation = self._touch(conversation_id, now)
+            if conversation is None:
+                conversation = Conversation(
+                    conversation_id=conversation_id,
+                    created_at=timestamp,
+                )
+                self._conversations[conversation_id] = (now, conversation)
+                while len(self._conversations) > self.max_conversations:
+                    self._conversations.popitem(last=False)
+
+            conversation.messages.append(
+                {"role": role, "content": content, "timestamp": timestamp}
+            )
+            conversation.updated_at = timestamp
+            conversation.message_count += 1
+            if len(conversation.messages) > self.max_messages:
+                del conversation.messages[: -self.max_messages]
+
+    def set_summary(
+        self,
+        conversation_id: str,
+        summary: str,
+        summarized_through: int,
+    ) -> None:
+        with self._lock:
+            entry = self._conversations.get(conversation_id)
+            if entry is not None:
+                entry[1].summary = summary
+                entry[1].summarized_through = summarized_through
+
+    def delete(self, conversation_id: str) -> bool:
+        with self._lock:
+            return self._conversations.pop(conversation_id, None) is not None
@@ -0,0 +1,148 @@
+"""SQLite-backed persistent conversation store."""
+
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from ai_assistants.chatbot.store.base import Conversation, ConversationStore
+from ai_assistants.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    summary TEXT NOT NULL DEFAULT '',
+    summarized_through INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    conversation_id TEXT NOT NULL REFERENCES conversations(id) ON DELETE CASCADE,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_messages_conversation
+    ON messages (conversation_id, id);
+"""
+
+# Columns added after the initial schema, applied to existing databases
+MIGRATIONS = {
+    "summary": "ALTER TABLE conversations ADD COLUMN summary TEXT NOT NULL DEFAULT ''",
+    "summarized_through": (
+        "ALTER TABLE conversations ADD COLUMN summarized_through INTEGER NOT NULL DEFAULT 0"
+    ),
+}
+
+
+class SQLiteConversationStore(ConversationStore):
+    """Durable store that survives restarts.
+
+    Messages are append-only rows in a WAL-mode database, so a turn is never
+    rewritten and readers do not block the writer. Only the last
+    ``max_messages`` rows of a conversation are loaded on read.
+    """
+
+    def __init__(self, path: str, max_messages: int = 100) -> None:
+        self.path = path
+        self.max_messages = max_messages
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+            columns = {
+                row["name"]
+                for row in self._conn.execute("PRAGMA table_info(conversations)")
+            }
+            for column, statement in MIGRATIONS.items():
+                if column not in columns:
+                    self._conn.execute(statement)
+            self._conn.commit()
+
+        logger.info(f"SQLite conversation store ready at {path}")
+
+    def get(self, conversation_id: str) -> Optional[Conversation]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created_at, updated_at, summary, summarized_through, "
+                "(SELECT COUNT(*) FROM messages m WHERE m.conversation_id = conversations.id) "
+                "AS message_count "
+                "FROM conversations WHERE id = ?",
+                (conversation_id,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            rows = self._conn.execute(
+                "SELECT role, content, created_at FROM messages "
+                "WHERE conversation_id = ? ORDER BY id DESC LIMIT ?",
+                (conversation_id, self.max_messages),
+            ).fetchall()
+
+        messages = [
+            {
+                "role": r["role"],
+                "content": r["content"],
+                "timestamp": datetime.fromisoformat(r["created_at"]),
+            }
+            for r in reversed(rows)
+        ]
+        return Conversation(
+            conversation_id=conversation_id,
+            messages=messages,
+            created_at=datetime.fromisoformat(row["created_at"]),
+            updated_at=datetime.fromisoformat(row["updated_at"]),
+            message_count=row["message_count"],
+            summary=row["summary"],
+            summarized_through=row["summarized_through"],
+        )
+
+    def append(self, conversation_id: str, role: str, content: str) -> None:
+        timestamp = datetime.utcnow().isoformat()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO conversations (id, created_at, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET updated_at = excluded.updated_at",
+                (conversation_id, timestamp, timestamp),
+            )
+            self._conn.execute(
+                "INSERT INTO messages (conversation_id, role, content, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (conversation_id, role, content, timestamp),
+            )
+
+    def set_summary(
+        self,
+        conversation_id: str,
+        summary: str,
+        summarized_through: int,
+    ) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE conversations SET summary = ?, summarized_through = ? WHERE id = ?",
+                (summary, summarized_through, conversation_id),
+            )
+
+    def delete(self, conversation_id: str) -> bool:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM conversations WHERE id = ?", (conversation_id,)
+            )
+        return cursor.rowcount > 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,5 +1,5 @@
 """Chatbot tools for web search and other capabilities."""
 
-from ai_assistants.chatbot.tools.web_search import search_web
+from ai_assistants.chatbot.tools.web_search import get_search_stats, search_web
 
-__all__ = ["search_web"]
+__all__ = ["get_search_stats", "search_web"]
@@ -0,0 +1,155 @@
+"""TTL + LRU cache with single-flight loading."""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from ai_assistants.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries expire after a TTL.
+
+    Concurrent misses for the same key are coalesced: only the first caller
+    runs the loader and every other caller awaits the same result.
+    ``None`` results are never cached, so failed lookups are retried.
+
+    Entries can optionally be persisted to a JSON file, in which case keys
+    must be strings and values JSON-serialisable.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: float = 300,
+        persist_path: str = "",
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persist_path = persist_path
+        # key -> (wall-clock expiry time, value)
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+        if persist_path:
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a cached value, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if time.time() >= expires_at:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entries if full."""
+        self._entries[key] = (time.time() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Optional[Any]]],
+    ) -> Optional[Any]:
+        """Get a cached value, loading it once for all concurrent callers.
+
+        Args:
+            key: Cache key.
+            loader: Coroutine factory producing the value on a miss.
+
+        Returns:
+            The cached or freshly loaded value.
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(self._load(key, loader))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # Shield so one cancelled caller does not cancel the shared load
+        return await asyncio.shield(task)
+
+    async def _load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Optional[Any]]],
+    ) -> Optional[Any]:
+        value = await loader()
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and the current size."""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "size": len(self._entries),
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
+
+    def load(self) -> None:
+        """Load unexpired entries from the persistence file."""
+        path = Path(self.persist_path)
+        if not path.exists():
+            return
+
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except Exception as e:
+            logger.warning(f"Could not load cache from {path}: {e}")
+            return
+
+        now = time.time()
+        for key, expires_at, value in data:
+            if expires_at > now:
+                self._entries[key] = (expires_at, value)
+        logger.info(f"Loaded {len(self._entries)} cache entries from {path}")
+
+    def save(self) -> None:
+        """Write unexpired entries to the persistence file."""
+        if not self.persist_path:
+            return
+
+        now = time.time()
+        data = [
+            [key, expires_at, value]
+            for key, (expires_at, value) in self._entries.items()
+            if expires_at > now
+        ]
+        path = Path(self.persist_path)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(data), encoding="utf-8")
+        except Exception as e:
+            logger.warning(f"Could not save cache to {path}: {e}")
@@ -0,0 +1,42 @@
+"""Tool schemas offered to the generator in the tool-calling graph."""
+
+from typing import Any, Dict, List
+
+RETRIEVE_DOCUMENTS_TOOL = "retrieve_documents"
+SEARCH_WEB_TOOL = "search_web"
+
+_QUERY_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "query": {"type": "string", "description": "Self-contained search query."},
+    },
+    "required": ["query"],
+}
+
+# Anthropic tool definitions, passed to ``ChatAnthropic.bind_tools``
+GENERATOR_TOOLS: List[Dict[str, Any]] = [
+    {
+        "name": RETRIEVE_DOCUMENTS_TOOL,
+        "description": (
+            "Search our financial knowledge base for explanations of financial "
+            "concepts, accounts, products and rules, such as how a Roth IRA or "
+            "an index fund works."
+        ),
+        "input_schema": _QUERY_SCHEMA,
+    },
+    {
+        "name": SEARCH_WEB_TOOL,
+        "description": (
+            "Search the web for current information: market data, prices, "
+            "rates, news and recent events. Only use it when the answer "
+            "depends on up-to-date facts."
+        ),
+        "input_schema": _QUERY_SCHEMA,
+    },
+]
+
+# Retrieval source ("rag" or "web") behind each tool
+TOOL_SOURCES: Dict[str, str] = {
+    RETRIEVE_DOCUMENTS_TOOL: "rag",
+    SEARCH_WEB_TOOL: "web",
+}
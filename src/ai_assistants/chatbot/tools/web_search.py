@@ -2,52 +2,173 @@
 
 from typing import Any, Dict, List, Optional
 
+import httpx
+
+from ai_assistants.chatbot.core.hedging import hedged
+from ai_assistants.chatbot.core.metrics import track_external
+from ai_assistants.chatbot.tools.cache import TTLCache
 from ai_assistants.shared.config import settings
 from ai_assistants.shared.logging import get_logger
 
 logger = get_logger(__name__)
 
+TAVILY_API_URL = "https://api.tavily.com"
+
+
+class TavilySearchClient:
+    """Async Tavily client that keeps its HTTP connections alive.
+
+    The official async client opens a new HTTP client per request; this one
+    holds a single pooled ``httpx.AsyncClient`` for the life of the process.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        max_connections: int = 20,
+        timeout: float = 10.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self._client = httpx.AsyncClient(
+            base_url=TAVILY_API_URL,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {api_key}",
+            },
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=timeout,
+            transport=transport,
+        )
+
+    async def search(self, query: str, max_results: int = 5) -> Dict[str, Any]:
+        """Run a search and return the raw Tavily response."""
+        response = await self._client.post(
+            "/search",
+            json={"query": query, "max_results": max_results},
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def aclose(self) -> None:
+        """Close the underlying connection pool."""
+        await self._client.aclose()
+
+
+# Global client and result cache
+_client: Optional[TavilySearchClient] = None
+_cache: Optional[TTLCache] = None
+
+
+def get_search_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> TavilySearchClient:
+    """Get the shared Tavily client.
+
+    Args:
+        transport: Optional httpx transport, e.g. a simulated Tavily API for
+            offline load tests. Only used when the client is created.
+    """
+    global _client
+
+    if _client is None:
+        _client = TavilySearchClient(
+            api_key=settings.tavily_api_key,
+            max_connections=settings.web_search_max_connections,
+            timeout=settings.web_search_timeout_seconds,
+            transport=transport,
+        )
+    return _client
+
+
+def get_search_cache() -> TTLCache:
+    """Get the shared web search result cache."""
+    global _cache
+
+    if _cache is None:
+        _cache = TTLCache(
+            max_entries=settings.web_search_cache_max_entries,
+            ttl_seconds=settings.web_search_cache_ttl_seconds,
+            persist_path=settings.web_search_cache_path,
+        )
+    return _cache
+
+
+def _cache_key(query: str, max_results: int) -> str:
+    """Build a cache key from the normalized query and result count."""
+    normalized = " ".join(query.lower().split())
+    return f"{max_results}:{normalized}"
+
+
+async def _fetch(query: str, max_results: int) -> Optional[Dict[str, Any]]:
+    """Query Tavily, hedging slow searches, and format the results."""
+    client = get_search_client()
+    try:
+        async with track_external("tavily", "search"):
+            response = await hedged(
+                "web_search", lambda: client.search(query, max_results=max_results)
+            )
+    except Exception as e:
+        logger.error(f"Web search failed: {e}")
+        return None
+
+    results: List[Dict[str, str]] = []
+    formatted: List[str] = []
+    sources: List[str] = []
+
+    for result in response.get("results", []):
+        title = result.get("title", "")
+        content = result.get("content", "")
+        url = result.get("url", "")
+
+        results.append({"title": title, "content": content, "url": url})
+        formatted.append(f"**{title}**\n{content}")
+        if url:
+            sources.append(url)
+
+    return {
+        "content": "\n\n".join(formatted),
+        "sources": sources,
+        "results": results,
+    }
+
 
 async def search_web(query: str, max_results: int = 5) -> Optional[Dict[str, Any]]:
     """Search the web using Tavily API.
 
+    Results are cached by normalized query and ``max_results``, and
+    concurrent identical searches share a single upstream call.
+
     Args:
         query: The search query.
         max_results: Maximum number of results to return.
 
     Returns:
-        Dictionary with 'content' and 'sources' keys, or None if search fails.
+        Dictionary with 'content', 'sources' and per-result 'results'
+        (title, content, url) keys, or None if search fails.
     """
     if not settings.tavily_api_key:
         logger.warning("Tavily API key not configured, skipping web search")
         return None
 
-    try:
-        from tavily import TavilyClient
-
-        client = TavilyClient(api_key=settings.tavily_api_key)
-        response = client.search(query, max_results=max_results)
+    return await get_search_cache().get_or_load(
+        _cache_key(query, max_results),
+        lambda: _fetch(query, max_results),
+    )
 
-        results: List[str] = []
-        sources: List[str] = []
 
-        for result in response.get("results", []):
-            title = result.get("title", "")
-            content = result.get("content", "")
-            url = result.get("url", "")
+def get_search_stats() -> Dict[str, Any]:
+    """Get hit/miss counters for the web search cache."""
+    return get_search_cache().stats()
 
-            results.append(f"**{title}**\n{content}")
-            if url:
-                sources.append(url)
 
-        return {
-            "content": "\n\n".join(results),
-            "sources": sources,
-        }
+async def close_web_search() -> None:
+    """Persist the result cache and close the shared client."""
+    global _client, _cache
 
-    except ImportError:
-        logger.warning("tavily-python not installed, skipping web search")
-        return None
-    except Exception as e:
-        logger.error(f"Web search failed: {e}")
-        return None
+    if _cache is not None:
+        _cache.save()
+        _cache = None
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -1,6 +1,7 @@
 """Centralized configuration using Pydantic Settings."""
 
 from functools import lru_cache
+from typing import Dict
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -22,10 +23,114 @@ class Settings(BaseSettings):
     chatbot_host: str = "0.0.0.0"
     chatbot_port: int = 8000
     chatbot_model: str = "claude-sonnet-4-20250514"
+    router_model: str = ""  # empty uses chatbot_model
+    generator_model: str = ""  # empty uses chatbot_model
+    cascade_enabled: bool = False  # answer simple queries with cascade_small_model
+    cascade_small_model: str = "claude-3-5-haiku-20241022"
+    cascade_confidence_threshold: float = 0.7  # less confident queries escalate
+    router_mode: str = "llm"  # "llm", "local" or "hybrid"
+    router_confidence_threshold: float = 0.6
+    graph_topology: str = "router"  # "router" or "tools" (generator calls retrieval tools)
+    tool_max_rounds: int = 2  # tool-calling rounds before the generator must answer
+    prompt_caching_enabled: bool = True
+    prompt_cache_min_tokens: int = 1024  # shortest prefix Anthropic caches (2048 for Haiku)
+
+    # Anthropic client pool settings
+    anthropic_max_connections: int = 100
+    anthropic_max_keepalive_connections: int = 20
+    anthropic_keepalive_expiry: float = 30.0
+    anthropic_timeout: float = 60.0
+    anthropic_max_retries: int = 2
+
+    # Opt-in client-side Anthropic rate limiting, shared by workers on this
+    # host. Limits reported in response headers replace these once seen.
+    rate_limit_enabled: bool = False
+    rate_limit_path: str = "./data/rate_limit.db"
+    rate_limit_requests_per_minute: float = 50.0
+    rate_limit_tokens_per_minute: float = 30000.0
+    rate_limit_output_tokens_estimate: int = 500  # reserved per call, corrected after
+
+    # Admission control settings
+    admission_max_concurrent: int = 32
+    admission_max_queue: int = 64
+    admission_queue_timeout_seconds: float = 5.0
+    admission_retry_after_seconds: int = 2
+
+    # WebSocket session settings
+    ws_max_sessions: int = 1000
+    ws_idle_timeout_seconds: float = 300.0  # close sessions with no chat this long
+    ws_ping_interval_seconds: float = 20.0
+
+    # Conversation store settings
+    conversation_store_backend: str = "memory"  # "memory" or "sqlite"
+    conversation_store_path: str = "./data/conversations.db"
+    conversation_max_conversations: int = 10000
+    conversation_max_messages: int = 100
+    conversation_ttl_seconds: int = 86400
+
+    # Graph checkpoint settings (conversation_id is the thread ID)
+    checkpointer_backend: str = "sqlite"  # "sqlite", "memory" or "none"
+    checkpoint_path: str = "./data/checkpoints.db"
 
     # RAG settings
     chroma_persist_directory: str = "./chroma_db"
 
+    # Prompt context settings
+    context_recent_turns: int = 4  # user turns kept verbatim, including the new one
+    context_fold_turns: int = 4  # turns the window grows by before they are summarized at once
+    context_token_budget: int = 6000
+    context_token_budgets: Dict[str, int] = {}  # per-model overrides
+    context_summarization_enabled: bool = True
+    summary_min_messages: int = 2
+    summary_max_tokens: int = 400
+
+    # Request deadline settings
+    request_deadline_seconds: float = 30.0  # 0 disables; overridable per request
+    route_budget_fraction: float = 0.2  # share of the remaining time for routing
+    retrieval_budget_fraction: float = 0.5  # share of the remaining time for retrieval
+    generation_min_seconds: float = 5.0  # generation is attempted even when late
+
+    # Hedged request settings (idempotent router and web search calls only)
+    hedging_enabled: bool = False
+    hedge_percentile: float = 95.0  # hedge calls slower than this latency percentile
+    hedge_budget_ratio: float = 0.05  # extra requests as a share of calls
+    hedge_min_samples: int = 20  # latencies observed before hedging starts
+    hedge_min_delay_seconds: float = 0.05
+
+    # Retrieval settings
+    retrieval_max_workers: int = 8
+    rag_timeout_seconds: float = 5.0
+    web_search_timeout_seconds: float = 8.0
+    speculative_retrieval: bool = False  # start RAG lookup alongside routing
+    speculative_web_search: bool = False  # also speculate web search (paid calls)
+    rag_retrieval_mode: str = "hybrid"  # "hybrid" (BM25 + vector) or "vector"
+    hybrid_candidate_pool: int = 20  # candidates from each retriever before fusion
+    hybrid_vector_weight: float = 1.0
+    hybrid_keyword_weight: float = 1.0
+    hybrid_rrf_k: int = 60
+
+    # Retrieved context packing settings
+    context_packing_enabled: bool = True
+    retrieval_token_budget: int = 2000
+    rag_candidates: int = 6  # documents fetched from the vectorstore before packing
+    mmr_lambda: float = 0.7  # 1.0 ranks purely by relevance, 0.0 purely by novelty
+    mmr_duplicate_threshold: float = 0.9  # similarity at which a candidate is dropped
+    web_compression_enabled: bool = False  # keep only query-relevant web sentences
+    web_compression_token_budget: int = 600
+    web_compression_sentences_per_source: int = 3
+
+    # Semantic response cache settings
+    semantic_cache_enabled: bool = False
+    semantic_cache_threshold: float = 0.95
+    semantic_cache_ttl_seconds: int = 3600
+    semantic_cache_max_entries: int = 1000
+
+    # Web search settings
+    web_search_max_connections: int = 20
+    web_search_cache_max_entries: int = 1000
+    web_search_cache_ttl_seconds: int = 300
+    web_search_cache_path: str = ""  # empty disables persistence
+
     # CrewAI settings
     crew_verbose: bool = True
 
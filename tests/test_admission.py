@@ -0,0 +1,101 @@
+"""Tests for admission control and load shedding."""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ai_assistants.chatbot.api import routes
+from ai_assistants.chatbot.api.admission import AdmissionController, OverloadedError
+from ai_assistants.chatbot.app import create_app
+from ai_assistants.shared.config import settings
+
+
+def test_at_most_max_concurrent_run_at_once():
+    controller = AdmissionController(max_concurrent=2, max_queue=10, queue_timeout=1)
+    running = peak = 0
+
+    async def work() -> None:
+        nonlocal running, peak
+        async with controller.slot():
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    async def main() -> None:
+        await asyncio.gather(*(work() for _ in range(6)))
+
+    asyncio.run(main())
+    assert peak == 2
+
+
+def test_requests_beyond_the_queue_are_shed_immediately():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=1)
+
+    async def main() -> str:
+        held = await controller.admit()
+        queued = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        try:
+            with pytest.raises(OverloadedError) as error:
+                await controller.acquire()
+            return error.value.reason
+        finally:
+            held.release()
+            await queued
+            controller.release()
+
+    assert asyncio.run(main()) == "queue_full"
+
+
+def test_queued_requests_give_up_at_the_deadline():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=0.05)
+
+    async def main() -> OverloadedError:
+        await controller.acquire()
+        with pytest.raises(OverloadedError) as error:
+            await controller.acquire()
+        return error.value
+
+    error = asyncio.run(main())
+    assert error.reason == "timeout"
+    assert error.retry_after == 1
+
+
+def test_slots_are_returned_on_errors_and_only_once():
+    controller = AdmissionController(max_concurrent=1, max_queue=0, queue_timeout=0.05)
+
+    async def main() -> None:
+        with pytest.raises(ValueError):
+            async with controller.slot():
+                raise ValueError("graph failed")
+
+        admission = await controller.admit()
+        admission.release()
+        admission.release()
+        # A second release must not have freed a phantom slot
+        await controller.acquire()
+        with pytest.raises(OverloadedError):
+            await controller.acquire()
+
+    asyncio.run(main())
+
+
+@pytest.fixture
+def overloaded_client(monkeypatch):
+    monkeypatch.setattr(settings, "anthropic_api_key", "test")
+    monkeypatch.setattr(settings, "checkpointer_backend", "memory")
+    full = AdmissionController(max_concurrent=1, max_queue=0, retry_after=7)
+    asyncio.run(full.acquire())
+    monkeypatch.setattr(routes, "get_admission_controller", lambda: full)
+    with TestClient(create_app()) as client:
+        yield client
+
+
+@pytest.mark.parametrize("path", ["/api/v1/chat", "/api/v1/chat/stream"])
+def test_shed_requests_get_a_503_with_retry_after(overloaded_client, path):
+    response = overloaded_client.post(path, json={"message": "What is an IRA?"})
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "7"
@@ -0,0 +1,52 @@
+"""Tests for checkpoint pruning."""
+
+import asyncio
+import operator
+from typing import Annotated, List, TypedDict
+
+import pytest
+from langgraph.graph import END, START, StateGraph
+
+from ai_assistants.chatbot.core import checkpoint
+from ai_assistants.shared.config import settings
+
+
+class _State(TypedDict):
+    steps: Annotated[List[int], operator.add]
+
+
+def _step(state: _State) -> dict:
+    return {"steps": [len(state["steps"])]}
+
+
+async def _run_turns(turns: int) -> tuple:
+    workflow = StateGraph(_State)
+    workflow.add_node("first", _step)
+    workflow.add_node("second", _step)
+    workflow.add_edge(START, "first")
+    workflow.add_edge("first", "second")
+    workflow.add_edge("second", END)
+    graph = workflow.compile(checkpointer=checkpoint.get_checkpointer())
+    config = checkpoint.thread_config("c1")
+
+    try:
+        for _ in range(turns):
+            await graph.ainvoke({"steps": []}, config)
+            await checkpoint.prune_thread("c1")
+        history = [snapshot async for snapshot in graph.aget_state_history(config)]
+        state = await graph.aget_state(config)
+        return len(history), state.values["steps"]
+    finally:
+        await checkpoint.close_checkpointer()
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_only_the_latest_checkpoint_is_kept(backend, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "checkpointer_backend", backend)
+    monkeypatch.setattr(settings, "checkpoint_path", str(tmp_path / "checkpoints.db"))
+
+    kept, steps = asyncio.run(_run_turns(turns=3))
+
+    assert kept == 1
+    # Pruning keeps the state the next turn builds on
+    assert steps == [0, 1, 2, 3, 4, 5]
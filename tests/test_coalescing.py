@@ -0,0 +1,166 @@
+"""Tests for single-flight coalescing of identical in-flight work."""
+
+import asyncio
+from typing import AsyncIterator, List
+
+import pytest
+
+from ai_assistants.chatbot.core.coalescing import (
+    SingleFlight,
+    SingleFlightStream,
+    first_turn_key,
+)
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = 0
+
+    async def work() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def main() -> List[str]:
+        return await asyncio.gather(*(flight.run("key", work) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["answer"] * 5
+    assert calls == 1
+    assert len(flight) == 0
+
+
+def test_failures_reach_every_caller():
+    flight = SingleFlight()
+
+    async def work() -> None:
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+
+    async def main() -> list:
+        return await asyncio.gather(
+            flight.run("key", work), flight.run("key", work), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    flight = SingleFlight()
+
+    async def work() -> str:
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def main() -> str:
+        leaving = asyncio.create_task(flight.run("key", work))
+        staying = asyncio.create_task(flight.run("key", work))
+        await asyncio.sleep(0.01)
+        leaving.cancel()
+        return await staying
+
+    assert asyncio.run(main()) == "answer"
+
+
+def test_shared_call_is_cancelled_when_every_caller_leaves():
+    flight = SingleFlight()
+
+    async def main() -> bool:
+        stopped = asyncio.Event()
+
+        async def work() -> None:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                stopped.set()
+                raise
+
+        callers = [asyncio.create_task(flight.run("key", work)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.wait_for(stopped.wait(), timeout=1)
+        return len(flight) == 0
+
+    assert asyncio.run(main())
+
+
+async def _events(count: int, delay: float = 0.005) -> AsyncIterator[int]:
+    for index in range(count):
+        await asyncio.sleep(delay)
+        yield index
+
+
+async def _collect(stream: AsyncIterator[int]) -> List[int]:
+    return [event async for event in stream]
+
+
+def test_late_subscribers_replay_the_whole_stream():
+    flight = SingleFlightStream()
+    started = 0
+
+    def factory() -> AsyncIterator[int]:
+        nonlocal started
+        started += 1
+        return _events(5)
+
+    async def main() -> List[List[int]]:
+        first = asyncio.create_task(_collect(flight.subscribe("key", factory)))
+        await asyncio.sleep(0.015)
+        second = asyncio.create_task(_collect(flight.subscribe("key", factory)))
+        return await asyncio.gather(first, second)
+
+    assert asyncio.run(main()) == [[0, 1, 2, 3, 4]] * 2
+    assert started == 1
+    assert len(flight) == 0
+
+
+def test_stream_failures_follow_the_events_before_them():
+    flight = SingleFlightStream()
+
+    async def failing() -> AsyncIterator[int]:
+        yield 0
+        raise ValueError("upstream failed")
+
+    async def main() -> List[int]:
+        received = []
+        with pytest.raises(ValueError):
+            async for event in flight.subscribe("key", failing):
+                received.append(event)
+        return received
+
+    assert asyncio.run(main()) == [0]
+
+
+def test_shared_stream_is_cancelled_when_every_subscriber_leaves():
+    flight = SingleFlightStream()
+
+    async def main() -> bool:
+        stopped = asyncio.Event()
+
+        async def endless() -> AsyncIterator[int]:
+            try:
+                while True:
+                    await asyncio.sleep(0.005)
+                    yield 0
+            finally:
+                stopped.set()
+
+        subscribers = [
+            asyncio.create_task(_collect(flight.subscribe("key", endless))) for _ in range(2)
+        ]
+        await asyncio.sleep(0.02)
+        subscribers[0].cancel()
+        await asyncio.sleep(0.02)
+        assert not stopped.is_set()
+        subscribers[1].cancel()
+        await asyncio.wait_for(stopped.wait(), timeout=1)
+        return len(flight) == 0
+
+    assert asyncio.run(main())
+
+
+def test_only_new_conversations_get_a_coalescing_key():
+    assert first_turn_key("  What is  an IRA? ", new_conversation=True) == "what is an ira?"
+    assert first_turn_key("What is an IRA?", new_conversation=False) is None
@@ -0,0 +1,79 @@
+"""Tests for prompt context windowing and summaries."""
+
+import asyncio
+from typing import Dict, List
+
+import pytest
+
+from ai_assistants.chatbot.core import context
+from ai_assistants.chatbot.store import InMemoryConversationStore
+from ai_assistants.shared.config import settings
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = InMemoryConversationStore()
+    monkeypatch.setattr(context, "get_conversation_store", lambda: store)
+    return store
+
+
+@pytest.fixture
+def summarized(monkeypatch) -> List[List[Dict[str, str]]]:
+    """Replace the LLM summarizer, recording the messages it was given."""
+    calls: List[List[Dict[str, str]]] = []
+
+    async def fake_summarize(summary: str, messages: List[Dict[str, str]]) -> str:
+        calls.append(messages)
+        return f"{summary} +{len(messages)}".strip()
+
+    monkeypatch.setattr(context, "_summarize", fake_summarize)
+    return calls
+
+
+def _fill(store: InMemoryConversationStore, turns: int, size: int = 400) -> None:
+    for turn in range(turns):
+        store.append("c1", "user", f"question {turn} " + "x" * size)
+        store.append("c1", "assistant", f"answer {turn} " + "y" * size)
+
+
+def test_budget_trimmed_messages_are_summarized_before_they_are_dropped(
+    store, summarized, monkeypatch
+):
+    _fill(store, turns=3)
+    # Room for about two messages, well inside the recent-turn window
+    monkeypatch.setattr(settings, "context_token_budget", 250)
+    monkeypatch.setattr(settings, "context_token_budgets", {})
+    monkeypatch.setattr(settings, "context_recent_turns", 4)
+
+    window, summary = asyncio.run(
+        context.build_prompt_context(store.get("c1"), "next question")
+    )
+
+    assert window[-1] == {"role": "user", "content": "next question"}
+    dropped = 6 - (len(window) - 1)
+    assert dropped > 0
+    assert [len(call) for call in summarized] == [dropped]
+    assert summary == f"+{dropped}"
+    assert store.get("c1").summarized_through == dropped
+
+
+def test_messages_the_summary_covers_are_not_summarized_again(store, summarized):
+    _fill(store, turns=3)
+    store.set_summary("c1", "earlier turns", 4)
+
+    trimmed = store.get_messages("c1")[:5]
+    summary = asyncio.run(context.summarize_trimmed(store.get("c1"), trimmed, 5))
+
+    assert summarized == [trimmed[4:]]
+    assert summary == "earlier turns +1"
+    assert store.get("c1").summarized_through == 5
+
+
+def test_nothing_is_summarized_when_the_window_fits(store, summarized):
+    _fill(store, turns=1, size=10)
+
+    window, summary = asyncio.run(context.build_prompt_context(store.get("c1"), "hi"))
+
+    assert len(window) == 3
+    assert summary == ""
+    assert summarized == []
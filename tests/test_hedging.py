@@ -0,0 +1,69 @@
+"""Tests for hedged requests."""
+
+import asyncio
+
+from ai_assistants.chatbot.core.hedging import Hedger, excluded_from_latency
+from ai_assistants.shared.config import Settings
+
+
+def _warm_hedger(latency: float) -> Hedger:
+    hedger = Hedger("test", min_samples=5, budget_ratio=1.0)
+    hedger._latencies.extend([latency] * 5)
+    return hedger
+
+
+def test_hedging_is_opt_in():
+    assert Settings().hedging_enabled is False
+
+
+def test_slow_calls_are_hedged():
+    hedger = _warm_hedger(0.01)
+    calls = []
+
+    async def call() -> str:
+        calls.append(None)
+        # The primary stalls; the duplicate returns at once
+        await asyncio.sleep(1.0 if len(calls) == 1 else 0)
+        return f"attempt {len(calls)}"
+
+    assert asyncio.run(hedger.call(call)) == "attempt 2"
+    assert len(calls) == 2
+
+
+def test_excluded_waits_are_not_timed():
+    hedger = Hedger("test", min_samples=100)
+
+    async def call() -> None:
+        with excluded_from_latency():
+            await asyncio.sleep(0.1)
+        await asyncio.sleep(0.01)
+
+    asyncio.run(hedger.call(call))
+
+    (latency,) = hedger._latencies
+    assert 0.005 < latency < 0.05
+
+
+def test_excluded_waits_do_not_trigger_a_hedge():
+    hedger = _warm_hedger(0.02)
+    calls = []
+
+    async def call() -> None:
+        calls.append(None)
+        # e.g. waiting for rate-limit capacity well past the hedge threshold
+        with excluded_from_latency():
+            await asyncio.sleep(0.1)
+        await asyncio.sleep(0.005)
+
+    asyncio.run(hedger.call(call))
+
+    assert len(calls) == 1
+
+
+def test_excluded_wait_outside_a_hedged_call_is_harmless():
+    async def call() -> str:
+        with excluded_from_latency():
+            await asyncio.sleep(0)
+        return "ok"
+
+    assert asyncio.run(call()) == "ok"
@@ -0,0 +1,94 @@
+"""Tests for the BM25 keyword index and its sync with the vectorstore."""
+
+from typing import Dict, List, Optional
+
+import pytest
+from langchain_core.documents import Document
+
+from ai_assistants.chatbot.rag import vectorstore
+from ai_assistants.chatbot.rag.keyword_index import KeywordIndex
+
+
+class FakeCollection:
+    """The slice of the Chroma vectorstore API the keyword index uses."""
+
+    def __init__(self, documents: Dict[str, str]) -> None:
+        self.documents = dict(documents)
+        self.fetched: List[str] = []
+
+    def get(self, ids: Optional[List[str]] = None, include: Optional[List[str]] = None) -> dict:
+        ids = list(self.documents) if ids is None else ids
+        if include:
+            self.fetched.extend(ids)
+        return {
+            "ids": ids,
+            "documents": [self.documents[doc_id] for doc_id in ids],
+            "metadatas": [{"source": doc_id} for doc_id in ids],
+        }
+
+    def add_documents(self, documents: List[Document]) -> List[str]:
+        ids = [f"new-{len(self.documents) + i}" for i in range(len(documents))]
+        self.documents.update(zip(ids, (doc.page_content for doc in documents)))
+        return ids
+
+
+@pytest.fixture
+def index(tmp_path) -> KeywordIndex:
+    return KeywordIndex(persist_path=str(tmp_path / "keyword_index.json"))
+
+
+def test_sync_indexes_only_the_missing_chunks_and_drops_deleted_ones(index):
+    index.add("a", "roth ira limits")
+    index.add("deleted", "an old chunk")
+    collection = FakeCollection({"a": "roth ira limits", "b": "form 1099-int"})
+
+    vectorstore._sync_keyword_index(collection, index)
+
+    assert sorted(index.ids()) == ["a", "b"]
+    assert collection.fetched == ["b"]
+    assert index.search("1099")[0][0] == "b"
+
+
+def test_sync_leaves_a_matching_index_untouched(index):
+    index.add("a", "roth ira limits")
+    index.save()
+    collection = FakeCollection({"a": "roth ira limits"})
+
+    vectorstore._sync_keyword_index(collection, index)
+
+    assert collection.fetched == []
+    assert not index.dirty
+
+
+def test_save_only_writes_changes(index, tmp_path):
+    path = tmp_path / "keyword_index.json"
+    index.save()
+    assert not path.exists()
+
+    index.add("a", "roth ira limits")
+    index.save()
+    written = path.read_text()
+
+    path.write_text("{}")
+    index.save()
+    assert path.read_text() == "{}"
+
+    path.write_text(written)
+    reloaded = KeywordIndex(persist_path=str(path))
+    reloaded.load()
+    assert reloaded.ids() == ["a"] and not reloaded.dirty
+
+
+def test_batched_adds_write_the_index_once(index, monkeypatch):
+    collection = FakeCollection({})
+    monkeypatch.setattr(vectorstore, "_vectorstore", collection)
+    monkeypatch.setattr(vectorstore, "_keyword_index", index)
+    saves = []
+    monkeypatch.setattr(index, "save", lambda: saves.append(len(index)))
+
+    for batch in range(3):
+        vectorstore.add_documents([Document(page_content=f"chunk {batch}")], save=False)
+    assert saves == []
+
+    vectorstore.save_keyword_index()
+    assert saves == [3]
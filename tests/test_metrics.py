@@ -0,0 +1,143 @@
+"""Tests for the chatbot's Prometheus metrics."""
+
+import asyncio
+import re
+from typing import Dict, FrozenSet, Tuple
+
+import pytest
+
+from ai_assistants.chatbot.app import create_app
+from ai_assistants.chatbot.core.metrics import (
+    REGISTRY,
+    Metric,
+    instrument_node,
+    record_token_usage,
+    track_external,
+)
+
+# Metrics behind the node, external call, router and token instrumentation
+EXPECTED_METRICS = {
+    "chatbot_node_duration_seconds": ("histogram", ("node",)),
+    "chatbot_node_in_flight": ("gauge", ("node",)),
+    "chatbot_node_errors_total": ("counter", ("node",)),
+    "chatbot_external_call_duration_seconds": ("histogram", ("service", "operation")),
+    "chatbot_external_calls_in_flight": ("gauge", ("service", "operation")),
+    "chatbot_external_call_errors_total": ("counter", ("service", "operation")),
+    "chatbot_router_decisions_total": ("counter", ("source", "web", "rag")),
+    "chatbot_llm_tokens_total": ("counter", ("operation", "type")),
+}
+
+METRIC_NAME = re.compile(r"^[a-zA-Z_:][a-zA-Z0-9_:]*$")
+SAMPLE = re.compile(r"^(?P<name>[a-zA-Z_:][a-zA-Z0-9_:]*)(\{(?P<labels>.*)\})? (?P<value>\S+)$")
+LABEL = re.compile(r'(?P<key>[a-zA-Z_][a-zA-Z0-9_]*)="(?P<value>(?:[^"\\]|\\.)*)"')
+
+Samples = Dict[Tuple[str, FrozenSet[Tuple[str, str]]], float]
+
+
+def _samples() -> Samples:
+    """Parse the rendered registry into {(name, labels): value}."""
+    samples: Samples = {}
+    for line in REGISTRY.render().splitlines():
+        if not line or line.startswith("#"):
+            continue
+        match = SAMPLE.match(line)
+        assert match, f"Malformed sample line: {line!r}"
+        labels = frozenset(
+            (label["key"], label["value"]) for label in LABEL.finditer(match["labels"] or "")
+        )
+        samples[(match["name"], labels)] = float(match["value"])
+    return samples
+
+
+def _sample(samples: Samples, name: str, **labels: str) -> float:
+    return samples[(name, frozenset(labels.items()))]
+
+
+def test_expected_metrics_have_their_types_and_labels():
+    metrics = {metric.name: metric for metric in REGISTRY.metrics()}
+    for name, (type_name, labelnames) in EXPECTED_METRICS.items():
+        assert name in metrics, f"{name} is not registered"
+        assert metrics[name].type_name == type_name
+        assert metrics[name].labelnames == labelnames
+
+
+def test_render_declares_every_metric():
+    rendered = REGISTRY.render()
+    for metric in REGISTRY.metrics():
+        assert METRIC_NAME.match(metric.name)
+        assert metric.name.startswith("chatbot_")
+        assert f"# HELP {metric.name} " in rendered
+        assert f"# TYPE {metric.name} {metric.type_name}\n" in rendered
+
+
+def test_instrumented_node_records_latency_and_errors():
+    async def ok(state):
+        return {}
+
+    async def fails(state):
+        raise RuntimeError("boom")
+
+    asyncio.run(instrument_node("test_ok", ok)({}))
+    with pytest.raises(RuntimeError):
+        asyncio.run(instrument_node("test_fails", fails)({}))
+
+    samples = _samples()
+    assert _sample(samples, "chatbot_node_duration_seconds_count", node="test_ok") == 1
+    assert _sample(samples, "chatbot_node_duration_seconds_count", node="test_fails") == 1
+    assert _sample(samples, "chatbot_node_in_flight", node="test_ok") == 0
+    assert _sample(samples, "chatbot_node_errors_total", node="test_fails") == 1
+    assert ("chatbot_node_errors_total", frozenset({("node", "test_ok")})) not in samples
+    assert _sample(
+        samples, "chatbot_node_duration_seconds_bucket", node="test_ok", le="+Inf"
+    ) == 1
+
+
+def test_external_calls_record_latency_and_errors():
+    async def call(fail: bool) -> None:
+        async with track_external("test_service", "search"):
+            if fail:
+                raise ConnectionError("unreachable")
+
+    asyncio.run(call(fail=False))
+    with pytest.raises(ConnectionError):
+        asyncio.run(call(fail=True))
+
+    samples = _samples()
+    labels = {"service": "test_service", "operation": "search"}
+    assert _sample(samples, "chatbot_external_call_duration_seconds_count", **labels) == 2
+    assert _sample(samples, "chatbot_external_call_errors_total", **labels) == 1
+    assert _sample(samples, "chatbot_external_calls_in_flight", **labels) == 0
+
+
+def test_token_usage_is_counted_by_type():
+    record_token_usage(
+        "test_generate",
+        {"input_tokens": 120, "output_tokens": 30, "cache_read_tokens": 0},
+    )
+
+    samples = _samples()
+    tokens = "chatbot_llm_tokens_total"
+    assert _sample(samples, tokens, operation="test_generate", type="input") == 120
+    assert _sample(samples, tokens, operation="test_generate", type="output") == 30
+    # Zero counts are not recorded
+    cache_read = frozenset({("operation", "test_generate"), ("type", "cache_read")})
+    assert (tokens, cache_read) not in samples
+
+
+def test_labels_must_match_declared_names():
+    node_errors = next(m for m in REGISTRY.metrics() if m.name == "chatbot_node_errors_total")
+    with pytest.raises(ValueError):
+        node_errors.inc(provider="anthropic")
+
+
+def test_metrics_endpoint_is_mounted():
+    paths = {route.path for route in create_app().routes}
+    assert "/metrics" in paths
+
+
+def test_metric_types_must_implement_samples():
+    class Untyped(Metric):
+        type_name = "untyped"
+
+    with pytest.raises(TypeError):
+        Untyped("chatbot_untyped", "Missing samples")
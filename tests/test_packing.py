@@ -0,0 +1,120 @@
+"""Tests for token-budgeted context packing."""
+
+from typing import List
+
+import pytest
+
+from ai_assistants.chatbot.core import packing
+from ai_assistants.chatbot.core.context import estimate_tokens
+from ai_assistants.chatbot.core.packing import (
+    PASSAGE_SEPARATOR,
+    ContextCandidate,
+    pack_context,
+)
+
+QUERY = "roth ira contribution limit"
+
+CANDIDATES = [
+    ContextCandidate(
+        text="The Roth IRA contribution limit is $7,000 for 2024, or $8,000 at age 50 and over.",
+        source="irs.gov/roth",
+    ),
+    ContextCandidate(
+        text="For 2024 the Roth IRA contribution limit is $7,000, or $8,000 at age 50 and over.",
+        source="example.com/roth-limits",
+    ),
+    ContextCandidate(
+        text="Roth IRA contributions are phased out above certain income limits.",
+        source="irs.gov/phase-out",
+    ),
+    ContextCandidate(
+        text="Index funds track a market benchmark and usually charge low fees.",
+        source="example.com/index-funds",
+    ),
+]
+
+
+class WordEmbeddings:
+    """Bag-of-words embeddings, so cosine similarity follows word overlap."""
+
+    def __init__(self, vocabulary: List[str]) -> None:
+        self.vocabulary = vocabulary
+
+    def _embed(self, text: str) -> List[float]:
+        words = packing._words(text)
+        return [float(word in words) for word in self.vocabulary]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+
+@pytest.fixture(params=["lexical", "embeddings"])
+def scorer(request, monkeypatch):
+    if request.param == "lexical":
+        embeddings = None
+    else:
+        vocabulary = sorted(
+            set().union(*(packing._words(c.full_text()) for c in CANDIDATES)) | {"roth"}
+        )
+        embeddings = WordEmbeddings(vocabulary)
+    monkeypatch.setattr(packing, "get_embeddings", lambda: embeddings)
+    return request.param
+
+
+def _plain_tokens(candidates: List[ContextCandidate]) -> int:
+    return estimate_tokens(PASSAGE_SEPARATOR.join(c.full_text() for c in candidates))
+
+
+@pytest.mark.parametrize("budget", [20, 40, 60, 2000])
+def test_packed_context_fits_the_budget(scorer, budget):
+    packed = pack_context(QUERY, CANDIDATES, budget)
+
+    assert packed.context
+    assert estimate_tokens(packed.context) <= budget
+    assert packed.packed_tokens == estimate_tokens(packed.context)
+
+
+@pytest.mark.parametrize("budget", [10, 40, 80, 2000])
+def test_packing_never_exceeds_plain_concatenation(scorer, budget):
+    packed = pack_context(QUERY, CANDIDATES, budget)
+
+    assert estimate_tokens(packed.context or "") <= _plain_tokens(CANDIDATES)
+
+
+def test_near_duplicates_are_dropped(scorer):
+    packed = pack_context(QUERY, CANDIDATES, 2000)
+
+    assert packed.duplicates >= 1
+    sources = [candidate.source for candidate in packed.selected]
+    assert not {"irs.gov/roth", "example.com/roth-limits"} <= set(sources)
+
+
+def test_passages_are_packed_most_relevant_first(scorer):
+    packed = pack_context(QUERY, CANDIDATES, 2000)
+
+    sources = [candidate.source for candidate in packed.selected]
+    assert sources[0] in ("irs.gov/roth", "example.com/roth-limits")
+    assert sources.index("irs.gov/phase-out") > 0
+    # The unrelated passage is the first to lose its place to source labels
+    assert "example.com/index-funds" not in sources
+    assert packed.context.startswith(f"[1] Source: {packed.selected[0].source}\n")
+    assert packed.sources == [candidate.source for candidate in packed.selected]
+
+
+def test_an_oversized_best_passage_is_truncated_to_fit(scorer):
+    long = ContextCandidate(text="Roth IRA contribution limit " * 50, source="irs.gov/long")
+
+    packed = pack_context(QUERY, [long], 30)
+
+    assert [c.source for c in packed.selected] == ["irs.gov/long"]
+    assert estimate_tokens(packed.context) <= 30
+
+
+def test_nothing_to_pack(scorer):
+    packed = pack_context(QUERY, [ContextCandidate(text="  ")], 2000)
+
+    assert packed.context is None
+    assert packed.sources == []
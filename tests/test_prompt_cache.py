@@ -0,0 +1,168 @@
+"""End-to-end check that consecutive turns read the generator prompt from the cache."""
+
+import asyncio
+import hashlib
+import json
+import time
+from typing import Any, Dict, List, Tuple
+
+import httpx
+from fastapi.testclient import TestClient
+
+from ai_assistants.chatbot.app import create_app
+from ai_assistants.chatbot.core import context
+from ai_assistants.chatbot.core.llm import close_llm_registry, init_llm_registry
+from ai_assistants.chatbot.core.prompts import ROUTER_PROMPT, SUMMARY_PROMPT
+from ai_assistants.shared.config import settings
+
+# Anthropic checks this many blocks before a breakpoint for an earlier cache entry
+LOOKBACK_BLOCKS = 20
+
+
+def _blocks(content: Any) -> List[Dict[str, Any]]:
+    if isinstance(content, str):
+        return [{"type": "text", "text": content}]
+    return list(content or [])
+
+
+class SimulatedPromptCache:
+    """Messages API stand-in that models Anthropic prompt caching.
+
+    The request is flattened into tools, system blocks and message blocks.
+    Each breakpoint whose prefix has at least ``min_tokens`` tokens writes
+    that prefix to the cache, and a request reads the longest cached prefix
+    ending at or up to ``LOOKBACK_BLOCKS`` blocks before one of its
+    breakpoints.
+    """
+
+    def __init__(self, min_tokens: int, answer_tokens: int = 250) -> None:
+        self.min_tokens = min_tokens
+        self.answer_tokens = answer_tokens
+        self.cached: set = set()
+        # (cache_read_input_tokens, breakpoint prefix sizes) per generation call
+        self.generations: List[Tuple[int, List[int]]] = []
+
+    def _flatten(self, body: Dict[str, Any]) -> List[Tuple[str, int, bool]]:
+        """Get (prefix hash, prefix tokens, is breakpoint) for every block."""
+        blocks = [dict(tool) for tool in body.get("tools") or []]
+        blocks += [dict(block, role="system") for block in _blocks(body.get("system"))]
+        for message in body["messages"]:
+            role = message["role"]
+            blocks += [dict(block, role=role) for block in _blocks(message["content"])]
+
+        prefix = hashlib.sha256()
+        tokens = 0
+        flattened = []
+        for block in blocks:
+            breakpoint = block.pop("cache_control", None) is not None
+            encoded = json.dumps(block, sort_keys=True)
+            prefix.update(encoded.encode())
+            tokens += len(encoded) // 4
+            flattened.append((prefix.hexdigest(), tokens, breakpoint))
+        return flattened
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        system = "".join(block.get("text", "") for block in _blocks(body.get("system")))
+        blocks = self._flatten(body)
+
+        cache_read = 0
+        breakpoints = [index for index, block in enumerate(blocks) if block[2]]
+        for index in breakpoints:
+            for candidate in range(index, max(index - LOOKBACK_BLOCKS, -1), -1):
+                digest, tokens, _ = blocks[candidate]
+                if digest in self.cached:
+                    cache_read = max(cache_read, tokens)
+                    break
+        for index in breakpoints:
+            digest, tokens, _ = blocks[index]
+            if tokens >= self.min_tokens:
+                self.cached.add(digest)
+
+        if ROUTER_PROMPT in system:
+            text = json.dumps({"should_search_web": False, "should_use_rag": False})
+        elif SUMMARY_PROMPT in system:
+            text = f"The user asked {len(body['messages'][0]['content'])} characters of questions."
+        else:
+            text = " ".join(["diversify"] * self.answer_tokens)
+            self.generations.append((cache_read, [blocks[i][1] for i in breakpoints]))
+
+        input_tokens = blocks[-1][1] if blocks else 0
+        return httpx.Response(
+            200,
+            json={
+                "id": "msg_test",
+                "type": "message",
+                "role": "assistant",
+                "model": body["model"],
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn",
+                "stop_sequence": None,
+                "usage": {
+                    "input_tokens": input_tokens - cache_read,
+                    "output_tokens": len(text) // 4,
+                    "cache_read_input_tokens": cache_read,
+                    "cache_creation_input_tokens": 0,
+                },
+            },
+        )
+
+
+def _converse(monkeypatch, fold_turns: int, turns: int = 12) -> SimulatedPromptCache:
+    monkeypatch.setattr(settings, "anthropic_api_key", "test")
+    monkeypatch.setattr(settings, "checkpointer_backend", "memory")
+    monkeypatch.setattr(settings, "conversation_store_backend", "memory")
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    monkeypatch.setattr(settings, "hedging_enabled", False)
+    monkeypatch.setattr(settings, "semantic_cache_enabled", False)
+    monkeypatch.setattr(settings, "router_mode", "llm")
+    monkeypatch.setattr(settings, "graph_topology", "router")
+    monkeypatch.setattr(settings, "context_fold_turns", fold_turns)
+
+    anthropic = SimulatedPromptCache(settings.prompt_cache_min_tokens)
+    init_llm_registry(transport=httpx.MockTransport(anthropic.handle))
+    try:
+        with TestClient(create_app()) as client:
+            for turn in range(turns):
+                message = f"Question {turn}: how should I invest?"
+                response = client.post(
+                    "/api/v1/chat", json={"message": message, "conversation_id": "c1"}
+                )
+                assert response.status_code == 200
+                # Let the background summary update finish before the next turn
+                while context._background_tasks:
+                    time.sleep(0.01)
+    finally:
+        # The app's shutdown closes the registry; this covers a failed startup
+        asyncio.run(close_llm_registry())
+    return anthropic
+
+
+def test_consecutive_turns_read_the_cached_prefix(monkeypatch):
+    anthropic = _converse(monkeypatch, fold_turns=4)
+
+    reads = [cache_read for cache_read, _ in anthropic.generations]
+    # Once the history passes the minimum, only turns right after a fold miss
+    later = reads[len(reads) // 2 :]
+    assert sum(read > 0 for read in later) >= len(later) - 2
+    assert sum(reads) > 0
+
+
+def test_breakpoints_are_only_set_on_cacheable_prefixes(monkeypatch):
+    anthropic = _converse(monkeypatch, fold_turns=4, turns=4)
+
+    sizes = [size for _, breakpoints in anthropic.generations for size in breakpoints]
+    assert sizes
+    assert min(sizes) >= settings.prompt_cache_min_tokens
+    # The first turn has neither history nor a long enough system prompt
+    assert anthropic.generations[0][1] == []
+
+
+def test_folding_every_turn_loses_the_cached_prefix(monkeypatch):
+    anthropic = _converse(monkeypatch, fold_turns=0)
+
+    # Once history is folded, the summary and window start change every turn
+    reads = [cache_read for cache_read, _ in anthropic.generations]
+    after_first_fold = reads[settings.context_recent_turns :]
+    assert after_first_fold
+    assert all(read == 0 for read in after_first_fold)
@@ -0,0 +1,107 @@
+"""Tests for the shared client-side rate limiter."""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from ai_assistants.chatbot.core import rate_limit
+from ai_assistants.chatbot.core.concurrency import get_executor
+from ai_assistants.chatbot.core.rate_limit import SharedRateLimiter, rate_limited
+from ai_assistants.shared.config import Settings, settings
+
+
+@pytest.fixture
+def limiter(tmp_path, monkeypatch):
+    # Freeze the clock so buckets do not refill while a test runs
+    now = time.time()
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(time=lambda: now))
+    limiter = SharedRateLimiter(
+        str(tmp_path / "rate_limit.db"), requests_per_minute=60, tokens_per_minute=6000
+    )
+    monkeypatch.setattr(rate_limit, "get_rate_limiter", lambda: limiter)
+    monkeypatch.setattr(settings, "anthropic_max_retries", 0)
+    yield limiter
+    limiter.close()
+
+
+def _tokens(limiter: SharedRateLimiter) -> float:
+    return limiter.levels()["tokens"]["level"]
+
+
+def test_limiter_is_opt_in():
+    assert Settings().rate_limit_enabled is False
+
+
+def test_reservations_past_capacity_wait_for_the_refill(limiter):
+    assert limiter.reserve(tokens=6000) == 0
+    # 600 tokens short at 100 tokens a second
+    assert limiter.reserve(tokens=600) == pytest.approx(6.0)
+
+
+def test_pause_holds_every_reservation(limiter):
+    limiter.pause(5)
+    assert limiter.reserve() == pytest.approx(5.0)
+
+
+def test_reported_remaining_only_lowers_the_bucket(limiter):
+    limiter.observe("tokens", limit=None, remaining=10_000)
+    assert _tokens(limiter) == pytest.approx(6000)
+    limiter.observe("tokens", limit=None, remaining=1000)
+    assert _tokens(limiter) == pytest.approx(1000)
+
+
+def test_reservation_is_corrected_to_actual_usage(limiter):
+    async def call() -> int:
+        return 300
+
+    result = asyncio.run(rate_limited("generate", call, 1000, usage=lambda tokens: tokens))
+
+    assert result == 300
+    assert _tokens(limiter) == pytest.approx(5700)
+
+
+def test_failed_calls_refund_their_reservation(limiter):
+    async def call() -> None:
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        asyncio.run(rate_limited("generate", call, 1000))
+
+    assert _tokens(limiter) == pytest.approx(6000)
+
+
+def test_cancelled_calls_refund_their_reservation(limiter):
+    async def call() -> None:
+        await asyncio.sleep(10)
+
+    async def main() -> None:
+        task = asyncio.create_task(rate_limited("generate", call, 1000))
+        await asyncio.sleep(0.05)
+        assert _tokens(limiter) == pytest.approx(5000)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert _tokens(limiter) == pytest.approx(6000)
+
+
+def test_limiter_does_not_queue_behind_the_shared_pool(limiter):
+    pool = get_executor()
+    release = threading.Event()
+    busy = [pool.submit(release.wait) for _ in range(pool._max_workers)]
+
+    async def call() -> str:
+        return "ok"
+
+    try:
+        result = asyncio.run(asyncio.wait_for(rate_limited("route", call, 100), timeout=2))
+    finally:
+        release.set()
+        for future in busy:
+            future.result()
+
+    assert result == "ok"
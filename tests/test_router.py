@@ -0,0 +1,45 @@
+"""Tests for the local query router's keyword rules."""
+
+import pytest
+
+from ai_assistants.chatbot.core.router import (
+    HINT_CONFIDENCE,
+    RULE_CONFIDENCE,
+    route_with_rules,
+)
+from ai_assistants.shared.config import Settings
+
+
+@pytest.mark.parametrize(
+    "message",
+    ["What is the S&P 500 at?", "How can you help me?", "What are your hours?"],
+)
+def test_generic_question_openers_defer_to_the_fallback(message):
+    decision = route_with_rules(message)
+    assert decision is not None
+    assert decision.confidence == HINT_CONFIDENCE
+    assert decision.confidence < Settings().router_confidence_threshold
+
+
+@pytest.mark.parametrize(
+    "message, web, rag",
+    [
+        ("What is a Roth IRA?", False, True),
+        ("Explain dollar cost averaging", False, True),
+        ("Latest news on $TSLA", True, False),
+        ("What are current mortgage rates?", True, True),
+    ],
+)
+def test_specific_rules_decide_with_rule_confidence(message, web, rag):
+    decision = route_with_rules(message)
+    assert decision is not None
+    assert (decision.should_search_web, decision.should_use_rag) == (web, rag)
+    assert decision.confidence == RULE_CONFIDENCE
+
+
+def test_messages_without_rules_are_left_to_the_classifier():
+    assert route_with_rules("Thanks, that was helpful") is None
+
+
+def test_llm_routing_is_the_default():
+    assert Settings().router_mode == "llm"
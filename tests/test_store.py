@@ -0,0 +1,129 @@
+"""Tests for the conversation store backends."""
+
+import sqlite3
+
+import pytest
+
+from ai_assistants.chatbot.store import memory
+from ai_assistants.chatbot.store.memory import InMemoryConversationStore
+from ai_assistants.chatbot.store.sqlite import SQLiteConversationStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        store = InMemoryConversationStore(max_messages=4)
+    else:
+        store = SQLiteConversationStore(str(tmp_path / "conversations.db"), max_messages=4)
+    yield store
+    store.close()
+
+
+def test_missing_conversations_are_none(store):
+    assert store.get("c1") is None
+    assert store.get_messages("c1") == []
+    assert store.delete("c1") is False
+
+
+def test_appended_messages_are_kept_in_order(store):
+    store.append("c1", "user", "hi")
+    store.append("c1", "assistant", "hello")
+
+    conversation = store.get("c1")
+    assert conversation.message_count == 2
+    assert store.get_messages("c1") == [
+        {"role": "user", "content": "hi"},
+        {"role": "assistant", "content": "hello"},
+    ]
+    assert conversation.created_at <= conversation.updated_at
+
+
+def test_only_the_last_max_messages_are_returned(store):
+    for turn in range(5):
+        store.append("c1", "user", f"question {turn}")
+
+    conversation = store.get("c1")
+    assert [m["content"] for m in conversation.messages] == [
+        f"question {turn}" for turn in range(1, 5)
+    ]
+    assert conversation.message_count == 5
+
+
+def test_summaries_are_stored(store):
+    store.append("c1", "user", "hi")
+    store.set_summary("c1", "the user said hi", 1)
+
+    conversation = store.get("c1")
+    assert (conversation.summary, conversation.summarized_through) == ("the user said hi", 1)
+
+
+def test_deleted_conversations_are_gone(store):
+    store.append("c1", "user", "hi")
+    store.append("c2", "user", "hey")
+
+    assert store.delete("c1") is True
+    assert store.get("c1") is None
+    assert store.get_messages("c2") == [{"role": "user", "content": "hey"}]
+
+
+def test_memory_store_evicts_the_least_recently_used():
+    store = InMemoryConversationStore(max_conversations=2)
+    store.append("c1", "user", "hi")
+    store.append("c2", "user", "hi")
+    store.get("c1")
+    store.append("c3", "user", "hi")
+
+    assert store.get("c2") is None
+    assert store.get("c1") is not None
+    assert len(store) == 2
+
+
+def test_memory_store_drops_idle_conversations(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(memory.time, "monotonic", lambda: now[0])
+    store = InMemoryConversationStore(ttl_seconds=60)
+    store.append("c1", "user", "hi")
+
+    now[0] += 30
+    assert store.get("c1") is not None
+    now[0] += 59
+    assert store.get("c1") is not None
+    now[0] += 61
+    assert store.get("c1") is None
+
+
+def test_sqlite_store_survives_reopening(tmp_path):
+    path = str(tmp_path / "conversations.db")
+    store = SQLiteConversationStore(path)
+    store.append("c1", "user", "hi")
+    store.set_summary("c1", "greeting", 1)
+    store.close()
+
+    reopened = SQLiteConversationStore(path)
+    try:
+        conversation = reopened.get("c1")
+        assert [m["content"] for m in conversation.messages] == ["hi"]
+        assert conversation.summary == "greeting"
+    finally:
+        reopened.close()
+
+
+def test_sqlite_store_migrates_databases_without_summaries(tmp_path):
+    path = str(tmp_path / "conversations.db")
+    db = sqlite3.connect(path)
+    db.executescript(
+        """
+        CREATE TABLE conversations (
+            id TEXT PRIMARY KEY, created_at TEXT NOT NULL, updated_at TEXT NOT NULL
+        );
+        INSERT INTO conversations VALUES ('c1', '2024-01-01T00:00:00', '2024-01-01T00:00:00');
+        """
+    )
+    db.close()
+
+    store = SQLiteConversationStore(path)
+    try:
+        conversation = store.get("c1")
+        assert (conversation.summary, conversation.summarized_through) == ("", 0)
+    finally:
+        store.close()